@@ -0,0 +1,73 @@
+"""
+Benchmark: many concurrent transactions on one asyncio event loop vs a
+thread per transaction with the blocking acquire().
+
+Every transaction writes one table from a pool, so most of them queue behind
+another; the asyncio front end parks the waiters on loop futures while the
+threaded manager needs one OS thread per waiter.
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.async_lock_based_concurrency_control_manager import AsyncLockBasedConcurrencyControlManager
+from src.retention_policy import RetentionPolicy
+from src.row_action import TableAction
+
+TABLES = 1000
+
+def finish(ccm, transaction_id):
+    ccm.transaction_commit(transaction_id)
+    ccm.transaction_commit_flushed(transaction_id)
+    ccm.transaction_end(transaction_id)
+
+def bench_async(transactions):
+    ccm = AsyncLockBasedConcurrencyControlManager(retention_policy=RetentionPolicy(max_terminated=0))
+
+    async def transaction(i):
+        tid = ccm.transaction_begin()
+        await ccm.acquire(tid, TableAction.WRITE, f'table_{i % TABLES}')
+        await asyncio.sleep(0)  # the transaction's work, other coroutines run meanwhile
+        finish(ccm, tid)
+
+    async def main():
+        await asyncio.gather(*(transaction(i) for i in range(transactions)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return transactions / (time.perf_counter() - start)
+
+def bench_threads(transactions):
+    ccm = LockBasedConcurrencyControlManager(retention_policy=RetentionPolicy(max_terminated=0))
+    barrier = threading.Barrier(transactions)
+
+    def transaction(i):
+        tid = ccm.transaction_begin()
+        barrier.wait()
+        ccm.acquire(tid, TableAction.WRITE, f'table_{i % TABLES}')
+        time.sleep(0)
+        finish(ccm, tid)
+
+    threads = [threading.Thread(target=transaction, args=(i,)) for i in range(transactions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return transactions / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    print("="*60)
+    print(f"CONCURRENT TRANSACTIONS ({TABLES} tables)")
+    print("="*60)
+    print(f"{'transactions':>12} | {'asyncio txn/s':>14} | {'threads txn/s':>14}")
+    for transactions in (1000, 5000, 20000):
+        async_throughput = bench_async(transactions)
+        # one OS thread per waiting transaction does not go much further
+        thread_throughput = f'{bench_threads(transactions):>14.0f}' if transactions <= 5000 else f'{"-":>14}'
+        print(f"{transactions:>12} | {async_throughput:>14.0f} | {thread_throughput}")
@@ -0,0 +1,51 @@
+"""
+Benchmark: one transaction_query per table vs one transaction_query_many per
+statement, for each manager.
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.timestamp_based_concurrency_control_manager import TimestampBasedConcurrencyControlManager
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.row_action import TableAction
+
+TRANSACTIONS = 5000
+TABLES_PER_STATEMENT = 8
+
+def statement(i):
+    return [
+        (TableAction.WRITE if j == 0 else TableAction.READ, f'table_{(i + j) % 32}')
+        for j in range(TABLES_PER_STATEMENT)
+    ]
+
+def bench(manager_class, batched):
+    ccm = manager_class()
+    start = time.perf_counter()
+    for i in range(TRANSACTIONS):
+        tid = ccm.transaction_begin()
+        requests = statement(i)
+        if batched:
+            ccm.transaction_query_many(tid, requests)
+        else:
+            for table_action, table_name in requests:
+                ccm.transaction_query(tid, table_action, table_name)
+        ccm.transaction_commit(tid)
+        ccm.transaction_commit_flushed(tid)
+        ccm.transaction_end(tid)
+    return TRANSACTIONS / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    print("="*60)
+    print(f"BATCHED REQUESTS ({TABLES_PER_STATEMENT} tables per transaction)")
+    print("="*60)
+    print(f"{'manager':>12} | {'single txn/s':>12} | {'batch txn/s':>12}")
+    for name, manager_class in (
+        ('lock', LockBasedConcurrencyControlManager),
+        ('timestamp', TimestampBasedConcurrencyControlManager),
+        ('validation', ValidationBasedConcurrencyControlManager),
+    ):
+        print(f"{name:>12} | {bench(manager_class, False):>12.0f} | {bench(manager_class, True):>12.0f}")
@@ -0,0 +1,63 @@
+"""
+Benchmark: pairwise rw/ww conflicts of a trace of transactions, with the
+Python nested loop over read/write sets vs a NumPy ConflictMatrix, plus
+picking a maximal non-conflicting subset from the matrix. Needs NumPy.
+
+Each transaction reads a few tables and writes one, out of a shared pool;
+the nested loop uses the ResourceSet bitmaps, so it is the fastest pure
+Python version of the check.
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.conflict_matrix import ConflictMatrix
+from src.resource_registry import ResourceRegistry, ResourceSet
+
+TABLES = 1000
+READS = 4
+
+def make_trace(count):
+    rng = random.Random(count)
+    registry = ResourceRegistry()
+    read_sets = [ResourceSet(registry, (f'table_{rng.randrange(TABLES)}' for _ in range(READS))) for _ in range(count)]
+    write_sets = [ResourceSet(registry, [f'table_{rng.randrange(TABLES)}']) for _ in range(count)]
+    return registry, read_sets, write_sets
+
+def bench_nested_loop(read_sets, write_sets):
+    start = time.perf_counter()
+    accessed = [r.bits | w.bits for r, w in zip(read_sets, write_sets)]
+    conflicts = 0
+    for i, write_set in enumerate(write_sets):
+        write_bits = write_set.bits
+        for j, accessed_bits in enumerate(accessed):
+            if i != j and write_bits & accessed_bits:
+                conflicts += 1
+    return time.perf_counter() - start, conflicts
+
+def bench_matrix(registry, read_sets, write_sets):
+    start = time.perf_counter()
+    matrix = ConflictMatrix(read_sets, write_sets, registry)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    picked = matrix.non_conflicting_subset()
+    selected = time.perf_counter() - start
+    return built, selected, int(matrix.conflicts.sum()), len(picked), matrix.conflict_density()
+
+if __name__ == '__main__':
+    print("="*86)
+    print(f"CONFLICT MATRIX ({READS} reads + 1 write over {TABLES} tables)")
+    print("="*86)
+    # load NumPy and its BLAS before timing
+    ConflictMatrix([{'a'}], [{'b'}])
+    print(f"{'txns':>6} | {'nested loop':>11} | {'matrix':>9} | {'select':>9} | {'conflicts':>9} | {'density':>7} | {'picked':>6}")
+    for count in (500, 1000, 2000, 4000, 8000):
+        registry, read_sets, write_sets = make_trace(count)
+        loop_time, loop_conflicts = bench_nested_loop(read_sets, write_sets) if count <= 4000 else (None, None)
+        built, selected, conflicts, picked, density = bench_matrix(registry, read_sets, write_sets)
+        assert loop_conflicts in (None, conflicts)
+        loop = f'{loop_time * 1e3:>9.1f}ms' if loop_time is not None else f"{'-':>11}"
+        print(f"{count:>6} | {loop} | {built * 1e3:>7.1f}ms | {selected * 1e3:>7.1f}ms | {conflicts:>9} | {density:>7.4f} | {picked:>6}")
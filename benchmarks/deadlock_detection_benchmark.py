@@ -0,0 +1,50 @@
+"""
+Benchmark: conflict-path latency of DFS vs incremental deadlock detection.
+
+A wait chain T1 -> T2 -> ... -> TL is built first (Ti holds table i and waits
+for table i+1). Each probe then begins a new transaction that conflicts with
+the head of the chain, so DFS has to walk the whole chain on every conflict.
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.deadlock_detection import DeadlockDetection
+from src.row_action import TableAction
+
+PROBES = 200
+
+def build_chain(ccm, length):
+    chain = [ccm.transaction_begin() for _ in range(length)]
+    for i, tid in enumerate(chain):
+        ccm.transaction_query(tid, TableAction.WRITE, f'chain_{i}')
+    for i, tid in enumerate(chain[:-1]):
+        ccm.transaction_query(tid, TableAction.WRITE, f'chain_{i + 1}')
+    return chain
+
+def bench_conflicts(deadlock_detection, length):
+    ccm = LockBasedConcurrencyControlManager(deadlock_detection=deadlock_detection)
+    build_chain(ccm, length)
+    probes = [ccm.transaction_begin() for _ in range(PROBES)]
+    start = time.perf_counter()
+    for tid in probes:
+        ccm.transaction_query(tid, TableAction.WRITE, 'chain_0')
+    elapsed = time.perf_counter() - start
+    return elapsed / PROBES * 1e6
+
+if __name__ == '__main__':
+    print("="*60)
+    print("CONFLICT-PATH LATENCY BY DEADLOCK DETECTION MODE")
+    print("="*60)
+    print(f"{'chain length':>12} | {'dfs (us)':>12} | {'incremental (us)':>16}")
+    for length in (10, 100, 500, 5000):
+        results = []
+        for mode in (DeadlockDetection.DFS, DeadlockDetection.INCREMENTAL):
+            try:
+                results.append(f'{bench_conflicts(mode, length):.2f}')
+            except RecursionError:
+                results.append('RecursionError')
+        print(f"{length:>12} | {results[0]:>12} | {results[1]:>16}")
@@ -0,0 +1,80 @@
+"""
+Benchmark: work thrown away by each deadlock victim selection policy.
+
+Worker threads run transactions of mixed size (2 to 12 tables from a small
+pool, in random order) with the blocking acquire(). Every abort counts the
+locks its transaction had acquired as wasted work.
+"""
+
+import sys
+import os
+import random
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.deadlock_victim_policy import DeadlockVictimPolicy
+from src.retention_policy import RetentionPolicy
+from src.row_action import TableAction
+from src.transaction_status import TransactionStatus
+
+THREADS = 8
+TABLES = 24
+DURATION = 2.0
+
+def worker(ccm, seed, stop, results):
+    rnd = random.Random(seed)
+    commits = aborts = wasted = 0
+    while not stop.is_set():
+        tables = rnd.sample(range(TABLES), rnd.randint(2, 12))
+        while not stop.is_set():
+            tid = ccm.transaction_begin()
+            try:
+                for table in tables:
+                    response = ccm.acquire(tid, TableAction.WRITE, f'table_{table}', timeout=1.0)
+                    if not response.can_proceed:
+                        break
+                else:
+                    ccm.transaction_commit(tid)
+                    ccm.transaction_commit_flushed(tid)
+                    ccm.transaction_end(tid)
+                    commits += 1
+                    break
+            except Exception:
+                pass  # aborted between its last request and the commit
+            aborts += 1
+            wasted += ccm.transactions[tid]['locks_acquired']
+            if ccm.transactions[tid]['status'] == TransactionStatus.ACTIVE:
+                ccm.transaction_rollback(tid)
+            ccm.transaction_abort(tid)
+            ccm.transaction_end(tid)
+    results.append((commits, aborts, wasted))
+
+def bench(deadlock_victim_policy):
+    ccm = LockBasedConcurrencyControlManager(
+        retention_policy=RetentionPolicy(max_terminated=0),
+        deadlock_victim_policy=deadlock_victim_policy,
+        # favour transactions that started first
+        deadlock_victim_priority=lambda transaction_id: -transaction_id,
+    )
+    stop = threading.Event()
+    results = []
+    threads = [threading.Thread(target=worker, args=(ccm, seed, stop, results)) for seed in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    commits, aborts, wasted = (sum(column) for column in zip(*results))
+    return commits / DURATION, aborts, wasted / max(commits, 1)
+
+if __name__ == '__main__':
+    print("="*64)
+    print(f"DEADLOCK VICTIM SELECTION ({THREADS} threads, 2-12 of {TABLES} tables)")
+    print("="*64)
+    print(f"{'policy':>14} | {'commits/s':>10} | {'aborts':>8} | {'wasted locks/commit':>20}")
+    for policy in DeadlockVictimPolicy:
+        throughput, aborts, wasted = bench(policy)
+        print(f"{policy.value:>14} | {throughput:>10.0f} | {aborts:>8} | {wasted:>20.2f}")
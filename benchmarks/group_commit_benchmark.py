@@ -0,0 +1,68 @@
+"""
+Benchmark: validation-based commits per second with one validation per
+commit vs group commit, for 1 to 32 committing threads.
+
+Every thread runs short transactions that read a few tables and write one,
+out of a shared pool, then commit and flush. With group commit the
+transactions queued while one validation group runs are validated together
+by the next committer; the average group size is reported next to the rate.
+"""
+
+import sys
+import os
+import random
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.retention_policy import RetentionPolicy
+from src.row_action import TableAction
+
+TRANSACTIONS = 16000
+TABLES = 256
+READS = 4
+
+def worker(ccm, transactions, seed, counts):
+    rng = random.Random(seed)
+    committed = 0
+    for _ in range(transactions):
+        tid = ccm.transaction_begin()
+        requests = [(TableAction.READ, f'table_{rng.randrange(TABLES)}') for _ in range(READS)]
+        requests.append((TableAction.WRITE, f'table_{rng.randrange(TABLES)}'))
+        ccm.transaction_query_many(tid, requests)
+        if ccm.transaction_commit(tid).can_proceed:
+            ccm.transaction_commit_flushed(tid)
+            committed += 1
+        ccm.transaction_end(tid)
+    counts.append(committed)
+
+def bench(thread_count, group_commit):
+    ccm = ValidationBasedConcurrencyControlManager(
+        retention_policy=RetentionPolicy(max_terminated=0),
+        group_commit=group_commit,
+    )
+    per_thread = TRANSACTIONS // thread_count
+    counts = []
+    threads = [
+        threading.Thread(target=worker, args=(ccm, per_thread, i, counts))
+        for i in range(thread_count)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    group_size = per_thread * thread_count / ccm.commit_group_count if ccm.commit_group_count else 1
+    return sum(counts) / elapsed, group_size
+
+if __name__ == '__main__':
+    print("="*64)
+    print(f"GROUP COMMIT ({READS} reads + 1 write over {TABLES} tables)")
+    print("="*64)
+    print(f"{'threads':>7} | {'single commits/s':>16} | {'group commits/s':>15} | {'group size':>10}")
+    for thread_count in (1, 2, 4, 8, 16, 32):
+        single, _ = bench(thread_count, False)
+        group, group_size = bench(thread_count, True)
+        print(f"{thread_count:>7} | {single:>16.0f} | {group:>15.0f} | {group_size:>10.2f}")
@@ -0,0 +1,91 @@
+"""
+Benchmark: lock wait tail latency on a read-heavy hot table under each queue
+policy.
+
+Reader threads keep overlapping shared locks on one table while a few writer
+threads ask for it exclusively. Under READER_PREFERRED the readers keep the
+table shared and writers can starve, so writers give up after a timeout
+(counted separately); STRICT_FIFO and WRITER_PREFERRED bound their wait.
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.lock_queue_policy import LockQueuePolicy
+from src.retention_policy import RetentionPolicy
+from src.row_action import TableAction
+
+READERS = 8
+WRITERS = 2
+HOLD = 0.002        #seconds each transaction keeps the lock
+DURATION = 2.0
+WRITE_TIMEOUT = 1.0
+
+def run_transaction(ccm, table_action, timeout):
+    """Returns (seconds spent waiting for the lock, whether it was granted)"""
+    tid = ccm.transaction_begin()
+    start = time.perf_counter()
+    r = ccm.acquire(tid, table_action, 'hot', timeout=timeout)
+    waited = time.perf_counter() - start
+    if r.can_proceed:
+        time.sleep(HOLD)
+        ccm.transaction_commit(tid)
+        ccm.transaction_commit_flushed(tid)
+    else:
+        if not r.should_rollback:
+            ccm.transaction_rollback(tid)
+        ccm.transaction_abort(tid)
+    ccm.transaction_end(tid)
+    return waited, r.can_proceed
+
+def percentile(samples, fraction):
+    if not samples:
+        return float('nan')
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def bench(policy):
+    ccm = LockBasedConcurrencyControlManager(
+        retention_policy=RetentionPolicy.immediate(),
+        lock_queue_policy=policy,
+    )
+    waits = {TableAction.READ: [], TableAction.WRITE: []}
+    timed_out = [0]
+    stop_at = time.monotonic() + DURATION
+
+    def worker(table_action, timeout):
+        while time.monotonic() < stop_at:
+            waited, granted = run_transaction(ccm, table_action, timeout)
+            if granted:
+                waits[table_action].append(waited)
+            else:
+                timed_out[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(TableAction.READ, None)) for _ in range(READERS)]
+    threads += [threading.Thread(target=worker, args=(TableAction.WRITE, WRITE_TIMEOUT)) for _ in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ccm.close()
+    return waits, timed_out[0]
+
+if __name__ == '__main__':
+    print("="*78)
+    print(f"LOCK WAIT LATENCY (ms) - {READERS} readers, {WRITERS} writers on one table")
+    print("="*78)
+    print(f"{'policy':>18} | {'action':>6} | {'granted':>8} | {'p50':>7} | {'p99':>7} | {'max':>7} | {'timeouts':>8}")
+    for policy in LockQueuePolicy:
+        waits, timed_out = bench(policy)
+        for table_action in (TableAction.READ, TableAction.WRITE):
+            samples = waits[table_action]
+            print(
+                f"{policy.value:>18} | {table_action.value:>6} | {len(samples):>8} | "
+                f"{percentile(samples, 0.5) * 1000:>7.2f} | {percentile(samples, 0.99) * 1000:>7.2f} | "
+                f"{max(samples, default=float('nan')) * 1000:>7.2f} | "
+                f"{timed_out if table_action == TableAction.WRITE else 0:>8}"
+            )
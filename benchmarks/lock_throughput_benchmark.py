@@ -0,0 +1,72 @@
+"""
+Benchmark: multi-threaded lock manager throughput with 1-64 worker threads,
+comparing a single-stripe lock table against the default striped one.
+
+Every worker runs short transactions that write two tables drawn from a
+large pool, so most requests touch unrelated tables.
+"""
+
+import sys
+import os
+import random
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.retention_policy import RetentionPolicy
+from src.row_action import TableAction
+
+TABLES = [f'table_{i}' for i in range(4096)]
+TRANSACTIONS_TOTAL = 12800
+
+def run_transaction(ccm, rnd):
+    tid = ccm.transaction_begin()
+    for table in rnd.sample(TABLES, 2):
+        while True:
+            r = ccm.transaction_query(tid, TableAction.WRITE, table)
+            if not r.should_retry:
+                break
+            event = ccm.get_wait_event(tid)
+            if event is not None:
+                event.wait(0.01)
+        if r.should_rollback:
+            ccm.transaction_abort(tid)
+            ccm.transaction_end(tid)
+            return False
+    ccm.transaction_commit(tid)
+    ccm.transaction_commit_flushed(tid)
+    ccm.transaction_end(tid)
+    return True
+
+def bench(thread_count, stripes):
+    ccm = LockBasedConcurrencyControlManager(
+        retention_policy=RetentionPolicy.immediate(),
+        lock_table_stripes=stripes,
+    )
+    per_thread = TRANSACTIONS_TOTAL // thread_count
+
+    def worker(seed):
+        rnd = random.Random(seed)
+        for _ in range(per_thread):
+            run_transaction(ccm, rnd)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    ccm.close()
+    return per_thread * thread_count / elapsed
+
+if __name__ == '__main__':
+    print("="*60)
+    print("LOCK MANAGER THROUGHPUT (transactions/sec)")
+    print("="*60)
+    print(f"{'threads':>8} | {'1 stripe':>12} | {'64 stripes':>12}")
+    for thread_count in (1, 2, 4, 8, 16, 32, 64):
+        single = bench(thread_count, 1)
+        striped = bench(thread_count, 64)
+        print(f"{thread_count:>8} | {single:>12.0f} | {striped:>12.0f}")
@@ -0,0 +1,57 @@
+"""
+Benchmark: read/write sets as Python sets of table names vs ResourceSet
+bitmaps over interned ids. Measures the rw/ww conflict check of one
+validation against a committed write set, and the memory one set takes,
+for transactions of growing width.
+"""
+
+import sys
+import os
+import random
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.resource_registry import ResourceRegistry, ResourceSet
+
+TABLES = 2048
+CHECKS = 20000
+
+def make_sets(width):
+    rng = random.Random(width)
+    registry = ResourceRegistry()
+    for i in range(TABLES):
+        registry.intern(f'table_{i}')
+    names = [
+        [f'table_{i}' for i in rng.sample(range(TABLES), width)]
+        for _ in range(3)
+    ]
+    plain = [set(group) for group in names]
+    bitmaps = [ResourceSet(registry, group) for group in names]
+    return plain, bitmaps
+
+def bench_plain(read_set, write_set, other_write_set):
+    start = time.perf_counter()
+    for _ in range(CHECKS):
+        (other_write_set & read_set) or (other_write_set & write_set)
+    return (time.perf_counter() - start) / CHECKS
+
+def bench_bitmap(read_set, write_set, other_write_set):
+    other_bits = other_write_set.bits
+    start = time.perf_counter()
+    for _ in range(CHECKS):
+        other_bits & (read_set.bits | write_set.bits)
+    return (time.perf_counter() - start) / CHECKS
+
+if __name__ == '__main__':
+    print("="*72)
+    print(f"READ/WRITE SETS ({TABLES} tables)")
+    print("="*72)
+    print(f"{'width':>6} | {'set check':>10} | {'bits check':>10} | {'set bytes':>10} | {'bits bytes':>10}")
+    for width in (4, 32, 256, 1024):
+        plain, bitmaps = make_sets(width)
+        plain_time = bench_plain(*plain)
+        bitmap_time = bench_bitmap(*bitmaps)
+        print(
+            f"{width:>6} | {plain_time * 1e6:>8.2f}us | {bitmap_time * 1e6:>8.2f}us"
+            f" | {sys.getsizeof(plain[0]):>10} | {sys.getsizeof(bitmaps[0].bits):>10}"
+        )
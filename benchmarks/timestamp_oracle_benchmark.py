@@ -0,0 +1,41 @@
+"""
+Benchmark: timestamps per second from a TimestampOracle shared by several
+threads, reading the shared clock on every call (lease_size 1) vs handing
+out timestamps from per-thread leased ranges.
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.timestamp_oracle import TimestampOracle
+
+TIMESTAMPS = 400000
+LEASE_SIZES = (1, 16, 256)
+
+def bench(lease_size, thread_count):
+    oracle = TimestampOracle(lease_size=lease_size)
+    per_thread = TIMESTAMPS // thread_count
+
+    def worker():
+        allocate = oracle.allocate
+        for _ in range(per_thread):
+            allocate()
+
+    threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return per_thread * thread_count / (time.perf_counter() - start)
+
+if __name__ == '__main__':
+    print("="*60)
+    print("TIMESTAMP ORACLE (timestamps/s)")
+    print("="*60)
+    print(f"{'threads':>7} | " + " | ".join(f"{f'lease {size}':>10}" for size in LEASE_SIZES))
+    for thread_count in (1, 2, 4, 8, 16):
+        print(f"{thread_count:>7} | " + " | ".join(f"{bench(size, thread_count):>10.0f}" for size in LEASE_SIZES))
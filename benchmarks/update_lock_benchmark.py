@@ -0,0 +1,80 @@
+"""
+Benchmark: read-modify-write transactions with READ then WRITE (S upgraded
+to X) vs READ_FOR_UPDATE then WRITE (U converted to X).
+
+Worker threads read a few hot tables and then write the same tables, using
+the blocking acquire(). Two transactions upgrading S locks on the same table
+deadlock; with update locks the second one queues behind the first instead.
+"""
+
+import sys
+import os
+import random
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.retention_policy import RetentionPolicy
+from src.row_action import TableAction
+from src.transaction_status import TransactionStatus
+
+THREADS = 8
+TABLES = 8
+TABLES_PER_TRANSACTION = 2
+DURATION = 2.0
+
+def worker(ccm, read_action, seed, stop, results):
+    rnd = random.Random(seed)
+    commits = aborts = deadlocks = 0
+    while not stop.is_set():
+        tables = sorted(f'table_{table}' for table in rnd.sample(range(TABLES), TABLES_PER_TRANSACTION))
+        while not stop.is_set():
+            tid = ccm.transaction_begin()
+            try:
+                requests = [(read_action, table_name) for table_name in tables]
+                requests += [(TableAction.WRITE, table_name) for table_name in tables]
+                for table_action, table_name in requests:
+                    response = ccm.acquire(tid, table_action, table_name, timeout=1.0)
+                    if not response.can_proceed:
+                        break
+                else:
+                    ccm.transaction_commit(tid)
+                    ccm.transaction_commit_flushed(tid)
+                    ccm.transaction_end(tid)
+                    commits += 1
+                    break
+            except Exception:
+                pass  # aborted between its last request and the commit
+            aborts += 1
+            if 'Deadlock' in (ccm.transactions[tid].get('abort_reason') or ''):
+                deadlocks += 1
+            if ccm.transactions[tid]['status'] == TransactionStatus.ACTIVE:
+                ccm.transaction_rollback(tid)
+            ccm.transaction_abort(tid)
+            ccm.transaction_end(tid)
+    results.append((commits, aborts, deadlocks))
+
+def bench(read_action):
+    ccm = LockBasedConcurrencyControlManager(retention_policy=RetentionPolicy(max_terminated=0))
+    stop = threading.Event()
+    results = []
+    threads = [threading.Thread(target=worker, args=(ccm, read_action, seed, stop, results)) for seed in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    ccm.close()
+    commits, aborts, deadlocks = (sum(column) for column in zip(*results))
+    return commits / DURATION, aborts, deadlocks
+
+if __name__ == '__main__':
+    print("="*60)
+    print(f"READ-MODIFY-WRITE ({THREADS} threads, {TABLES_PER_TRANSACTION} of {TABLES} tables)")
+    print("="*60)
+    print(f"{'first access':>16} | {'commits/s':>10} | {'aborts':>8} | {'deadlocks':>9}")
+    for read_action in (TableAction.READ, TableAction.READ_FOR_UPDATE):
+        throughput, aborts, deadlocks = bench(read_action)
+        print(f"{read_action.value:>16} | {throughput:>10.0f} | {aborts:>8} | {deadlocks:>9}")
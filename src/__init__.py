@@ -1,6 +1,17 @@
 from .transaction_status import TransactionStatus
-from .row_action import TableAction
+from .row_action import RowAction, TableAction
+from .reason_code import ReasonCode
 from .concurrency_response import ConcurrencyResponse
+from .retention_policy import RetentionPolicy
+from .timestamp_oracle import TimestampOracle
+from .resource_registry import ResourceRegistry, ResourceSet
+from .conflict_matrix import ConflictMatrix
+from .deadlock_detection import DeadlockDetection
+from .deadlock_prevention import DeadlockPrevention
+from .deadlock_victim_policy import DeadlockVictimPolicy
+from .lock_queue_policy import LockQueuePolicy
+from .lock_mode import LockMode
 from .concurrency_control_manager import ConcurrencyControlManager
 from .lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from .async_lock_based_concurrency_control_manager import AsyncLockBasedConcurrencyControlManager
 from .timestamp_based_concurrency_control_manager import TimestampBasedConcurrencyControlManager
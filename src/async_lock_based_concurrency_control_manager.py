@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from .row_action import TableAction
+from .concurrency_response import ConcurrencyResponse
+from .lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+
+class LoopWaitEvent:
+    """
+    Wait event of one transaction for an asyncio front end: set() and clear()
+    behave like threading.Event's and may be called from any thread, wait() is
+    a coroutine backed by a future of the manager's event loop, so a waiting
+    coroutine costs no thread.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.flag = False
+        # future the current wait() awaits, created on demand
+        self.future = None
+        # set() may come from the deadlock detector thread or a synchronous client
+        self.lock = threading.Lock()
+
+    def is_set(self) -> bool:
+        return self.flag
+
+    def set(self) -> None:
+        with self.lock:
+            self.flag = True
+            future, self.future = self.future, None
+        if future is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            self.__resolve(future)
+        else:
+            self.loop.call_soon_threadsafe(self.__resolve, future)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.flag = False
+
+    async def wait(self, timeout: float | None = None) -> bool:
+        """
+        Wait until the event is set or timeout (seconds) runs out.
+
+        Returns:
+            True if the event was set
+        """
+        with self.lock:
+            if self.flag:
+                return True
+            if self.future is None or self.future.done():
+                self.future = self.loop.create_future()
+            future = self.future
+        if timeout is None:
+            await future
+            return True
+        try:
+            # shielded, so a timeout leaves the future for a later wait() of the same wait
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.flag
+
+    @staticmethod
+    def __resolve(future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_result(True)
+
+class AsyncLockBasedConcurrencyControlManager(LockBasedConcurrencyControlManager):
+    """
+    Lock-based manager for asyncio clients. Requests are the same
+    non-blocking calls as the threaded manager's and run inline on the event
+    loop (they only ever take short latches); acquire() is a coroutine that
+    parks the transaction on a loop future until its lock is handed over, so
+    one loop drives any number of waiting transactions without a thread each.
+    Releases wake only the transactions they granted a lock to or aborted.
+    """
+
+    def __init__(self, *args, loop: asyncio.AbstractEventLoop | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # bound to the running loop on the first wait unless given
+        self.loop = loop
+
+    def _new_wait_event(self) -> LoopWaitEvent:
+        if self.loop is None:
+            try:
+                self.loop = asyncio.get_running_loop()
+            except RuntimeError:
+                raise Exception('AsyncLockBasedConcurrencyControlManager needs an event loop, create it inside one or pass loop')
+        return LoopWaitEvent(self.loop)
+
+    async def acquire(self, transaction_id: int, table_action: TableAction, table_name: str, timeout: float | None = None, wait_timeout: float | None = None) -> ConcurrencyResponse:
+        """
+        Awaitable variant of transaction_query: suspends the calling coroutine
+        until the lock is granted or the transaction fails, and returns that
+        final response. If timeout (seconds) runs out first, the last WAITING
+        response is returned and the transaction may retry; wait_timeout
+        instead aborts it like transaction_query's.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            response = self.transaction_query(transaction_id, table_action, table_name, wait_timeout=wait_timeout)
+            if not response.should_retry:
+                return response
+            if deadline is not None and time.monotonic() >= deadline:
+                return response
+            # registration cleared the event, so a handoff after our request is not missed
+            await self.transactions[transaction_id]['wait_event'].wait(self._acquire_wait_time(deadline))
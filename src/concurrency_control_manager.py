@@ -1,11 +1,28 @@
+import threading
+import time
+from collections import deque
+
 from .transaction_status import TransactionStatus
 from .row_action import TableAction
-from .concurrency_response import ConcurrencyResponse
+from .concurrency_response import ConcurrencyResponse, LockStatus
+from .reason_code import ReasonCode
+from .retention_policy import RetentionPolicy
+from .transaction_id_allocator import TransactionIdAllocator
+from .timestamp_oracle import TimestampOracle
 
 class ConcurrencyControlManager:
 
-    def __init__(self):
+    def __init__(self, retention_policy: RetentionPolicy | None = None, timestamp_oracle: TimestampOracle | None = None):
         self.transactions = {}
+        # ids of transactions currently in ACTIVE state, kept in sync by _transaction_set_status
+        self.active_transactions = set()
+        self.transaction_ids = TransactionIdAllocator()
+        # logical clock for begin, validation and finish timestamps; may be shared between managers
+        self.timestamp_oracle = timestamp_oracle or TimestampOracle()
+        self.retention_policy = retention_policy or RetentionPolicy.keep_all()
+        # (transaction_id, ended_at) of retained TERMINATED transactions, oldest first
+        self.terminated_transactions = deque()
+        self.reap_lock = threading.Lock()
 
     def transaction_exists(self, transaction_id: int) -> bool:
         return transaction_id in self.transactions
@@ -27,25 +44,93 @@ class ConcurrencyControlManager:
             return
         raise Exception(f'Transaction with id {transaction_id} is not active')
 
+    def _transaction_set_status(self, transaction_id: int, status: TransactionStatus) -> None:
+        """Move a transaction to a new status and keep the active index up to date"""
+        self.transactions[transaction_id]['status'] = status
+        if status == TransactionStatus.ACTIVE:
+            self.active_transactions.add(transaction_id)
+        else:
+            self.active_transactions.discard(transaction_id)
+
+    def _transaction_is_reapable(self, transaction_id: int) -> bool:
+        """Whether a TERMINATED transaction may be evicted; subclasses veto if they still need it"""
+        return True
+
+    def _reap_terminated_transactions(self) -> None:
+        """Evict TERMINATED transactions the retention policy no longer wants to keep"""
+        if self.retention_policy.retains_all:
+            return
+        with self.reap_lock:
+            now = time.monotonic()
+            while self.terminated_transactions:
+                transaction_id, ended_at = self.terminated_transactions[0]
+                if not self.retention_policy.should_evict(len(self.terminated_transactions), now - ended_at):
+                    break
+                if not self._transaction_is_reapable(transaction_id):
+                    break
+                self.terminated_transactions.popleft()
+                self.transactions.pop(transaction_id, None)
+
     def transaction_begin(self) -> int:
-        transaction_id = len(self.transactions) + 1
+        # age-based retention has nothing else to trigger it when no transaction ends
+        if self.terminated_transactions:
+            self._reap_terminated_transactions()
+        transaction_id = self.transaction_ids.allocate()
         self.transactions[transaction_id] = {
-            'status': TransactionStatus.ACTIVE
+            'status': TransactionStatus.ACTIVE,
+            # granted_responses[(reason_code, reason_args)] = GRANTED response shared by its requests
+            'granted_responses': {},
         }
+        self.active_transactions.add(transaction_id)
         return transaction_id
 
+    def _granted(self, transaction_id: int, transaction: dict, reason_code: ReasonCode, *reason_args, active_transactions=None) -> ConcurrencyResponse:
+        """
+        GRANTED response for a request of the transaction, created on the first
+        request with this reason and returned again for the later ones, so the
+        common repeated request allocates nothing. Reasons whose args are not
+        interned (see _grant_is_interned) get a new response each time.
+        
+        Returns:
+            The shared response
+        """
+        key = (reason_code, reason_args)
+        response = transaction['granted_responses'].get(key)
+        if response is None:
+            response = ConcurrencyResponse(
+                transaction_id, reason_code, LockStatus.GRANTED,
+                active_transactions=active_transactions, reason_args=reason_args
+            )
+            if self._grant_is_interned(reason_args):
+                transaction['granted_responses'][key] = response
+        return response
+
+    def _grant_is_interned(self, reason_args: tuple) -> bool:
+        """
+        Whether the GRANTED response for these reason args is kept for reuse.
+        The cache lives as long as the transaction, so it only pays off while a
+        transaction can produce few distinct args (e.g. one per table).
+        
+        Returns:
+            True to keep the response in granted_responses
+        """
+        return True
+
     def transaction_end(self, transaction_id: int) -> None:
         self.transaction_assert_exists(transaction_id)
         transaction = self.transactions[transaction_id]
         if transaction['status'] not in [TransactionStatus.COMMITTED, TransactionStatus.ABORTED]:
             raise Exception(f'Transaction with id {transaction_id} cannot end without COMMIT/ROLLBACK')
-        transaction['status'] = TransactionStatus.TERMINATED
+        self._transaction_set_status(transaction_id, TransactionStatus.TERMINATED)
+        if not self.retention_policy.retains_all:
+            self.terminated_transactions.append((transaction_id, time.monotonic()))
+            self._reap_terminated_transactions()
 
     def transaction_commit(self, transaction_id: int) -> ConcurrencyResponse:
         self.transaction_assert_exists(transaction_id)
         self.transaction_assert_queryable(transaction_id)
         transaction = self.transactions[transaction_id]
-        transaction['status'] = TransactionStatus.PARTIALLY_COMMITTED
+        self._transaction_set_status(transaction_id, TransactionStatus.PARTIALLY_COMMITTED)
         pass
 
     def transaction_commit_flushed(self, transaction_id: int) -> None:
@@ -53,24 +138,38 @@ class ConcurrencyControlManager:
         transaction = self.transactions[transaction_id]
         if transaction['status'] != TransactionStatus.PARTIALLY_COMMITTED:
             raise Exception(f'Transaction with id {transaction_id} is not partially committed')
-        transaction['status'] = TransactionStatus.COMMITTED
+        self._transaction_set_status(transaction_id, TransactionStatus.COMMITTED)
 
     def transaction_rollback(self, transaction_id: int) -> None:
         self.transaction_assert_exists(transaction_id)
         self.transaction_assert_queryable(transaction_id)
         transaction = self.transactions[transaction_id]
-        transaction['status'] = TransactionStatus.FAILED
+        self._transaction_set_status(transaction_id, TransactionStatus.FAILED)
 
     def transaction_abort(self, transaction_id: int) -> None:
         self.transaction_assert_exists(transaction_id)
         transaction = self.transactions[transaction_id]
         if transaction['status'] != TransactionStatus.FAILED:
             raise Exception(f'Transaction with id {transaction_id} is not in failed state')
-        transaction['status'] = TransactionStatus.ABORTED
+        self._transaction_set_status(transaction_id, TransactionStatus.ABORTED)
 
     def transaction_query(self, transaction_id: int, table_action: TableAction, table_name: str) -> ConcurrencyResponse:
         self.transaction_assert_exists(transaction_id)
         self.transaction_assert_queryable(transaction_id)
         pass
 
+    def transaction_query_many(self, transaction_id: int, requests: list[tuple[TableAction, str]]) -> ConcurrencyResponse:
+        """
+        Run every (table_action, table_name) request of one statement in a single
+        call. Stops at the first request that is not granted and returns its
+        response; otherwise one GRANTED response covers the whole batch.
+        """
+        self.transaction_assert_exists(transaction_id)
+        self.transaction_assert_queryable(transaction_id)
+        for table_action, table_name in requests:
+            response = self.transaction_query(transaction_id, table_action, table_name)
+            if not response.can_proceed:
+                return response
+        return ConcurrencyResponse(transaction_id, ReasonCode.REQUESTS_GRANTED, LockStatus.GRANTED, reason_args=(len(requests), 'granted'))
+
 ConcurrencyControlManager.instance = None
@@ -1,4 +1,5 @@
 from enum import Enum
+from .reason_code import ReasonCode
 
 class LockStatus(Enum):
     GRANTED = 'granted'           #lock acquired, proceed
@@ -6,21 +7,56 @@ class LockStatus(Enum):
     FAILED = 'failed'             #transaction failed (aborted, invalid, or protocol violation)
 
 class ConcurrencyResponse:
-    def __init__(self, transaction_id, reason, status, blocked_by=None, active_transactions=None):
+    """
+    Outcome of one request. The reason is a ReasonCode with its parameters in
+    reason_args; the message is only formatted when .reason is read, since
+    callers mostly branch on the status alone. A ready message may be passed
+    as reason instead (code MESSAGE).
+
+    GRANTED responses are shared between requests of a transaction with the
+    same reason (see ConcurrencyControlManager._granted), so responses must
+    not be modified.
+    """
+
+    __slots__ = ('transaction_id', 'status', 'reason_code', 'reason_args', '_reason', '_blocked_by', '_active_transactions')
+
+    def __init__(self, transaction_id, reason, status, blocked_by=None, active_transactions=None, reason_args: tuple = ()):
         self.transaction_id = transaction_id
-        self.reason = reason
         self.status = status
-        self.blocked_by = blocked_by or []
-        self.active_transactions = active_transactions or []
-    
+        if isinstance(reason, ReasonCode):
+            self.reason_code = reason
+            self.reason_args = reason_args
+            self._reason = None
+        else:
+            self.reason_code = ReasonCode.MESSAGE
+            self.reason_args = (reason,)
+            self._reason = reason
+        self._blocked_by = blocked_by or None
+        # may be a live view (e.g. the manager's active set), read when accessed
+        self._active_transactions = active_transactions
+
+    @property
+    def reason(self) -> str:
+        if self._reason is None:
+            self._reason = self.reason_code.format(*self.reason_args)
+        return self._reason
+
+    @property
+    def blocked_by(self) -> list[int]:
+        return list(self._blocked_by) if self._blocked_by is not None else []
+
+    @property
+    def active_transactions(self) -> list[int]:
+        return sorted(self._active_transactions or ())
+
     @property
     def should_retry(self) -> bool:
         return self.status == LockStatus.WAITING
-    
+
     @property
     def should_rollback(self) -> bool:
         return self.status == LockStatus.FAILED
-    
+
     @property
     def can_proceed(self) -> bool:
         return self.status == LockStatus.GRANTED
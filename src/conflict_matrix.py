@@ -0,0 +1,118 @@
+from .resource_registry import ResourceRegistry, ResourceSet
+
+def _numpy():
+    """NumPy, imported on first use so the package works without it"""
+    try:
+        import numpy
+    except ImportError:
+        raise Exception('ConflictMatrix needs NumPy (pip install numpy)') from None
+    return numpy
+
+class ConflictMatrix:
+    """
+    Pairwise conflicts of a batch of transactions, given their read and write
+    sets, computed with NumPy: the sets become 0/1 incidence matrices over the
+    interned tables (transactions x resources) and all pairs are checked with
+    one matrix product.
+
+    conflicts[i, j] is True when transaction i wrote a resource j read or
+    wrote, i.e. j cannot be validated after i has committed (rw or ww
+    conflict). Indexes follow the order of the sets passed in.
+
+    Sets may be ResourceSets of the registry (their bitmaps are used as they
+    are) or any iterables of names, which are interned into it.
+    """
+
+    # rows of the product computed at a time, bounds the float32 temporaries
+    BLOCK_ROWS = 1024
+
+    def __init__(self, read_sets, write_sets, registry: ResourceRegistry | None = None):
+        np = _numpy()
+        read_sets = list(read_sets)
+        write_sets = list(write_sets)
+        if len(read_sets) != len(write_sets):
+            raise Exception(f'Got {len(read_sets)} read sets and {len(write_sets)} write sets')
+        self.registry = registry if registry is not None else ResourceRegistry()
+        read_bits = [self.__bitmap(resources) for resources in read_sets]
+        write_bits = [self.__bitmap(resources) for resources in write_sets]
+
+        columns = len(self.registry)
+        self.reads = self.__incidence(np, read_bits, columns)
+        self.writes = self.__incidence(np, write_bits, columns)
+
+        writes = self.writes.astype(np.float32)
+        accessed = (self.reads | self.writes).astype(np.float32).T
+        count = len(read_bits)
+        self.conflicts = np.zeros((count, count), dtype=bool)
+        for start in range(0, count, self.BLOCK_ROWS):
+            stop = min(start + self.BLOCK_ROWS, count)
+            self.conflicts[start:stop] = writes[start:stop] @ accessed > 0
+        np.fill_diagonal(self.conflicts, False)
+
+    def __bitmap(self, resources) -> int:
+        if isinstance(resources, ResourceSet) and resources.registry is self.registry:
+            return resources.bits
+        return ResourceSet(self.registry, resources).bits
+
+    @staticmethod
+    def __incidence(np, bitmaps: list[int], columns: int):
+        """0/1 matrix with row i holding bitmap i, one column per resource id"""
+        row_bytes = (columns + 7) // 8
+        packed = np.frombuffer(
+            b''.join(bits.to_bytes(row_bytes, 'little') for bits in bitmaps),
+            dtype=np.uint8
+        ).reshape(len(bitmaps), row_bytes)
+        return np.unpackbits(packed, axis=1, count=columns, bitorder='little')
+
+    def __len__(self) -> int:
+        return len(self.conflicts)
+
+    def conflict_density(self) -> float:
+        """Fraction of the transaction pairs that conflict in either direction"""
+        count = len(self)
+        if count < 2:
+            return 0.0
+        either = self.conflicts | self.conflicts.T
+        return float(either.sum()) / (count * (count - 1))
+
+    def select(self, order=None, symmetric: bool = False) -> tuple[list[int], dict[int, int]]:
+        """
+        Greedily pick transactions in order (default: index order), taking each
+        one that no transaction taken before it conflicts with. The result is
+        maximal: every transaction left out conflicts with one that was taken.
+
+        By default a transaction is only left out when an earlier pick wrote
+        what it read or wrote, which is what validating them one after the
+        other would do. With symmetric also a transaction that wrote what an
+        earlier pick read is left out, so no two picks touch a resource one of
+        them wrote.
+
+        Returns:
+            (picked indexes in order, {left out index: earliest pick it conflicts with})
+        """
+        np = _numpy()
+        count = len(self)
+        order = range(count) if order is None else order
+        conflicts = self.conflicts | self.conflicts.T if symmetric else self.conflicts
+        # blocked_by[i] = earliest pick that conflicts with i, -1 while none
+        blocked_by = np.full(count, -1, dtype=np.int64)
+        picked = []
+        left_out = {}
+        for i in order:
+            blocker = int(blocked_by[i])
+            if blocker >= 0:
+                left_out[i] = blocker
+                continue
+            picked.append(i)
+            newly_blocked = conflicts[i] & (blocked_by < 0)
+            blocked_by[newly_blocked] = i
+        return picked, left_out
+
+    def non_conflicting_subset(self, order=None, symmetric: bool = False) -> list[int]:
+        """
+        Indexes of a maximal set of transactions that can commit together, see select()
+
+        Returns:
+            The picked indexes in order
+        """
+        return self.select(order, symmetric)[0]
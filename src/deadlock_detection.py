@@ -0,0 +1,7 @@
+from enum import Enum
+
+class DeadlockDetection(Enum):
+    DFS = 'dfs'                   #full DFS from the requester on every conflict
+    INCREMENTAL = 'incremental'   #dynamic topological order, only re-checks the affected region
+    PERIODIC = 'periodic'         #background DeadlockDetector thread, nothing on the conflict path
+    NONE = 'none'                 #no cycle search at all, waits are bounded by lock wait timeouts only
@@ -0,0 +1,153 @@
+import threading
+from .reason_code import ReasonCode
+from .deadlock_victim_policy import DeadlockVictimPolicy
+
+class DeadlockDetector:
+    """
+    Background thread that periodically looks for deadlocks in a lock manager's
+    wait-for graph, as an alternative to checking on every lock conflict.
+    
+    Each pass snapshots the graph, finds all strongly connected components in one
+    Tarjan pass and aborts a set of victims that breaks every cycle, chosen by
+    the manager's deadlock victim policy (or, under REQUESTER, small and cheap).
+    The interval shrinks while deadlocks keep showing up and grows back when the
+    graph stays acyclic.
+    """
+
+    def __init__(self, manager, interval: float = 0.1, min_interval: float | None = None, max_interval: float | None = None):
+        # by default the interval adapts within one order of magnitude either way
+        min_interval = interval / 10 if min_interval is None else min_interval
+        max_interval = interval * 10 if max_interval is None else max_interval
+        if not 0 < min_interval <= interval <= max_interval:
+            raise Exception(f'Invalid detector intervals: min={min_interval}, interval={interval}, max={max_interval}')
+        self.manager = manager
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.deadlocks_resolved = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.__run, name='deadlock-detector', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def __run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            victims = self.run_once()
+            if victims:
+                self.interval = max(self.min_interval, self.interval / 2)
+            else:
+                self.interval = min(self.max_interval, self.interval * 1.5)
+
+    def run_once(self) -> list[int]:
+        """Run a single detection pass and abort the chosen victims"""
+        with self.manager.wait_for_lock:
+            graph = {waiter: set(holders) for waiter, holders in self.manager.wait_for_graph.items()}
+        
+        victims = []
+        for component in self.strongly_connected_components(graph):
+            if len(component) > 1:
+                victims.extend(self.select_victims(graph, component))
+        
+        for victim in victims:
+            if self.manager._abort_transaction(victim, ReasonCode.DEADLOCK_VICTIM, (victim,)):
+                self.deadlocks_resolved += 1
+        return victims
+
+    def select_victims(self, graph: dict, component: set) -> list[int]:
+        """
+        Greedily pick victims inside one strongly connected component until it is
+        acyclic. Each round takes the transaction the manager's victim policy
+        ranks first, then re-splits what is left, so unrelated sub-cycles are
+        handled independently. REQUESTER has no requester here, so it takes the
+        lowest abort cost per cycle-path through a transaction (in-degree *
+        out-degree within the component) instead.
+        """
+        rank = self.manager._deadlock_victim_rank
+        by_cost = self.manager.deadlock_victim_policy == DeadlockVictimPolicy.REQUESTER
+        victims = []
+        pending = [component]
+        while pending:
+            nodes = pending.pop()
+            subgraph = {node: graph.get(node, set()) & nodes for node in nodes}
+            in_degree = dict.fromkeys(nodes, 0)
+            for holders in subgraph.values():
+                for holder in holders:
+                    in_degree[holder] += 1
+            
+            def score(node):
+                # every node of a cycle has in- and out-edges; ties go to the youngest
+                paths = in_degree[node] * len(subgraph[node])
+                return (self.manager._deadlock_victim_cost(node) / paths, *rank(node))
+            
+            victim = min(nodes, key=score if by_cost else rank)
+            victims.append(victim)
+            
+            remaining = nodes - {victim}
+            subgraph = {node: subgraph[node] & remaining for node in remaining}
+            for rest in self.strongly_connected_components(subgraph):
+                if len(rest) > 1:
+                    pending.append(rest)
+        return victims
+
+    @staticmethod
+    def strongly_connected_components(graph: dict) -> list[set]:
+        """Iterative Tarjan's algorithm over an adjacency dict"""
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+        
+        nodes = set(graph)
+        for targets in graph.values():
+            nodes.update(targets)
+        
+        for root in nodes:
+            if root in index:
+                continue
+            work = [(root, iter(graph.get(root, ())))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, successors = work[-1]
+                advanced = False
+                for successor in successors:
+                    if successor not in index:
+                        index[successor] = lowlink[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(graph.get(successor, ()))))
+                        advanced = True
+                        break
+                    if successor in on_stack:
+                        lowlink[node] = min(lowlink[node], index[successor])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
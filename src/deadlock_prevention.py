@@ -0,0 +1,7 @@
+from enum import Enum
+
+class DeadlockPrevention(Enum):
+    NONE = 'none'               #waits go into the wait-for graph, cycles are found by DeadlockDetection
+    WAIT_DIE = 'wait_die'       #an older requester waits for younger holders, a younger one is aborted
+    WOUND_WAIT = 'wound_wait'   #an older requester aborts younger holders, a younger one waits
+    NO_WAIT = 'no_wait'         #any conflict aborts the requester
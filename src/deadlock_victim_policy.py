@@ -0,0 +1,8 @@
+from enum import Enum
+
+class DeadlockVictimPolicy(Enum):
+    REQUESTER = 'requester'         #the transaction whose request closed the cycle
+    YOUNGEST = 'youngest'           #the cycle member that began last
+    FEWEST_LOCKS = 'fewest_locks'   #the cycle member holding the fewest S/SIX/X locks
+    LEAST_WORK = 'least_work'       #the cycle member that acquired the fewest locks so far
+    PRIORITY = 'priority'           #the cycle member with the lowest user-supplied priority
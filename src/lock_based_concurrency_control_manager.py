@@ -1,41 +1,153 @@
+import heapq
 import threading
-from .row_action import TableAction
+import time
+from .transaction_status import TransactionStatus
+from .row_action import RowAction, TableAction
 from .concurrency_response import ConcurrencyResponse, LockStatus
+from .reason_code import ReasonCode
 from .concurrency_control_manager import ConcurrencyControlManager
+from .retention_policy import RetentionPolicy
+from .deadlock_detection import DeadlockDetection
+from .deadlock_detector import DeadlockDetector
+from .deadlock_prevention import DeadlockPrevention
+from .deadlock_victim_policy import DeadlockVictimPolicy
+from .lock_table import LockTable, ResourceLock, RowResource, DATABASE
+from .lock_mode import LockMode
+from .lock_queue_policy import LockQueuePolicy
+from .timestamp_oracle import TimestampOracle
 
 class LockBasedConcurrencyControlManager(ConcurrencyControlManager):
 
-    def __init__(self):
-        super().__init__()
-        self.shared_locks = {}
-        self.exclusive_locks = {}
-        self.wait_queue = {}
-        self.timestamp_counter = 0
+    def __init__(
+        self,
+        retention_policy: RetentionPolicy | None = None,
+        deadlock_detection: DeadlockDetection = DeadlockDetection.DFS,
+        deadlock_detection_interval: float = 0.1,
+        lock_table_stripes: int = 64,
+        lock_queue_policy: LockQueuePolicy = LockQueuePolicy.STRICT_FIFO,
+        row_lock_escalation_threshold: int | None = 1000,
+        table_escalation_thresholds: dict | None = None,
+        deadlock_prevention: DeadlockPrevention = DeadlockPrevention.NONE,
+        deadlock_victim_policy: DeadlockVictimPolicy = DeadlockVictimPolicy.REQUESTER,
+        deadlock_victim_priority=None,
+        lock_wait_timeout: float | None = None,
+        timestamp_oracle: TimestampOracle | None = None,
+    ):
+        super().__init__(retention_policy, timestamp_oracle)
+        # Partitioned lock table; lock order is stripe latch -> transaction latch
+        # -> events_lock / wait_for_lock, and never two stripe latches at once
+        self.lock_table = LockTable(lock_table_stripes)
+        # Who may go first when requests queue up on a table
+        self.lock_queue_policy = lock_queue_policy
+        
+        # A transaction holding more than this many row locks on one table has
+        # them replaced by a single table lock (None never escalates);
+        # table_escalation_thresholds overrides it per table
+        self.row_lock_escalation_threshold = row_lock_escalation_threshold
+        self.table_escalation_thresholds = dict(table_escalation_thresholds or {})
+        for threshold in [row_lock_escalation_threshold, *self.table_escalation_thresholds.values()]:
+            if threshold is not None and threshold < 1:
+                raise Exception(f'Row lock escalation threshold must be positive, got {threshold}')
+        
+        # Transactions holding or requesting S, U, SIX or X on the database,
+        # guarded by the database's stripe latch. While there are none, IS and
+        # IX on the database are only recorded in each transaction's
+        # 'root_intention', so requests on unrelated tables never meet on the
+        # root's latch; the first one to join puts them in the lock table.
+        self.database_lockers = set()
         
         # Event-driven wake-up mechanism
+        # resource_waiters[resource] = {T: requested LockMode} in arrival order
+        # is the resource's request queue, released locks are handed over from it;
+        # each waiting transaction owns one reusable event in its 'wait_event'
         self.resource_waiters = {}
+        # reverse index: transaction_waits[T] = resources T is registered as waiting on
+        self.transaction_waits = {}
         self.events_lock = threading.Lock()
         
+        # A waiter still queued after lock_wait_timeout seconds (or a per-request
+        # wait_timeout, or past its transaction deadline) is aborted.
+        # wait_deadlines is a heap of (deadline, T), guarded by events_lock;
+        # entries of waits that already ended are skipped when popped
+        self.lock_wait_timeout = lock_wait_timeout
+        self.wait_deadlines = []
+        
         # Wait-for graph for deadlock detection
         # wait_for_graph[T1] = {T2, T3} means T1 is waiting for T2 and T3
+        # waited_by_graph is the reverse: waited_by_graph[T2] = {T1}
         self.wait_for_graph = {}
+        self.waited_by_graph = {}
         self.wait_for_lock = threading.Lock()
+        self.deadlock_detection = deadlock_detection
+        # With a prevention policy conflicts are decided from the transaction
+        # timestamps alone and the wait-for graph stays empty
+        self.deadlock_prevention = deadlock_prevention
+        # Who is aborted when a conflict closes a cycle; deadlock_victim_priority
+        # maps a transaction id to its priority for the PRIORITY policy
+        if deadlock_victim_policy == DeadlockVictimPolicy.PRIORITY and deadlock_victim_priority is None:
+            raise Exception('PRIORITY deadlock victim policy needs a deadlock_victim_priority function')
+        self.deadlock_victim_policy = deadlock_victim_policy
+        self.deadlock_victim_priority = deadlock_victim_priority
+        
+        # Topological order of the wait-for graph for incremental detection:
+        # every edge T1 -> T2 satisfies wait_for_order[T1] < wait_for_order[T2]
+        self.wait_for_order = {}
+        self.wait_for_order_low = 0
+        self.wait_for_order_high = 0
+        
+        # Background detector, only used in PERIODIC mode; stop it with close()
+        self.deadlock_detector = None
+        if deadlock_detection == DeadlockDetection.PERIODIC and deadlock_prevention == DeadlockPrevention.NONE:
+            self.deadlock_detector = DeadlockDetector(self, interval=deadlock_detection_interval)
+            self.deadlock_detector.start()
+
+    def close(self) -> None:
+        """Stop background workers owned by this manager"""
+        if self.deadlock_detector is not None:
+            self.deadlock_detector.stop()
 
-    def transaction_begin(self) -> int:
+    def transaction_begin(self, timestamp: int | None = None, deadline: float | None = None) -> int:
+        """
+        Start a transaction. A transaction restarted after being aborted by
+        wait-die or wound-wait should pass the timestamp of its first attempt,
+        so it keeps its age and eventually becomes the oldest. With a deadline
+        (seconds from now) the transaction is aborted once it is waiting for a
+        lock or makes a request after that time.
+        """
         transaction_id = super().transaction_begin()
-        self.timestamp_counter += 1
+        # drawn even for a restart, so a fresh oracle keeps timestamps equal to ids
+        allocated = self.timestamp_oracle.allocate()
+        if timestamp is None:
+            timestamp = allocated
         self.transactions[transaction_id] = {
             **self.transactions[transaction_id],
-            'shared_tables': set(),
-            'exclusive_tables': set(),
-            'timestamp': self.timestamp_counter,
+            # locks[resource] = LockMode held on the database, a table or a row
+            'locks': {},
+            # IS or IX held on the database outside the lock table, see database_lockers
+            'root_intention': None,
+            # row_locks[table] = number of row locks held on that table
+            'row_locks': {},
+            'timestamp': timestamp,
+            'deadline': None if deadline is None else time.monotonic() + deadline,
+            # when the current lock wait times out, None while not waiting
+            'wait_deadline': None,
+            # grants so far, conversions included; the work LEAST_WORK victim selection counts
+            'locks_acquired': 0,
             'has_released_lock': False,
-            'waiting_for': None 
+            'waiting_for': None,
+            # resources whose lock was handed over on release, until the retry reports it
+            'handed_off': set(),
+            # guards this transaction's lock sets against a concurrent release
+            'latch': threading.Lock()
         }
         
         # No need to create event in advance - created on demand when waiting
         
         return transaction_id
+
+    def _grant_is_interned(self, reason_args: tuple) -> bool:
+        # a transaction may lock any number of rows; database and table grants are few
+        return all(type(arg) is not RowResource for arg in reason_args)
     
     def _detect_deadlock(self, transaction_id: int) -> bool:
         """
@@ -71,68 +183,229 @@ class LockBasedConcurrencyControlManager(ConcurrencyControlManager):
             # Start DFS from the requesting transaction
             return has_cycle(transaction_id)
     
+    def _detect_deadlock_incremental(self, waiter: int, holders: set) -> bool:
+        """
+        Add the edges waiter -> holders (if not there yet) and check whether
+        they close a cycle, maintaining a topological order of the wait-for
+        graph (Pearce-Kelly). Only the region of the order between the two
+        endpoints of a violating edge is searched and renumbered; all searches
+        are iterative. Edges and positions change in one critical section, so
+        no search sees an edge to a node without a position.
+        
+        Returns:
+            True if deadlock detected (cycle exists), False otherwise
+        """
+        with self.wait_for_lock:
+            if holders:
+                self.__add_edges(waiter, holders)
+            order = self.wait_for_order
+            # A new waiter has no incoming edges and a new holder no outgoing
+            # ones, so placing them at either end of the order is always valid
+            if waiter not in order:
+                self.wait_for_order_low -= 1
+                order[waiter] = self.wait_for_order_low
+            for holder in holders:
+                if holder not in order:
+                    self.wait_for_order_high += 1
+                    order[holder] = self.wait_for_order_high
+            
+            for holder in holders:
+                upper = order[waiter]
+                lower = order[holder]
+                if lower > upper:
+                    continue  # edge already agrees with the order
+                
+                # Forward search from holder, bounded by the waiter's position
+                forward = {holder}
+                stack = [holder]
+                while stack:
+                    node = stack.pop()
+                    for successor in self.wait_for_graph.get(node, ()):
+                        if successor == waiter:
+                            return True  # holder reaches waiter - cycle detected
+                        # a node without a position counts as outside the region
+                        if successor not in forward and order.get(successor, upper) < upper:
+                            forward.add(successor)
+                            stack.append(successor)
+                
+                # Backward search from waiter, bounded by the holder's position
+                backward = {waiter}
+                stack = [waiter]
+                while stack:
+                    node = stack.pop()
+                    for predecessor in self.waited_by_graph.get(node, ()):
+                        if predecessor not in backward and order.get(predecessor, lower) > lower:
+                            backward.add(predecessor)
+                            stack.append(predecessor)
+                
+                # Reuse the affected positions: everything reaching the waiter
+                # now comes before everything reachable from the holder
+                affected = sorted(backward, key=order.get) + sorted(forward, key=order.get)
+                positions = sorted(order[node] for node in affected)
+                for node, position in zip(affected, positions):
+                    order[node] = position
+            return False
+    
+    def _wait_would_deadlock(self, waiter: int, holders: set) -> bool:
+        """Add waiter -> holders to the wait-for graph and report whether a cycle formed"""
+        if self.deadlock_detection == DeadlockDetection.NONE:
+            return False  # no graph is kept, lock wait timeouts break deadlocks
+        if self.deadlock_detection == DeadlockDetection.INCREMENTAL:
+            # adds the edges itself, together with their order positions
+            return self._detect_deadlock_incremental(waiter, holders)
+        self._add_to_wait_for_graph(waiter, holders)
+        if self.deadlock_detection == DeadlockDetection.PERIODIC:
+            return False  # left to the background detector
+        # a cycle through the new edges has to leave one of the holders; a holder
+        # starting to wait later finds these edges in its own search
+        if not any(holder in self.wait_for_graph for holder in holders):
+            return False
+        return self._detect_deadlock(waiter)
+    
+    def _deadlock_victim_cost(self, transaction_id: int) -> float:
+        """Work thrown away by aborting a transaction, approximated by the locks it holds"""
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None:
+            return 0
+        # intention locks on the way down are not work of their own
+        return 1 + sum(1 for mode in transaction['locks'].values() if mode not in (LockMode.IS, LockMode.IX))
+    
+    def _abort_transaction(self, transaction_id: int, reason_code: ReasonCode, reason_args: tuple = ()) -> bool:
+        """
+        Roll back an active transaction on the manager's own initiative (e.g. as a
+        deadlock victim) and wake it, so its next request reports the reason.
+        Must be called without holding any stripe latch.
+        
+        Returns:
+            True if the transaction was still active and has been rolled back
+        """
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None:
+            return False
+        with transaction['latch']:
+            if transaction['status'] != TransactionStatus.ACTIVE:
+                return False
+            transaction['abort_reason_code'] = (reason_code, reason_args)
+            # aborts are rare, the message is formatted right away for inspection
+            transaction['abort_reason'] = reason_code.format(*reason_args)
+            super().transaction_rollback(transaction_id)
+        self.__transaction_release_locks(transaction_id)
+        
+        with self.events_lock:
+            if transaction.get('wait_event') is not None:
+                transaction['wait_event'].set()
+        return True
+    
     def _add_to_wait_for_graph(self, waiter: int, holders: set):
         """Add edges to wait-for graph: waiter -> each holder"""
         with self.wait_for_lock:
-            if waiter not in self.wait_for_graph:
-                self.wait_for_graph[waiter] = set()
-            self.wait_for_graph[waiter].update(holders)
+            self.__add_edges(waiter, holders)
+
+    def __add_edges(self, waiter: int, holders: set):
+        """Add waiter -> each holder to both edge indexes; caller must hold wait_for_lock"""
+        if waiter not in self.wait_for_graph:
+            self.wait_for_graph[waiter] = set()
+        self.wait_for_graph[waiter].update(holders)
+        for holder in holders:
+            if holder not in self.waited_by_graph:
+                self.waited_by_graph[holder] = set()
+            self.waited_by_graph[holder].add(waiter)
     
     def _clear_wait_event(self, transaction_id: int, resource_name: str):
         """Clear wait event for a transaction that successfully acquired a lock"""
         with self.events_lock:
-            if resource_name in self.resource_waiters:
-                if transaction_id in self.resource_waiters[resource_name]:
-                    del self.resource_waiters[resource_name][transaction_id]
-                    # Clean up empty resource entries
-                    if len(self.resource_waiters[resource_name]) == 0:
-                        del self.resource_waiters[resource_name]
+            self.__unregister_waiter(transaction_id, resource_name)
+
+    def __unregister_waiter(self, transaction_id: int, resource_name: str):
+        """Drop one waiter entry from both indexes; caller must hold events_lock"""
+        waiters = self.resource_waiters.get(resource_name)
+        if waiters is not None and transaction_id in waiters:
+            del waiters[transaction_id]
+            # Clean up empty resource entries
+            if len(waiters) == 0:
+                del self.resource_waiters[resource_name]
+        waited = self.transaction_waits.get(transaction_id)
+        if waited is not None:
+            waited.discard(resource_name)
+            if not waited:
+                del self.transaction_waits[transaction_id]
+                # no longer waiting, the wait clock stops
+                transaction = self.transactions.get(transaction_id)
+                if transaction is not None:
+                    transaction['wait_deadline'] = None
 
     def _remove_from_wait_for_graph(self, transaction_id: int):
         """Remove transaction from wait-for graph (both as waiter and holder)"""
         with self.wait_for_lock:
+            self.wait_for_order.pop(transaction_id, None)
+            
             # Remove as waiter
-            if transaction_id in self.wait_for_graph:
-                del self.wait_for_graph[transaction_id]
+            for holder in self.wait_for_graph.pop(transaction_id, ()):
+                waiters = self.waited_by_graph[holder]
+                waiters.discard(transaction_id)
+                if not waiters:
+                    del self.waited_by_graph[holder]
             
-            # Remove as holder (remove edges pointing to this transaction)
-            for waiter in list(self.wait_for_graph.keys()):
-                self.wait_for_graph[waiter].discard(transaction_id)
+            # Remove as holder (only the edges pointing to this transaction)
+            for waiter in self.waited_by_graph.pop(transaction_id, ()):
+                holders = self.wait_for_graph[waiter]
+                holders.discard(transaction_id)
                 # Clean up empty entries
-                if not self.wait_for_graph[waiter]:
+                if not holders:
                     del self.wait_for_graph[waiter]
 
     def __transaction_release_locks(self, transaction_id: int) -> None:
         transaction = self.transactions[transaction_id]
-        transaction['has_released_lock'] = True  #entering shrinking phase
+        with transaction['latch']:
+            transaction['has_released_lock'] = True  #entering shrinking phase
+            # the status already left ACTIVE, so no grant can add to these after the swap
+            locks, transaction['locks'] = transaction['locks'], {}
+            transaction['row_locks'] = {}
+            transaction['root_intention'] = None
         
         # Remove from wait-for graph
-        self._remove_from_wait_for_graph(transaction_id)
+        if self.deadlock_prevention == DeadlockPrevention.NONE:
+            self._remove_from_wait_for_graph(transaction_id)
         
         #track which resources are being freed
         freed_resources = set()
         
+        #leave the queues it is still waiting in, requests queued behind it may go now
+        if transaction_id in self.transaction_waits:
+            with self.events_lock:
+                waited = list(self.transaction_waits.get(transaction_id, ()))
+                for resource_name in waited:
+                    self.__unregister_waiter(transaction_id, resource_name)
+            freed_resources.update(waited)
+        
         #release locks
-        for table_name in transaction['shared_tables']:
-            shared_holders = self.shared_locks.get(table_name)
-            if shared_holders is None:
-                continue
-            shared_holders.discard(transaction_id)
-            if len(shared_holders) == 0:
-                del self.shared_locks[table_name]
-                freed_resources.add(table_name)  #completely freed
-            else:
-                freed_resources.add(table_name)  #reduced holders, waiters might proceed
+        for resource_name in locks:
+            stripe = self.lock_table.stripe(resource_name)
+            with stripe.latch:
+                resource_lock = stripe.locks.get(resource_name)
+                if resource_lock is None or not resource_lock.remove(transaction_id):
+                    continue
+                if len(resource_lock) == 0:
+                    del stripe.locks[resource_name]
+                #freed or reduced holders, waiters might proceed either way
+                freed_resources.add(resource_name)
         
-        for table_name in transaction['exclusive_tables']:
-            exclusive_holder = self.exclusive_locks.get(table_name)
-            if exclusive_holder != transaction_id:
-                continue
-            del self.exclusive_locks[table_name]
-            freed_resources.add(table_name)  #completely freed
+        if transaction_id in self.database_lockers:
+            # only once its database lock is gone, others may skip the root again
+            with self.lock_table.stripe(DATABASE).latch:
+                self.database_lockers.discard(transaction_id)
         
         self.__process_wait_queue(freed_resources)
 
+    def transaction_commit(self, transaction_id: int) -> ConcurrencyResponse:
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None:
+            return super().transaction_commit(transaction_id)
+        # a concurrent abort (e.g. wounded by an older transaction) either
+        # happens first and the commit fails, or finds it committing and skips it
+        with transaction['latch']:
+            return super().transaction_commit(transaction_id)
+
     def transaction_commit_flushed(self, transaction_id: int) -> None:
         super().transaction_commit_flushed(transaction_id)
         self.__transaction_release_locks(transaction_id)
@@ -149,250 +422,1003 @@ class LockBasedConcurrencyControlManager(ConcurrencyControlManager):
         """Override to cleanup events"""
         super().transaction_end(transaction_id)
         
-        # Cleanup: remove transaction from all resource waiters
+        # Cleanup: remove transaction from the resources it was waiting on
         with self.events_lock:
-            for resource_name in list(self.resource_waiters.keys()):
-                if transaction_id in self.resource_waiters[resource_name]:
-                    del self.resource_waiters[resource_name][transaction_id]
-                    # Clean up empty resource entries
-                    if len(self.resource_waiters[resource_name]) == 0:
-                        del self.resource_waiters[resource_name]
+            for resource_name in list(self.transaction_waits.get(transaction_id, ())):
+                self.__unregister_waiter(transaction_id, resource_name)
     
     def get_wait_event(self, transaction_id: int) -> threading.Event:
         """Get the event object for a waiting transaction"""
         with self.events_lock:
-            # Find which resource this transaction is waiting for
-            for resource_name, waiters in self.resource_waiters.items():
-                if transaction_id in waiters:
-                    return waiters[transaction_id]
-            # If not found, return None (shouldn't happen in normal flow)
-            return None
+            if transaction_id not in self.transaction_waits:
+                # Not waiting on anything (shouldn't happen in normal flow)
+                return None
+            return self.transactions[transaction_id]['wait_event']
     
-    def register_waiting_transaction(self, transaction_id: int, resource_name: str):
-        """Register a transaction as waiting for a specific resource"""
+    def register_waiting_transaction(self, transaction_id: int, resource_name, lock_mode: LockMode | None = None):
+        """
+        Register a transaction as waiting for a specific resource.
+        lock_mode is the requested mode, used to hand the resource over once it
+        can be granted; waiters registered without one are woken on every release.
+        """
+        transaction = self.transactions[transaction_id]
         with self.events_lock:
+            # One event per transaction, created on first wait and cleared for reuse
+            if transaction.get('wait_event') is None:
+                transaction['wait_event'] = self._new_wait_event()
+            else:
+                transaction['wait_event'].clear()
+            
             if resource_name not in self.resource_waiters:
                 self.resource_waiters[resource_name] = {}
-            
-            # Create or reuse event for this transaction on this resource
-            if transaction_id not in self.resource_waiters[resource_name]:
-                self.resource_waiters[resource_name][transaction_id] = threading.Event()
-            else:
-                # Clear the event if reusing (shouldn't happen normally)
-                self.resource_waiters[resource_name][transaction_id].clear()
+            self.transaction_waits.setdefault(transaction_id, set()).add(resource_name)
+            self.resource_waiters[resource_name][transaction_id] = lock_mode
+    
+    def _new_wait_event(self):
+        """Create the object a waiting transaction blocks on; anything with set() and clear() works"""
+        return threading.Event()
+    
+    def __wake_transaction(self, transaction_id: int):
+        """Signal a waiting transaction; caller must hold events_lock"""
+        transaction = self.transactions.get(transaction_id)
+        if transaction is not None and transaction.get('wait_event') is not None:
+            transaction['wait_event'].set()
     
     def __process_wait_queue(self, freed_resources: set):
-        """Process wait queue after locks are released - signal waiting transactions"""
+        """Process wait queue after locks are released - hand the locks to waiters at the head of each queue"""
+        deadlocked_waiters = []
+        for resource_name in freed_resources:
+            stripe = self.lock_table.stripe(resource_name)
+            with stripe.latch:
+                deadlocked_waiters.extend(self.__hand_off_locks(resource_name, stripe))
         
-        #signal all transactions waiting on freed resources
-        with self.events_lock:
-            for resource_name in freed_resources:
-                if resource_name in self.resource_waiters:
-                    #signal all waiters for this resource
-                    for tid, event in self.resource_waiters[resource_name].items():
-                        event.set()  #wake up the waiting transaction
-                    # DON'T delete waiters here - let them clean up after acquiring lock
-        
-        #clear waiting_for flags
-        for tid in self.transactions:
-            if self.transactions[tid].get('waiting_for'):
-                self.transactions[tid]['waiting_for'] = None
+        # Waiters left queued behind a new holder that now close a cycle; rolled
+        # back outside the latches like any other deadlock victim
+        for waiter in deadlocked_waiters:
+            self._abort_transaction(waiter, *self.__victim_reason(waiter))
     
-    def __get_lock_holder(self, table_name: str, action: TableAction):
-        """Get current lock holder(s) for a table"""
-        exclusive_holder = self.exclusive_locks.get(table_name)
-        shared_holders = self.shared_locks.get(table_name)
-        
-        if action == TableAction.READ:
-            return exclusive_holder, None
-        else: 
-            return exclusive_holder, shared_holders
+    def __hand_off_locks(self, resource_name, stripe) -> list[int]:
+        """
+        Grant a freed resource directly to the waiters at the head of its queue,
+        in the order the queue policy allows, and wake them. Pending conversions
+        (e.g. S -> X upgrades) go first since everyone else queued there already
+        waits for them. Caller holds the stripe latch.
+        
+        Returns:
+            Waiters left queued whose new waits close a cycle (or that the
+            prevention policy aborts), to roll back once the latch is released
+        """
+        if resource_name not in self.resource_waiters:
+            return []
+        with self.events_lock:
+            queue = list(self.resource_waiters.get(resource_name, {}).items())
+        if not queue:
+            return []
+        
+        #clear waiting_for flags of this resource's waiters only; the ones still
+        #blocked set it again on their next request
+        for tid, _ in queue:
+            transaction = self.transactions.get(tid)
+            if transaction is not None:
+                transaction['waiting_for'] = None
+        
+        resource_lock = stripe.locks.get(resource_name)
+        holders = resource_lock.holders if resource_lock is not None else {}
+        writers_first = self.lock_queue_policy == LockQueuePolicy.WRITER_PREFERRED
+        # stable sort, arrival order is kept within each group
+        handoff_order = sorted(queue, key=lambda waiter: (
+            waiter[0] not in holders,
+            writers_first and (waiter[1] is None or waiter[1].is_read)
+        ))
+        
+        granted = set()
+        for tid, lock_mode in handoff_order:
+            transaction = self.transactions.get(tid)
+            if lock_mode is None or transaction is None:
+                # registered without a mode - just let it re-request
+                with self.events_lock:
+                    self.__wake_transaction(tid)
+                continue
+            if self.__conflicting_holders(stripe, resource_name, tid, lock_mode):
+                if self.lock_queue_policy == LockQueuePolicy.READER_PREFERRED:
+                    continue  # compatible requests further back may still join
+                break
+            with transaction['latch']:
+                if transaction['status'] != TransactionStatus.ACTIVE:
+                    continue
+                self.__grant_lock(tid, transaction, lock_mode, resource_name, stripe)
+                transaction['handed_off'].add(resource_name)
+            self._clear_wait_event(tid, resource_name)
+            with self.events_lock:
+                self.__wake_transaction(tid)
+            granted.add(tid)
+        
+        # The ones left queued no longer wait for the releaser. They are not
+        # woken to re-request, so their new waits are recorded and checked here
+        return self.__record_queued_waits(resource_name, stripe, queue, granted)
+
+    def __record_queued_waits(self, resource_name, stripe, queue: list, granted: set) -> list[int]:
+        """
+        Record what the requests still queued on resource_name wait for after a
+        handoff: the nearest request queued before it that it may not overtake
+        and the holders its request conflicts with. Waits are transitive, so a
+        holder already reached through that predecessor gets no edge of its
+        own, and a release adds O(1) edges per queued request instead of one
+        per pair of them. Only edges not yet in the graph are checked, and a
+        holder that is not waiting itself cannot close a cycle. Under a
+        prevention policy each conflicting new holder is checked instead.
+        Caller holds the stripe latch.
+        
+        Returns:
+            Waiters whose new waits close a cycle (or that the prevention
+            policy aborts), to roll back once the latch is released
+        """
+        resource_lock = stripe.locks.get(resource_name)
+        holders = resource_lock.holders if resource_lock is not None else {}
+        policy = self.lock_queue_policy
+        transitive = self.deadlock_prevention == DeadlockPrevention.NONE
+        queued = []
+        for tid, lock_mode in queue:
+            transaction = self.transactions.get(tid)
+            if lock_mode is None or transaction is None or tid in granted:
+                continue
+            if transaction['status'] == TransactionStatus.ACTIVE:
+                queued.append((tid, lock_mode, transaction))
+        # a writer-preferred reader also waits for writers queued after it
+        first_writers = {}
+        if policy == LockQueuePolicy.WRITER_PREFERRED:
+            for tid, lock_mode, _ in queued:
+                if not lock_mode.is_read:
+                    first_writers.setdefault(lock_mode, tid)
+        
+        # latest[mode] = (index, T) of the last request with that mode queued before the current one
+        latest = {}
+        # reached[T] = holders T waits for, directly or through the requests ahead of it
+        reached = {}
+        waits = []
+        for index, (tid, lock_mode, transaction) in enumerate(queued):
+            held = holders.get(tid)
+            ahead = None
+            # a conversion is exempt from the queue order, as on request
+            if held is None and not (policy == LockQueuePolicy.READER_PREFERRED and lock_mode.is_read):
+                before = [
+                    entry for mode, entry in latest.items()
+                    if not lock_mode.compatible_with(mode)
+                    and (policy == LockQueuePolicy.STRICT_FIFO or not mode.is_read)
+                ]
+                if before:
+                    ahead = max(before)[1]
+                elif first_writers and lock_mode.is_read:
+                    ahead = next((writer for mode, writer in first_writers.items() if not lock_mode.compatible_with(mode)), None)
+            latest[lock_mode] = (index, tid)
+            
+            conflicting = self.__conflicting_holders(stripe, resource_name, tid, lock_mode)
+            if transitive:
+                through = reached.get(ahead, ())
+                direct = [holder for holder in conflicting if holder not in through]
+                reached[tid] = through.union(direct) if through else set(direct)
+            else:
+                direct = [holder for holder in conflicting if holder in granted]
+            blockers = direct if ahead is None else direct + [ahead]
+            
+            if not blockers:
+                if conflicting:
+                    # still waits for holders it was already checked against
+                    transaction['waiting_for'] = next(iter(conflicting))
+                else:
+                    # nothing in its way any more, let it re-request
+                    with self.events_lock:
+                        self.__wake_transaction(tid)
+                continue
+            transaction['waiting_for'] = blockers[0]
+            waits.append((tid, blockers))
+        
+        with self.wait_for_lock:
+            graph = self.wait_for_graph
+            waits = [
+                (tid, [blocker for blocker in blockers if blocker not in graph.get(tid, ())])
+                for tid, blockers in waits
+            ]
+        
+        # Checked from the back of the queue, so each predecessor's own edge to
+        # the requests ahead of it is not there yet and the cycle searches stay
+        # short; any cycle is still found when its last edge goes in
+        deadlocked_waiters = []
+        for tid, new_blockers in reversed(waits):
+            if not new_blockers or tid in deadlocked_waiters:
+                continue
+            for victim in self.__wait_victims(tid, new_blockers):
+                if victim not in deadlocked_waiters:
+                    deadlocked_waiters.append(victim)
+        return deadlocked_waiters
     
-    def __get_active_transactions(self) -> list[int]:
-        """Get list of active transaction IDs"""
-        from .transaction_status import TransactionStatus
-        return [tid for tid, txn in self.transactions.items() if txn['status'] == TransactionStatus.ACTIVE]
+    def acquire(self, transaction_id: int, table_action: TableAction, table_name: str, timeout: float | None = None, wait_timeout: float | None = None) -> ConcurrencyResponse:
+        """
+        Blocking variant of transaction_query: waits inside the manager until the
+        lock is granted or the transaction fails, and returns that final response.
+        If timeout (seconds) runs out first, the last WAITING response is returned
+        and the transaction may retry; wait_timeout instead aborts it like
+        transaction_query's.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            response = self.transaction_query(transaction_id, table_action, table_name, wait_timeout=wait_timeout)
+            if not response.should_retry:
+                return response
+            if deadline is not None and time.monotonic() >= deadline:
+                return response
+            # registration cleared the event under the stripe latch, so a release
+            # after our check cannot be missed
+            self.transactions[transaction_id]['wait_event'].wait(self._acquire_wait_time(deadline))
+
+    def _acquire_wait_time(self, deadline: float | None) -> float | None:
+        """
+        How long a blocked acquire() sleeps before requesting again: until its
+        own deadline, but also no longer than until the earliest lock wait
+        expires, so expired waiters are aborted even if their own clients never
+        retry.
+        
+        Returns:
+            Seconds to wait, None for no limit
+        """
+        now = time.monotonic()
+        remaining = None if deadline is None else max(deadline - now, 0)
+        earliest = self._earliest_wait_deadline()
+        if earliest is not None:
+            until_expiry = max(earliest - now, 0)
+            remaining = until_expiry if remaining is None else min(remaining, until_expiry)
+        return remaining
 
-    def transaction_query(self, transaction_id: int, table_action: TableAction, table_name: str) -> ConcurrencyResponse:
+    def transaction_query(self, transaction_id: int, table_action: TableAction, table_name: str, wait_timeout: float | None = None) -> ConcurrencyResponse:
         """
         Request lock on a table with 2PL and deadlock detection.
         Transactions wait when lock conflicts occur.
         Deadlock is detected and one transaction is aborted to break the cycle.
         """
+        if table_action == TableAction.READ:
+            return self.transaction_query_lock(transaction_id, LockMode.S, table_name, wait_timeout=wait_timeout)
+        if table_action == TableAction.WRITE:
+            return self.transaction_query_lock(transaction_id, LockMode.X, table_name, wait_timeout=wait_timeout)
+        if table_action == TableAction.READ_FOR_UPDATE:
+            # a later WRITE converts U to X without racing other updaters
+            return self.transaction_query_lock(transaction_id, LockMode.U, table_name, wait_timeout=wait_timeout)
+        raise Exception(f'Unknown table action {table_action}')
+
+    def transaction_query_lock(self, transaction_id: int, lock_mode: LockMode, table_name=None, row_key=None, wait_timeout: float | None = None) -> ConcurrencyResponse:
+        """
+        Request lock_mode on one node of the database -> table -> row hierarchy:
+        the database itself when table_name is None, a table, or one row of it.
+        The matching intention lock (IS or IX) is taken on every ancestor first,
+        so e.g. IX on a table plus X on a row lets writers of different rows run
+        in parallel while a table S or X still conflicts with all of them.
+        
+        A WAITING response starts the wait clock: if the transaction is still
+        queued wait_timeout seconds later (default: the manager's
+        lock_wait_timeout), it is aborted. Retries of a waiting request keep
+        the clock running.
+        """
+        # re-entrant requests are answered from the transaction's own lock set
+        transaction = self.transactions.get(transaction_id)
+        if transaction is not None:
+            response = self.__held_lock_response(transaction_id, transaction, lock_mode, table_name, row_key)
+            if response is not None:
+                return response
+        
+        response = self.__query_precheck(transaction_id)
+        if response is not None:
+            return response
+        response = self.__query_path(transaction_id, transaction, lock_mode, table_name, row_key)
+        if response.status == LockStatus.WAITING:
+            self.__start_wait_clock(transaction_id, wait_timeout)
+        return response
+
+    def transaction_query_many(self, transaction_id: int, requests: list[tuple[TableAction, str]], wait_timeout: float | None = None) -> ConcurrencyResponse:
+        """
+        Lock every table of a statement in one call. Requests for the same table
+        are merged into the strongest mode, and tables are locked in one canonical
+        order, so batches of different transactions never wait for each other in
+        a cycle. Returns the first response that is not a grant (retry the whole
+        batch after a WAITING one - granted tables are then re-entrant), or one
+        GRANTED response for the batch.
+        """
+        lock_modes = {}
+        for table_action, table_name in requests:
+            if table_action == TableAction.READ:
+                lock_mode = LockMode.S
+            elif table_action == TableAction.WRITE:
+                lock_mode = LockMode.X
+            elif table_action == TableAction.READ_FOR_UPDATE:
+                lock_mode = LockMode.U
+            else:
+                raise Exception(f'Unknown table action {table_action}')
+            held = lock_modes.get(table_name)
+            lock_modes[table_name] = lock_mode if held is None else held.join(lock_mode)
+        
+        response = self.__query_precheck(transaction_id)
+        if response is not None:
+            return response
+        transaction = self.transactions[transaction_id]
+        # any total order shared by all transactions will do; tables may mix key types
+        for table_name in sorted(lock_modes, key=lambda table_name: (type(table_name).__name__, str(table_name))):
+            response = (
+                self.__held_lock_response(transaction_id, transaction, lock_modes[table_name], table_name, None)
+                or self.__query_path(transaction_id, transaction, lock_modes[table_name], table_name, None)
+            )
+            if response.status == LockStatus.WAITING:
+                self.__start_wait_clock(transaction_id, wait_timeout)
+            if response.status != LockStatus.GRANTED:
+                return response
+        return self._granted(
+            transaction_id, transaction, ReasonCode.TABLE_LOCKS_GRANTED, len(lock_modes),
+            active_transactions=self.active_transactions
+        )
+
+    def __start_wait_clock(self, transaction_id: int, wait_timeout: float | None) -> None:
+        """Set when a new lock wait of the transaction expires, unless it is already running"""
+        if wait_timeout is None:
+            wait_timeout = self.lock_wait_timeout
+        transaction = self.transactions[transaction_id]
+        wait_deadline = transaction['deadline']
+        if wait_timeout is not None:
+            wait_deadline = time.monotonic() + wait_timeout if wait_deadline is None else min(wait_deadline, time.monotonic() + wait_timeout)
+        if wait_deadline is None:
+            return
+        with self.events_lock:
+            # the wait may have ended already (e.g. by a handoff) or be timed from an earlier retry
+            if transaction_id not in self.transaction_waits or transaction['wait_deadline'] is not None:
+                return
+            transaction['wait_deadline'] = wait_deadline
+            heapq.heappush(self.wait_deadlines, (wait_deadline, transaction_id))
+
+    def _earliest_wait_deadline(self) -> float | None:
+        """
+        Head of wait_deadlines, read without events_lock so the check stays
+        cheap; the heap may empty between the test and the read, so that is
+        caught instead of tested for. A stale answer is fine, callers only use
+        it to decide whether to look again under the lock.
+        
+        Returns:
+            The earliest wait deadline, None if no wait is timed
+        """
+        try:
+            return self.wait_deadlines[0][0]
+        except IndexError:
+            return None
+
+    def _expire_waits(self) -> list[int]:
+        """
+        Abort every transaction whose lock wait has passed its deadline; this
+        also drops its wait-for edges and its place in the queues. Runs at the
+        start of each request and in blocked acquire() calls, so it costs one
+        comparison while nothing is due.
+        
+        Returns:
+            The transactions aborted
+        """
+        earliest = self._earliest_wait_deadline()
+        if earliest is None or earliest > time.monotonic():
+            return []
+        expired = []
+        with self.events_lock:
+            now = time.monotonic()
+            while self.wait_deadlines and self.wait_deadlines[0][0] <= now:
+                wait_deadline, transaction_id = heapq.heappop(self.wait_deadlines)
+                transaction = self.transactions.get(transaction_id)
+                # skip clocks of waits that ended since
+                if transaction is None or transaction['wait_deadline'] != wait_deadline:
+                    continue
+                if transaction_id not in self.transaction_waits:
+                    continue
+                expired.append((transaction_id, transaction['deadline'] is not None and wait_deadline >= transaction['deadline']))
+        
+        aborted = []
+        for transaction_id, deadline_exceeded in expired:
+            reason_code = ReasonCode.DEADLINE_EXCEEDED if deadline_exceeded else ReasonCode.LOCK_WAIT_TIMEOUT
+            if self._abort_transaction(transaction_id, reason_code, (transaction_id,)):
+                aborted.append(transaction_id)
+        return aborted
+
+    def __query_precheck(self, transaction_id: int) -> ConcurrencyResponse | None:
+        """Existence, state and 2PL checks shared by every request; returns the failure if any"""
+        self._expire_waits()
+        
         #check if transaction exists
         if transaction_id not in self.transactions:
             return ConcurrencyResponse(
                 transaction_id,
-                f'transaction {transaction_id} does not exist',
+                ReasonCode.TRANSACTION_NOT_FOUND,
                 LockStatus.FAILED,
-                blocked_by=[],
-                active_transactions=self.__get_active_transactions()
+                active_transactions=self.active_transactions,
+                reason_args=(transaction_id,)
             )
         
         transaction = self.transactions[transaction_id]
         
+        #check transaction deadline
+        if transaction['deadline'] is not None and time.monotonic() >= transaction['deadline']:
+            self._abort_transaction(transaction_id, ReasonCode.DEADLINE_EXCEEDED, (transaction_id,))
+        
         #check if transaction is in queryable state
         if transaction['status'].value not in ['active']:
-            return ConcurrencyResponse(
-                transaction_id,
-                f'transaction {transaction_id} is in {transaction["status"].value} state',
-                LockStatus.FAILED,
-                blocked_by=[],
-                active_transactions=self.__get_active_transactions()
-            )
+            return self.__inactive_response(transaction_id, transaction)
         
         #check 2pl violation
         if transaction['has_released_lock']:
             return ConcurrencyResponse(
                 transaction_id, 
-                f'transaction {transaction_id} violated 2pl',
+                ReasonCode.TWO_PHASE_LOCKING_VIOLATED,
                 LockStatus.FAILED,
-                blocked_by=[],
-                active_transactions=self.__get_active_transactions()
+                active_transactions=self.active_transactions,
+                reason_args=(transaction_id,)
             )
+        return None
+
+    def __held_lock_response(self, transaction_id: int, transaction: dict, lock_mode: LockMode, table_name, row_key) -> ConcurrencyResponse | None:
+        """
+        Answer a request that a lock the transaction already holds covers (on
+        the node itself or, for a row, on its table) from the transaction's own
+        lock set, without latches or shared structures. Locks only go away on
+        release, which leaves ACTIVE first, so a covering lock read before an
+        ACTIVE status was still held then.
         
-        shared_holders = self.shared_locks.get(table_name)
-        exclusive_holder = self.exclusive_locks.get(table_name)
+        Returns:
+            The same GRANTED response the full path would give, or None if the
+            full path has to decide
+        """
+        # lock handoffs are reported and deadlines enforced by the full path
+        if transaction['handed_off']:
+            return None
+        deadline = transaction['deadline']
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
         
-        if table_action == TableAction.READ:
-            if exclusive_holder is not None:
-                if exclusive_holder != transaction_id:
-                    # Lock conflict - add to wait-for graph and check for deadlock
-                    self._add_to_wait_for_graph(transaction_id, {exclusive_holder})
-                    
-                    if self._detect_deadlock(transaction_id):
-                        # Deadlock detected - abort this transaction (victim)
-                        self._remove_from_wait_for_graph(transaction_id)
-                        super().transaction_rollback(transaction_id)
-                        self.__transaction_release_locks(transaction_id)
-                        return ConcurrencyResponse(
-                            transaction_id, 
-                            f'Deadlock detected. Transaction {transaction_id} aborted (victim selection).',
-                            LockStatus.FAILED,
-                            blocked_by=[exclusive_holder],
-                            active_transactions=self.__get_active_transactions()
-                        )
-                    
-                    # No deadlock - safe to wait
-                    transaction['waiting_for'] = exclusive_holder
-                    # Register this transaction as waiting for the resource
-                    self.register_waiting_transaction(transaction_id, table_name)
-                    return ConcurrencyResponse(
-                        transaction_id, 
-                        f'Read waiting for exclusive lock holder {exclusive_holder}',
-                        LockStatus.WAITING,
-                        blocked_by=[exclusive_holder],
-                        active_transactions=self.__get_active_transactions()
-                    )
-            else:
-                # No exclusive lock - grant shared lock
-                if shared_holders is None:
-                    shared_holders = set()
-                    self.shared_locks[table_name] = shared_holders
-                transaction['shared_tables'].add(table_name)
-                shared_holders.add(transaction_id)
-                # Clear wait event if this transaction was waiting
-                self._clear_wait_event(transaction_id, table_name)
-            
+        locks = transaction['locks']
+        if row_key is None:
+            resource_name = DATABASE if table_name is None else table_name
+        else:
+            resource_name = RowResource(table_name, row_key)
+            held = locks.get(table_name)
+            if held is not None and held.covers(lock_mode):
+                # e.g. X on a table already grants X on each of its rows
+                if transaction['status'] != TransactionStatus.ACTIVE:
+                    return None
+                return self._granted(
+                    transaction_id, transaction, ReasonCode.LOCK_GRANTED, lock_mode, resource_name,
+                    active_transactions=self.active_transactions
+                )
+        held = locks.get(resource_name)
+        if held is None or not held.covers(lock_mode) or transaction['status'] != TransactionStatus.ACTIVE:
+            return None
+        reason_code = ReasonCode.LOCK_GRANTED if lock_mode == LockMode.S else ReasonCode.LOCK_ALREADY_HELD
+        return self._granted(
+            transaction_id, transaction, reason_code, lock_mode, resource_name,
+            active_transactions=self.active_transactions
+        )
+
+    def __inactive_response(self, transaction_id: int, transaction: dict) -> ConcurrencyResponse:
+        """FAILED response to a request of a transaction that is no longer active, with its abort reason if it was aborted"""
+        reason_code, reason_args = transaction.get('abort_reason_code') or (
+            ReasonCode.TRANSACTION_NOT_ACTIVE, (transaction_id, transaction['status'])
+        )
+        return ConcurrencyResponse(
+            transaction_id,
+            reason_code,
+            LockStatus.FAILED,
+            active_transactions=self.active_transactions,
+            reason_args=reason_args
+        )
+
+    def __query_path(self, transaction_id: int, transaction: dict, lock_mode: LockMode, table_name, row_key) -> ConcurrencyResponse:
+        """Take the intention locks from the root down, then lock_mode on the requested node"""
+        # Path from the root down to the requested node
+        path = [DATABASE]
+        if table_name is not None:
+            path.append(table_name)
+        if row_key is not None:
+            if table_name is None:
+                raise Exception(f'Row {row_key} requested without a table')
+            path.append(RowResource(table_name, row_key))
+        
+        intention = lock_mode.intention
+        for resource_name in path[:-1]:
+            held = transaction['locks'].get(resource_name)
+            if held is not None and resource_name in transaction['handed_off']:
+                # handed over while this request waited for it; the request
+                # goes on below, so nothing else reports it
+                with transaction['latch']:
+                    transaction['handed_off'].discard(resource_name)
+            if held is not None and held.covers(lock_mode):
+                # e.g. X on a table already grants X on each of its rows
+                return self._granted(
+                    transaction_id, transaction, ReasonCode.LOCK_GRANTED, lock_mode, path[-1],
+                    active_transactions=self.active_transactions
+                )
+            if held is not None and held.covers(intention):
+                continue  # taken by an earlier request of this transaction
+            if resource_name == DATABASE and self.__take_root_intention(transaction, intention):
+                continue
+            response = self.__query_node(transaction_id, transaction, intention, lock_mode, resource_name, is_target=False)
+            if response.status != LockStatus.GRANTED:
+                return response
+        
+        return self.__query_node(transaction_id, transaction, lock_mode, lock_mode, path[-1], is_target=True)
+
+    def __take_root_intention(self, transaction: dict, intention: LockMode) -> bool:
+        """
+        Hold intention (IS or IX) on the database without its latch while no
+        transaction holds or requests S, U, SIX or X there. The transaction
+        records the intention first and then checks for such a transaction, and
+        one joins database_lockers first and then collects the recorded
+        intentions, so one of the two always sees the other.
+        
+        Returns:
+            True if the intention is held, False if it has to be requested on the
+            database's lock like any other lock
+        """
+        implicit = transaction['root_intention']
+        if implicit is not None and implicit.covers(intention):
+            return True
+        if self.database_lockers:
+            return False
+        with transaction['latch']:
+            if transaction['status'] != TransactionStatus.ACTIVE:
+                return False
+            transaction['root_intention'] = intention if implicit is None else implicit.join(intention)
+            transaction['locks_acquired'] += 1
+        if not self.database_lockers:
+            return True
+        with transaction['latch']:
+            if transaction['root_intention'] is None:
+                # already put in the lock table by the database locker
+                held = transaction['locks'].get(DATABASE)
+                return held is not None and held.covers(intention)
+            transaction['root_intention'] = implicit
+            transaction['locks_acquired'] -= 1
+        return False
+
+    def __claim_database(self, transaction_id: int, stripe) -> None:
+        """
+        Register a request for S, U, SIX or X on the database and move the
+        intentions held outside the lock table into it, so the request sees them
+        as holders. Caller holds the database's stripe latch.
+        """
+        self.database_lockers.add(transaction_id)
+        for tid, transaction in list(self.transactions.items()):
+            if transaction.get('root_intention') is None:
+                continue
+            with transaction['latch']:
+                intention = transaction['root_intention']
+                if intention is None:
+                    continue
+                resource_lock = stripe.locks.get(DATABASE)
+                if resource_lock is None:
+                    resource_lock = stripe.locks[DATABASE] = ResourceLock()
+                held = resource_lock.holders.get(tid)
+                lock_mode = intention if held is None else held.join(intention)
+                resource_lock.set(tid, lock_mode)
+                transaction['locks'][DATABASE] = lock_mode
+                transaction['root_intention'] = None
+
+    def transaction_query_row(self, transaction_id: int, row_action: RowAction, table_name, row_key, wait_timeout: float | None = None) -> ConcurrencyResponse:
+        """
+        Request a lock on one row of a table (S for READ, X for WRITE, U for
+        READ_FOR_UPDATE) under the matching intention locks. Once the
+        transaction holds more row locks on the table than its escalation
+        threshold, they are traded for one table lock as soon as that can be
+        granted without waiting.
+        """
+        if row_action == RowAction.READ:
+            lock_mode = LockMode.S
+        elif row_action == RowAction.WRITE:
+            lock_mode = LockMode.X
+        elif row_action == RowAction.READ_FOR_UPDATE:
+            lock_mode = LockMode.U
+        else:
+            raise Exception(f'Unknown row action {row_action}')
+        
+        response = self.transaction_query_lock(transaction_id, lock_mode, table_name, row_key, wait_timeout=wait_timeout)
+        if response.status == LockStatus.GRANTED:
+            threshold = self.table_escalation_thresholds.get(table_name, self.row_lock_escalation_threshold)
+            transaction = self.transactions[transaction_id]
+            if threshold is not None and transaction['row_locks'].get(table_name, 0) > threshold:
+                self.__escalate_row_locks(transaction_id, transaction, table_name)
+        return response
+
+    def __escalate_row_locks(self, transaction_id: int, transaction: dict, table_name) -> bool:
+        """
+        Replace the transaction's row locks on table_name by one table lock
+        granting all of them (S, U or X, joined with the intention lock held).
+        Only done if the table lock can be granted right away and makes no
+        queued request wait for the transaction that did not already; otherwise
+        the row locks stay and a later row request tries again.
+        
+        Returns:
+            True if the row locks were escalated
+        """
+        row_resources = [
+            resource_name for resource_name in list(transaction['locks'])
+            if type(resource_name) is RowResource and resource_name.table_name == table_name
+        ]
+        lock_mode = LockMode.S
+        for resource_name in row_resources:
+            lock_mode = lock_mode.join(transaction['locks'].get(resource_name, LockMode.S))
+        
+        stripe = self.lock_table.stripe(table_name)
+        with stripe.latch, transaction['latch']:
+            if transaction['status'] != TransactionStatus.ACTIVE:
+                return False
+            if self.__conflicting_holders(stripe, table_name, transaction_id, lock_mode):
+                return False
+            # a conversion of the intention lock already held, so nobody queued is overtaken
+            held = transaction['locks'].get(table_name)
+            granted_mode = lock_mode if held is None else held.join(lock_mode)
+            # waiters conflicting with the held lock already wait for it (their
+            # edges or timestamp checks are in place); new ones would need the
+            # deadlock checks and possibly aborts for a grant that is optional
+            blocked = set(self.__conflicting_waiters(transaction_id, granted_mode, table_name))
+            if held is not None:
+                blocked.difference_update(self.__conflicting_waiters(transaction_id, held, table_name))
+            if blocked:
+                return False
+            self.__grant_lock(transaction_id, transaction, lock_mode, table_name, stripe)
+        
+        # the table lock covers the rows, so dropping them keeps the transaction
+        # in its growing phase
+        freed_resources = set()
+        for resource_name in row_resources:
+            row_stripe = self.lock_table.stripe(resource_name)
+            with row_stripe.latch, transaction['latch']:
+                transaction['locks'].pop(resource_name, None)
+                resource_lock = row_stripe.locks.get(resource_name)
+                if resource_lock is None or not resource_lock.remove(transaction_id):
+                    continue
+                if len(resource_lock) == 0:
+                    del row_stripe.locks[resource_name]
+                freed_resources.add(resource_name)
+        transaction['row_locks'].pop(table_name, None)
+        self.__process_wait_queue(freed_resources)
+        return True
+
+    def __query_node(self, transaction_id: int, transaction: dict, lock_mode: LockMode, requested_mode: LockMode, resource_name, is_target: bool) -> ConcurrencyResponse:
+        """Request lock_mode on one node under its latches and roll back a deadlock victim afterwards"""
+        stripe = self.lock_table.stripe(resource_name)
+        with stripe.latch:
+            if resource_name == DATABASE and lock_mode not in (LockMode.IS, LockMode.IX):
+                self.__claim_database(transaction_id, stripe)
+            with transaction['latch']:
+                response, victims = self.__request_lock(transaction_id, transaction, lock_mode, requested_mode, resource_name, is_target, stripe)
+        if response.should_rollback:
+            # chosen as deadlock victim; rolled back outside the latches since
+            # releasing its locks visits other stripes
+            self._abort_transaction(transaction_id, response.reason_code, response.reason_args)
+        # others aborted by wait-die/wound-wait to let this request go ahead
+        for victim in victims:
+            self._abort_transaction(victim, *self.__victim_reason(victim))
+        return response
+
+    def __grant_would_deadlock(self, transaction_id: int, lock_mode: LockMode, resource_name) -> list[int]:
+        """
+        Waiters already queued on resource_name that the new grant conflicts with are
+        not woken to re-request, so record that they now wait for the grantee too.
+        When such an edge closes a cycle the victim policy picks who is aborted,
+        with the grantee as the requester; once it is a victim the other
+        waiters are not checked. Victims are taken out of the wait-for graph
+        straight away. Under a prevention policy the timestamp rule decides instead.
+        
+        Returns:
+            The transactions to abort (empty if none), possibly transaction_id itself
+        """
+        waiters = self.__conflicting_waiters(transaction_id, lock_mode, resource_name)
+        victims = []
+        if self.deadlock_prevention != DeadlockPrevention.NONE:
+            for waiter in waiters:
+                for victim in self.__prevention_victims(waiter, [transaction_id]):
+                    if victim not in victims:
+                        victims.append(victim)
+            return victims
+        for waiter in waiters:
+            if waiter in victims:
+                continue
+            if self._wait_would_deadlock(waiter, {transaction_id}):
+                victims.extend(self.__choose_victims(transaction_id, waiter))
+                if transaction_id in victims:
+                    break
+        return victims
+
+    def __conflicting_waiters(self, transaction_id: int, lock_mode: LockMode, resource_name) -> list[int]:
+        """Active waiters queued on resource_name whose requests conflict with lock_mode"""
+        with self.events_lock:
+            return [
+                tid for tid, waiter_mode in self.resource_waiters.get(resource_name, {}).items()
+                if tid != transaction_id
+                and (waiter_mode is None or not lock_mode.compatible_with(waiter_mode))
+                and self.transactions.get(tid, {}).get('status') == TransactionStatus.ACTIVE
+            ]
+
+    def __choose_victims(self, requester: int, waiter: int) -> list[int]:
+        """
+        The new wait-for edges of waiter closed a cycle on behalf of requester.
+        Under the REQUESTER policy the requester is aborted; otherwise the policy's
+        cheapest transaction deadlocked with waiter is, repeatedly, until no cycle
+        runs through waiter. Victims are taken out of the wait-for graph at once.
+        
+        Returns:
+            The victims, in the order they were chosen
+        """
+        if self.deadlock_victim_policy == DeadlockVictimPolicy.REQUESTER:
+            self._remove_from_wait_for_graph(requester)
+            return [requester]
+        victims = []
+        while True:
+            victim = min(self.__deadlocked_with(waiter), key=self._deadlock_victim_rank)
+            self._remove_from_wait_for_graph(victim)
+            victims.append(victim)
+            if victim == waiter or not self.__still_deadlocked(waiter):
+                return victims
+
+    def __deadlocked_with(self, waiter: int) -> set:
+        """Transactions on a cycle through waiter: reachable from it and reaching it in the wait-for graph"""
+        with self.wait_for_lock:
+            reachable = set()
+            stack = [waiter]
+            while stack:
+                for holder in self.wait_for_graph.get(stack.pop(), ()):
+                    if holder not in reachable:
+                        reachable.add(holder)
+                        stack.append(holder)
+            reaching = set()
+            stack = [waiter]
+            while stack:
+                for node in self.waited_by_graph.get(stack.pop(), ()):
+                    if node not in reaching:
+                        reaching.add(node)
+                        stack.append(node)
+        return (reachable & reaching) | {waiter}
+
+    def __still_deadlocked(self, waiter: int) -> bool:
+        """Re-check waiter's remaining edges after a victim left the graph"""
+        if self.deadlock_detection == DeadlockDetection.INCREMENTAL:
+            # also restores the topological order these edges left unfixed
+            with self.wait_for_lock:
+                holders = set(self.wait_for_graph.get(waiter, ()))
+            return self._detect_deadlock_incremental(waiter, holders)
+        return self._detect_deadlock(waiter)
+
+    def _deadlock_victim_rank(self, transaction_id: int) -> tuple:
+        """
+        Sort key of the victim policy, the smallest is aborted; ties go to the
+        youngest. REQUESTER ranks by age alone, for callers with no requester
+        (the periodic detector). A transaction already gone sorts last.
+        """
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None:
+            return (float('inf'),)
+        youngest_first = -transaction['timestamp']
+        policy = self.deadlock_victim_policy
+        if policy in (DeadlockVictimPolicy.REQUESTER, DeadlockVictimPolicy.YOUNGEST):
+            return (youngest_first,)
+        if policy == DeadlockVictimPolicy.FEWEST_LOCKS:
+            return (self._deadlock_victim_cost(transaction_id), youngest_first)
+        if policy == DeadlockVictimPolicy.LEAST_WORK:
+            return (transaction['locks_acquired'], youngest_first)
+        return (self.deadlock_victim_priority(transaction_id), youngest_first)
+
+    def __prevention_victims(self, waiter: int, blockers: list) -> list[int]:
+        """
+        Apply the prevention policy to waiter waiting for blockers. Older means
+        a smaller timestamp; waits only ever go from older to younger (wait-die)
+        or from younger to older (wound-wait), so no cycle can form.
+        
+        Returns:
+            Transactions to abort: [waiter] if it may not wait, the younger
+            blockers it wounds, or nobody
+        """
+        if self.deadlock_prevention == DeadlockPrevention.NO_WAIT:
+            return [waiter]
+        timestamp = self.__timestamp_of(waiter)
+        if self.deadlock_prevention == DeadlockPrevention.WAIT_DIE:
+            if any(self.__timestamp_of(blocker) < timestamp for blocker in blockers):
+                return [waiter]
+            return []
+        return [blocker for blocker in blockers if self.__timestamp_of(blocker) > timestamp]
+
+    def __timestamp_of(self, transaction_id: int) -> int:
+        transaction = self.transactions.get(transaction_id)
+        # a transaction gone from the table holds nothing and can be waited for
+        return transaction['timestamp'] if transaction is not None else float('inf')
+
+    def __victim_reason(self, transaction_id: int) -> tuple[ReasonCode, tuple]:
+        """Reason code and parameters a deadlock victim is aborted with"""
+        if self.deadlock_prevention == DeadlockPrevention.NONE:
+            return ReasonCode.DEADLOCK_VICTIM, (transaction_id,)
+        return ReasonCode.DEADLOCK_PREVENTED, (transaction_id, self.deadlock_prevention)
+
+    def __queued_ahead(self, transaction_id: int, lock_mode: LockMode, resource_name) -> list[int]:
+        """Active waiters queued on resource_name that this request may not overtake under the queue policy"""
+        policy = self.lock_queue_policy
+        if policy == LockQueuePolicy.READER_PREFERRED and lock_mode.is_read:
+            return []
+        
+        ahead = []
+        with self.events_lock:
+            for tid, waiter_mode in self.resource_waiters.get(resource_name, {}).items():
+                if tid == transaction_id:
+                    # a writer-preferred reader also waits for writers queued after it
+                    if policy == LockQueuePolicy.WRITER_PREFERRED and lock_mode.is_read:
+                        continue
+                    break
+                if waiter_mode is None or self.transactions.get(tid, {}).get('status') != TransactionStatus.ACTIVE:
+                    continue
+                if lock_mode.compatible_with(waiter_mode):
+                    continue
+                if policy == LockQueuePolicy.STRICT_FIFO or not waiter_mode.is_read:
+                    ahead.append(tid)
+        return ahead
+
+    def __conflicting_holders(self, stripe, resource_name, transaction_id: int, lock_mode: LockMode) -> dict:
+        """Current holders of resource_name whose modes are incompatible with the request, with those modes"""
+        resource_lock = stripe.locks.get(resource_name)
+        if resource_lock is None:
+            return {}
+        held = resource_lock.holders.get(transaction_id)
+        if held is not None:
+            lock_mode = held.join(lock_mode)
+        return resource_lock.conflicting(transaction_id, lock_mode)
+
+    def __grant_lock(self, transaction_id: int, transaction: dict, lock_mode: LockMode, resource_name, stripe) -> LockMode:
+        """
+        Record a granted lock in the lock table and the transaction, converting
+        any mode already held on the node; caller holds both latches.
+        
+        Returns:
+            The mode now held
+        """
+        transaction['waiting_for'] = None
+        resource_lock = stripe.locks.get(resource_name)
+        if resource_lock is None:
+            resource_lock = stripe.locks[resource_name] = ResourceLock()
+        held = resource_lock.holders.get(transaction_id)
+        if held is not None:
+            lock_mode = held.join(lock_mode)
+        elif type(resource_name) is RowResource:
+            row_locks = transaction['row_locks']
+            row_locks[resource_name.table_name] = row_locks.get(resource_name.table_name, 0) + 1
+        resource_lock.set(transaction_id, lock_mode)
+        transaction['locks'][resource_name] = lock_mode
+        transaction['locks_acquired'] += 1
+        return lock_mode
+
+    def __wait_victims(self, waiter: int, blockers: list) -> list[int]:
+        """
+        Check that waiter may wait for blockers, with waiter as the requester.
+        
+        Returns:
+            The transactions to abort for the wait, possibly waiter itself
+        """
+        if self.deadlock_prevention != DeadlockPrevention.NONE:
+            # decided from timestamps alone, nothing goes into the wait-for graph
+            return self.__prevention_victims(waiter, blockers)
+        # Lock conflict - add to wait-for graph and check for deadlock
+        if self._wait_would_deadlock(waiter, set(blockers)):
+            return self.__choose_victims(waiter, waiter)
+        return []
+
+    def __wait_behind(self, transaction_id: int, transaction: dict, lock_mode: LockMode, resource_name, blockers: list, reason_code: ReasonCode, reason_args: tuple) -> tuple[ConcurrencyResponse, list[int]]:
+        """
+        Queue the request behind blockers, unless waiting for them would close a
+        cycle (or the prevention policy forbids the wait).
+        
+        Returns:
+            The response and the other transactions aborted for it (deadlock
+            victims or wounded blockers), to roll back once the latches are released
+        """
+        victims = self.__wait_victims(transaction_id, blockers)
+        if transaction_id in victims:
+            # this transaction is the victim
+            reason_code, reason_args = self.__victim_reason(transaction_id)
             return ConcurrencyResponse(
                 transaction_id, 
-                f'Read lock granted on table {table_name}',
-                LockStatus.GRANTED,
-                blocked_by=[],
-                active_transactions=self.__get_active_transactions()
-            )
+                reason_code,
+                LockStatus.FAILED,
+                blocked_by=blockers,
+                active_transactions=self.active_transactions,
+                reason_args=reason_args
+            ), [victim for victim in victims if victim != transaction_id]
         
-        if table_action == TableAction.WRITE:
-            # Already holds exclusive lock
-            if exclusive_holder == transaction_id:
-                return ConcurrencyResponse(
-                    transaction_id, 
-                    f'Write lock already held on table {table_name}',
-                    LockStatus.GRANTED,
-                    blocked_by=[],
-                    active_transactions=self.__get_active_transactions()
-                )
-            
-            # Exclusive lock held by another transaction
-            if exclusive_holder is not None:
-                # Add to wait-for graph and check for deadlock
-                self._add_to_wait_for_graph(transaction_id, {exclusive_holder})
-                
-                if self._detect_deadlock(transaction_id):
-                    # Deadlock detected - abort this transaction
-                    self._remove_from_wait_for_graph(transaction_id)
-                    super().transaction_rollback(transaction_id)
-                    self.__transaction_release_locks(transaction_id)
-                    return ConcurrencyResponse(
-                        transaction_id, 
-                        f'Deadlock detected. Transaction {transaction_id} aborted (victim selection).',
-                        LockStatus.FAILED,
-                        blocked_by=[exclusive_holder],
-                        active_transactions=self.__get_active_transactions()
-                    )
-                
-                # No deadlock - safe to wait
-                transaction['waiting_for'] = exclusive_holder
-                # Register this transaction as waiting for the resource
-                self.register_waiting_transaction(transaction_id, table_name)
-                return ConcurrencyResponse(
-                    transaction_id, 
-                    f'Write waiting for exclusive lock holder {exclusive_holder}',
-                    LockStatus.WAITING,
-                    blocked_by=[exclusive_holder],
-                    active_transactions=self.__get_active_transactions()
+        # No deadlock - safe to wait
+        transaction['waiting_for'] = blockers[0]
+        # Register this transaction as waiting for the resource
+        self.register_waiting_transaction(transaction_id, resource_name, lock_mode)
+        return ConcurrencyResponse(
+            transaction_id, 
+            reason_code,
+            LockStatus.WAITING,
+            blocked_by=blockers,
+            active_transactions=self.active_transactions,
+            reason_args=reason_args
+        ), victims
+
+    def __request_lock(self, transaction_id: int, transaction: dict, lock_mode: LockMode, requested_mode: LockMode, resource_name, is_target: bool, stripe) -> tuple[ConcurrencyResponse, list[int]]:
+        """
+        Grant/wait decision for one node; caller holds the stripe latch and the
+        transaction latch. requested_mode is what the caller asked for at the
+        bottom of the path and only names the request in the reasons.
+        
+        Returns:
+            The response and the other transactions the prevention policy
+            aborts for it, to roll back once the latches are released
+        """
+        #recheck under the latch: the transaction may have been aborted concurrently
+        if transaction['status'] != TransactionStatus.ACTIVE:
+            return self.__inactive_response(transaction_id, transaction), []
+        
+        # Already covered by a lock this transaction holds, possibly handed
+        # over on release while it was queued
+        held = transaction['locks'].get(resource_name)
+        if held is not None and held.covers(lock_mode):
+            handed_off = resource_name in transaction['handed_off']
+            transaction['handed_off'].discard(resource_name)
+            if lock_mode == LockMode.S or handed_off:
+                return self._granted(
+                    transaction_id, transaction, ReasonCode.LOCK_GRANTED, lock_mode, resource_name,
+                    active_transactions=self.active_transactions
+                ), []
+            return self._granted(
+                transaction_id, transaction, ReasonCode.LOCK_ALREADY_HELD, requested_mode, resource_name,
+                active_transactions=self.active_transactions
+            ), []
+        
+        # Locks held by other transactions that this request conflicts with
+        conflicting = self.__conflicting_holders(stripe, resource_name, transaction_id, lock_mode)
+        if conflicting:
+            modes = set(conflicting.values())
+            if modes == {LockMode.X}:
+                reason_code, reason_args = ReasonCode.WAITING_FOR_EXCLUSIVE, (requested_mode, next(iter(conflicting)), resource_name, is_target)
+            elif modes == {LockMode.S}:
+                reason_code, reason_args = ReasonCode.WAITING_FOR_SHARED, (requested_mode, len(conflicting), resource_name, is_target)
+            else:
+                reason_code, reason_args = ReasonCode.WAITING_FOR_LOCKS, (requested_mode, modes, len(conflicting), resource_name, is_target)
+            return self.__wait_behind(transaction_id, transaction, lock_mode, resource_name, list(conflicting), reason_code, reason_args)
+        
+        # Nothing queued here (registrations happen under this latch), so none of
+        # the queue bookkeeping below applies
+        if resource_name not in self.resource_waiters:
+            self.__grant_lock(transaction_id, transaction, lock_mode, resource_name, stripe)
+            return self._granted(
+                transaction_id, transaction, ReasonCode.LOCK_GRANTED, lock_mode, resource_name,
+                active_transactions=self.active_transactions
+            ), []
+        
+        # Compatible with the holders, but may not overtake conflicting requests
+        # queued before it; a conversion is exempt since those already wait for it
+        if held is None:
+            queued_ahead = self.__queued_ahead(transaction_id, lock_mode, resource_name)
+            if queued_ahead:
+                return self.__wait_behind(
+                    transaction_id, transaction, lock_mode, resource_name,
+                    queued_ahead,
+                    ReasonCode.WAITING_IN_QUEUE, (requested_mode, len(queued_ahead), resource_name, is_target)
                 )
-            
-            # Shared locks held by other transactions
-            if shared_holders is not None:
-                other_shared_holders = shared_holders - {transaction_id}
-                if len(other_shared_holders) > 0:
-                    # Add to wait-for graph and check for deadlock
-                    self._add_to_wait_for_graph(transaction_id, other_shared_holders)
-                    
-                    if self._detect_deadlock(transaction_id):
-                        # Deadlock detected - abort this transaction
-                        self._remove_from_wait_for_graph(transaction_id)
-                        super().transaction_rollback(transaction_id)
-                        self.__transaction_release_locks(transaction_id)
-                        return ConcurrencyResponse(
-                            transaction_id, 
-                            f'Deadlock detected. Transaction {transaction_id} aborted (victim selection).',
-                            LockStatus.FAILED,
-                            blocked_by=list(other_shared_holders),
-                            active_transactions=self.__get_active_transactions()
-                        )
-                    
-                    # No deadlock - safe to wait
-                    first_holder = next(iter(other_shared_holders))
-                    transaction['waiting_for'] = first_holder
-                    # Register this transaction as waiting for the resource
-                    self.register_waiting_transaction(transaction_id, table_name)
-                    return ConcurrencyResponse(
-                        transaction_id, 
-                        f'Write waiting for shared locks held by {len(other_shared_holders)} transaction(s)',
-                        LockStatus.WAITING,
-                        blocked_by=list(other_shared_holders),
-                        active_transactions=self.__get_active_transactions()
-                    )
-                
-                # Only this transaction holds shared lock - upgrade to exclusive
-                shared_holders.discard(transaction_id)
-                transaction['shared_tables'].discard(table_name)
-                if len(shared_holders) == 0:
-                    del self.shared_locks[table_name]
-            
-            # Grant exclusive lock
-            transaction['exclusive_tables'].add(table_name)
-            self.exclusive_locks[table_name] = transaction_id
-            # Clear wait event if this transaction was waiting
-            self._clear_wait_event(transaction_id, table_name)
+        
+        # Requests still queued here will have to wait for this grantee too
+        granted_mode = lock_mode if held is None else held.join(lock_mode)
+        victims = self.__grant_would_deadlock(transaction_id, granted_mode, resource_name)
+        if transaction_id in victims:
+            # deadlock victim, or wounded by an older waiter it would overtake
+            reason_code, reason_args = self.__victim_reason(transaction_id)
             return ConcurrencyResponse(
                 transaction_id, 
-                f'Write lock granted on table {table_name} (exclusive)',
-                LockStatus.GRANTED,
-                blocked_by=[],
-                active_transactions=self.__get_active_transactions()
-            )
+                reason_code,
+                LockStatus.FAILED,
+                blocked_by=self.__conflicting_waiters(transaction_id, granted_mode, resource_name),
+                active_transactions=self.active_transactions,
+                reason_args=reason_args
+            ), [victim for victim in victims if victim != transaction_id]
         
-        raise Exception(f'Unknown table action {table_action}')
\ No newline at end of file
+        self.__grant_lock(transaction_id, transaction, lock_mode, resource_name, stripe)
+        # Clear wait event if this transaction was waiting
+        self._clear_wait_event(transaction_id, resource_name)
+        return self._granted(
+            transaction_id, transaction, ReasonCode.LOCK_GRANTED, lock_mode, resource_name,
+            active_transactions=self.active_transactions
+        ), victims
@@ -0,0 +1,59 @@
+from enum import Enum
+
+class LockMode(Enum):
+    IS = 'intention_shared'                 #will lock descendants in S
+    IX = 'intention_exclusive'              #will lock descendants in X
+    S = 'shared'
+    U = 'update'                            #S that may be converted to X, held by one transaction at a time
+    SIX = 'shared_intention_exclusive'      #S on this node plus IX for its descendants
+    X = 'exclusive'
+
+    # members are singletons, so identity hashing is consistent with equality and
+    # keeps the matrix lookups below out of Enum's pure-Python __hash__
+    __hash__ = object.__hash__
+
+    def compatible_with(self, other: 'LockMode') -> bool:
+        """Whether another transaction may hold other on a node while this one holds self"""
+        return LOCK_COMPATIBILITY[self][other]
+
+    def join(self, other: 'LockMode') -> 'LockMode':
+        """Weakest mode granting both self and other, used when a held lock is converted"""
+        return LOCK_JOIN[self][other]
+
+    def covers(self, other: 'LockMode') -> bool:
+        """Whether holding self already grants other"""
+        return LOCK_JOIN[self][other] == self
+
+    @property
+    def intention(self) -> 'LockMode':
+        """Mode to hold on every ancestor before self can be requested on a node"""
+        return LockMode.IS if self in (LockMode.IS, LockMode.S) else LockMode.IX
+
+    @property
+    def is_read(self) -> bool:
+        """Whether this mode only reads, for the queue policies' reader/writer split"""
+        return self in (LockMode.IS, LockMode.S)
+
+IS, IX, S, U, SIX, X = LockMode.IS, LockMode.IX, LockMode.S, LockMode.U, LockMode.SIX, LockMode.X
+
+#LOCK_COMPATIBILITY[held][requested]
+#U admits readers but no second updater, so two read-then-write transactions
+#queue on the U request instead of deadlocking on their S -> X conversions
+LOCK_COMPATIBILITY = {
+    IS:  {IS: True,  IX: True,  S: True,  U: True,  SIX: True,  X: False},
+    IX:  {IS: True,  IX: True,  S: False, U: False, SIX: False, X: False},
+    S:   {IS: True,  IX: False, S: True,  U: True,  SIX: False, X: False},
+    U:   {IS: True,  IX: False, S: True,  U: False, SIX: False, X: False},
+    SIX: {IS: True,  IX: False, S: False, U: False, SIX: False, X: False},
+    X:   {IS: False, IX: False, S: False, U: False, SIX: False, X: False},
+}
+
+#LOCK_JOIN[held][requested]: mode after converting held to also grant requested
+LOCK_JOIN = {
+    IS:  {IS: IS,  IX: IX,  S: S,   U: U,   SIX: SIX, X: X},
+    IX:  {IS: IX,  IX: IX,  S: SIX, U: SIX, SIX: SIX, X: X},
+    S:   {IS: S,   IX: SIX, S: S,   U: U,   SIX: SIX, X: X},
+    U:   {IS: U,   IX: SIX, S: U,   U: U,   SIX: SIX, X: X},
+    SIX: {IS: SIX, IX: SIX, S: SIX, U: SIX, SIX: SIX, X: X},
+    X:   {IS: X,   IX: X,   S: X,   U: X,   SIX: X,   X: X},
+}
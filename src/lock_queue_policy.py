@@ -0,0 +1,6 @@
+from enum import Enum
+
+class LockQueuePolicy(Enum):
+    STRICT_FIFO = 'strict_fifo'             #requests are granted in arrival order, nobody overtakes a conflicting waiter
+    READER_PREFERRED = 'reader_preferred'   #readers join any compatible holders even past queued writers
+    WRITER_PREFERRED = 'writer_preferred'   #queued writers go first, new readers wait behind them
@@ -0,0 +1,76 @@
+import threading
+from collections import namedtuple
+
+#resource id of the root of the lock hierarchy; tables are keyed by their name
+DATABASE = ('database',)
+#resource id of one row of a table
+RowResource = namedtuple('RowResource', ['table_name', 'row_key'])
+
+class ResourceLock:
+    """
+    Holders of one resource with how many hold each mode, so a request that
+    conflicts with nobody is recognised without scanning the holders (e.g. a
+    hot table intention-locked by many transactions).
+    """
+
+    def __init__(self):
+        # holders[T] = LockMode held by T
+        self.holders = {}
+        self.mode_counts = {}
+
+    def __len__(self) -> int:
+        return len(self.holders)
+
+    def set(self, transaction_id: int, lock_mode) -> None:
+        self.remove(transaction_id)
+        self.holders[transaction_id] = lock_mode
+        self.mode_counts[lock_mode] = self.mode_counts.get(lock_mode, 0) + 1
+
+    def remove(self, transaction_id: int) -> bool:
+        lock_mode = self.holders.pop(transaction_id, None)
+        if lock_mode is None:
+            return False
+        self.mode_counts[lock_mode] -= 1
+        if self.mode_counts[lock_mode] == 0:
+            del self.mode_counts[lock_mode]
+        return True
+
+    def conflicting(self, transaction_id: int, lock_mode) -> dict:
+        """Other holders whose modes are incompatible with lock_mode, with those modes"""
+        held = self.holders.get(transaction_id)
+        for mode, count in self.mode_counts.items():
+            if mode == held:
+                count -= 1
+            if count and not lock_mode.compatible_with(mode):
+                break
+        else:
+            return {}
+        return {
+            tid: mode for tid, mode in self.holders.items()
+            if tid != transaction_id and not lock_mode.compatible_with(mode)
+        }
+
+class LockTableStripe:
+    """One partition of the lock table: holder maps for the resources hashed to it and their latch"""
+
+    def __init__(self):
+        self.latch = threading.Lock()
+        # locks[resource] = ResourceLock with the holders of that resource
+        self.locks = {}
+
+class LockTable:
+    """
+    Lock table split into hash stripes. Each stripe owns the holder maps of the
+    resources (database, tables, rows) that hash to it and a latch guarding them,
+    so requests on unrelated resources do not contend on the same mutex.
+
+    Callers must hold at most one stripe latch at a time.
+    """
+
+    def __init__(self, stripe_count: int = 64):
+        if stripe_count < 1:
+            raise Exception(f'Lock table needs at least one stripe, got {stripe_count}')
+        self.stripes = [LockTableStripe() for _ in range(stripe_count)]
+
+    def stripe(self, resource) -> LockTableStripe:
+        return self.stripes[hash(resource) % len(self.stripes)]
@@ -0,0 +1,120 @@
+from enum import Enum
+from .lock_mode import LockMode
+from .lock_table import RowResource, DATABASE
+
+class ReasonCode(Enum):
+    MESSAGE = 'message'                                 #(text,) free-form message
+    TRANSACTION_NOT_FOUND = 'transaction_not_found'     #(transaction_id,)
+    TRANSACTION_NOT_ACTIVE = 'transaction_not_active'   #(transaction_id, status)
+    TWO_PHASE_LOCKING_VIOLATED = 'two_phase_locking_violated'   #(transaction_id,)
+    REQUESTS_GRANTED = 'requests_granted'               #(count, verb) a whole batch went through
+
+    # lock-based
+    LOCK_GRANTED = 'lock_granted'                       #(lock_mode, resource_name)
+    LOCK_ALREADY_HELD = 'lock_already_held'             #(requested_mode, resource_name)
+    TABLE_LOCKS_GRANTED = 'table_locks_granted'         #(count,)
+    WAITING_FOR_EXCLUSIVE = 'waiting_for_exclusive'     #(requested_mode, holder, resource_name, is_target)
+    WAITING_FOR_SHARED = 'waiting_for_shared'           #(requested_mode, holder_count, resource_name, is_target)
+    WAITING_FOR_LOCKS = 'waiting_for_locks'             #(requested_mode, held_modes, holder_count, resource_name, is_target)
+    WAITING_IN_QUEUE = 'waiting_in_queue'               #(requested_mode, queued_count, resource_name, is_target)
+    DEADLOCK_VICTIM = 'deadlock_victim'                 #(transaction_id,)
+    DEADLOCK_PREVENTED = 'deadlock_prevented'           #(transaction_id, deadlock_prevention)
+    LOCK_WAIT_TIMEOUT = 'lock_wait_timeout'             #(transaction_id,)
+    DEADLINE_EXCEEDED = 'deadline_exceeded'             #(transaction_id,)
+
+    # timestamp-based
+    READ_ALLOWED = 'read_allowed'                       #(table_name,)
+    WRITE_ALLOWED = 'write_allowed'                     #(table_name,)
+    WRITE_IGNORED = 'write_ignored'                     #(table_name,) Thomas write rule
+    READ_DENIED = 'read_denied'                         #(table_name, write_timestamp, timestamp)
+    WRITE_DENIED = 'write_denied'                       #(table_name, read_timestamp, timestamp)
+    COMMIT_DENIED = 'commit_denied'                     #(table_name,)
+    COMMITTED = 'committed'                             #()
+
+    # validation-based
+    READ_SUCCESSFUL = 'read_successful'                 #()
+    WRITE_SUCCESSFUL = 'write_successful'               #()
+    VALIDATION_SUCCESSFUL = 'validation_successful'     #()
+    VALIDATION_FAILED = 'validation_failed'             #(other_transaction_id,)
+
+    # members are singletons, see LockMode
+    __hash__ = object.__hash__
+
+    def format(self, *reason_args) -> str:
+        """Human-readable message for this reason with its parameters"""
+        return REASON_MESSAGES[self](*reason_args)
+
+def object_name(resource_name) -> str:
+    """How a resource id is named in the messages"""
+    if resource_name == DATABASE:
+        return 'database'
+    if isinstance(resource_name, RowResource):
+        return f'row {resource_name.row_key} of table {resource_name.table_name}'
+    return f'table {resource_name}'
+
+def action_name(lock_mode: LockMode) -> str:
+    """How a requested mode is named in the messages"""
+    if lock_mode == LockMode.S:
+        return 'Read'
+    if lock_mode == LockMode.X:
+        return 'Write'
+    if lock_mode == LockMode.U:
+        return 'Update'
+    return lock_mode.name
+
+def granted_message(lock_mode: LockMode, resource_name) -> str:
+    if lock_mode == LockMode.S:
+        return f'Read lock granted on {object_name(resource_name)}'
+    if lock_mode == LockMode.X:
+        return f'Write lock granted on {object_name(resource_name)} (exclusive)'
+    if lock_mode == LockMode.U:
+        return f'Update lock granted on {object_name(resource_name)}'
+    return f'{lock_mode.name} lock granted on {object_name(resource_name)}'
+
+def location(resource_name, is_target: bool) -> str:
+    """Waits on an ancestor of the requested node name the node they happen on"""
+    return '' if is_target else f' on {object_name(resource_name)}'
+
+#REASON_MESSAGES[code](*reason_args)
+REASON_MESSAGES = {
+    ReasonCode.MESSAGE: lambda text: text,
+    ReasonCode.TRANSACTION_NOT_FOUND: lambda transaction_id: f'transaction {transaction_id} does not exist',
+    ReasonCode.TRANSACTION_NOT_ACTIVE: lambda transaction_id, status: f'transaction {transaction_id} is in {status.value} state',
+    ReasonCode.TWO_PHASE_LOCKING_VIOLATED: lambda transaction_id: f'transaction {transaction_id} violated 2pl',
+    ReasonCode.REQUESTS_GRANTED: lambda count, verb: f'{count} requests {verb}',
+
+    ReasonCode.LOCK_GRANTED: granted_message,
+    ReasonCode.LOCK_ALREADY_HELD: lambda requested_mode, resource_name:
+        f'{action_name(requested_mode)} lock already held on {object_name(resource_name)}',
+    ReasonCode.TABLE_LOCKS_GRANTED: lambda count: f'{count} table locks granted',
+    ReasonCode.WAITING_FOR_EXCLUSIVE: lambda requested_mode, holder, resource_name, is_target:
+        f'{action_name(requested_mode)} waiting for exclusive lock holder {holder}{location(resource_name, is_target)}',
+    ReasonCode.WAITING_FOR_SHARED: lambda requested_mode, holder_count, resource_name, is_target:
+        f'{action_name(requested_mode)} waiting for shared locks held by {holder_count} transaction(s){location(resource_name, is_target)}',
+    ReasonCode.WAITING_FOR_LOCKS: lambda requested_mode, held_modes, holder_count, resource_name, is_target:
+        f'{action_name(requested_mode)} waiting for {"/".join(mode.name for mode in LockMode if mode in held_modes)} '
+        f'locks held by {holder_count} transaction(s){location(resource_name, is_target)}',
+    ReasonCode.WAITING_IN_QUEUE: lambda requested_mode, queued_count, resource_name, is_target:
+        f'{action_name(requested_mode)} waiting behind {queued_count} queued request(s){location(resource_name, is_target)}',
+    ReasonCode.DEADLOCK_VICTIM: lambda transaction_id: f'Deadlock detected. Transaction {transaction_id} aborted (victim selection).',
+    ReasonCode.DEADLOCK_PREVENTED: lambda transaction_id, deadlock_prevention:
+        f'Deadlock prevented ({deadlock_prevention.value}). Transaction {transaction_id} aborted.',
+    ReasonCode.LOCK_WAIT_TIMEOUT: lambda transaction_id: f'Lock wait timeout. Transaction {transaction_id} aborted.',
+    ReasonCode.DEADLINE_EXCEEDED: lambda transaction_id: f'Deadline exceeded. Transaction {transaction_id} aborted.',
+
+    ReasonCode.READ_ALLOWED: lambda table_name: f'Read allowed on table {table_name}',
+    ReasonCode.WRITE_ALLOWED: lambda table_name: f'Write allowed on table {table_name}',
+    ReasonCode.WRITE_IGNORED: lambda table_name:
+        f'Write ignored (Thomas Write Rule): table {table_name} already written by newer transaction',
+    ReasonCode.READ_DENIED: lambda table_name, write_timestamp, timestamp:
+        f'Read denied: table {table_name} written by newer transaction (WTS={write_timestamp} > TS={timestamp})',
+    ReasonCode.WRITE_DENIED: lambda table_name, read_timestamp, timestamp:
+        f'Write denied: table {table_name} read by newer transaction (RTS={read_timestamp} > TS={timestamp})',
+    ReasonCode.COMMIT_DENIED: lambda table_name: f'Commit denied: table {table_name} was modified by newer transaction',
+    ReasonCode.COMMITTED: lambda: 'Transaction committed successfully',
+
+    ReasonCode.READ_SUCCESSFUL: lambda: 'Read successful',
+    ReasonCode.WRITE_SUCCESSFUL: lambda: 'Write successful',
+    ReasonCode.VALIDATION_SUCCESSFUL: lambda: 'Validation successful',
+    ReasonCode.VALIDATION_FAILED: lambda other_transaction_id: f'Validation failed due to conflict with transaction {other_transaction_id}',
+}
@@ -0,0 +1,131 @@
+import threading
+from collections.abc import MutableSet
+
+class ResourceRegistry:
+    """
+    Interns resource names (tables, rows) to dense integer ids, in the order
+    they are first seen; safe to share between threads. Ids are never
+    reused, so a bitmap built against the registry stays valid.
+    """
+
+    def __init__(self):
+        # ids[name] = id, names[id] = name
+        self.ids = {}
+        self.names = []
+        self.lock = threading.Lock()
+
+    def intern(self, name) -> int:
+        """Id of name, assigning the next one if it was never seen"""
+        resource_id = self.ids.get(name)
+        if resource_id is not None:
+            return resource_id
+        with self.lock:
+            resource_id = self.ids.get(name)
+            if resource_id is None:
+                resource_id = len(self.names)
+                self.names.append(name)
+                self.ids[name] = resource_id
+            return resource_id
+
+    def lookup(self, name) -> int | None:
+        """Id of name, None if it was never interned"""
+        return self.ids.get(name)
+
+    def name_of(self, resource_id: int):
+        return self.names[resource_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+class ResourceSet(MutableSet):
+    """
+    Set of resource names stored as an integer bitmap over the ids of a
+    ResourceRegistry: bit i is set when names[i] is in the set. Behaves like
+    a set of names (it compares equal to one); sets of the same registry
+    intersect and merge with a single integer operation, see intersects().
+    """
+
+    __slots__ = ('registry', 'bits')
+
+    def __init__(self, registry: ResourceRegistry, names=(), bits: int = 0):
+        self.registry = registry
+        self.bits = bits
+        for name in names:
+            self.add(name)
+
+    def _from_iterable(self, names) -> 'ResourceSet':
+        return ResourceSet(self.registry, names)
+
+    def __contains__(self, name) -> bool:
+        resource_id = self.registry.lookup(name)
+        return resource_id is not None and (self.bits >> resource_id) & 1 == 1
+
+    def __iter__(self):
+        names = self.registry.names
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield names[lowest.bit_length() - 1]
+            bits ^= lowest
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def add(self, name) -> None:
+        self.bits |= 1 << self.registry.intern(name)
+
+    def discard(self, name) -> None:
+        resource_id = self.registry.lookup(name)
+        if resource_id is not None:
+            self.bits &= ~(1 << resource_id)
+
+    def update(self, names) -> None:
+        if isinstance(names, ResourceSet) and names.registry is self.registry:
+            self.bits |= names.bits
+            return
+        intern = self.registry.intern
+        bits = self.bits
+        for name in names:
+            bits |= 1 << intern(name)
+        self.bits = bits
+
+    def clear(self) -> None:
+        self.bits = 0
+
+    def copy(self) -> 'ResourceSet':
+        return ResourceSet(self.registry, bits=self.bits)
+
+    def intersects(self, other: 'ResourceSet') -> bool:
+        """Whether the two sets (of the same registry) share a resource"""
+        return self.bits & other.bits != 0
+
+    def __and__(self, other):
+        if isinstance(other, ResourceSet) and other.registry is self.registry:
+            return ResourceSet(self.registry, bits=self.bits & other.bits)
+        return super().__and__(other)
+
+    def __or__(self, other):
+        if isinstance(other, ResourceSet) and other.registry is self.registry:
+            return ResourceSet(self.registry, bits=self.bits | other.bits)
+        return super().__or__(other)
+
+    def __sub__(self, other):
+        if isinstance(other, ResourceSet) and other.registry is self.registry:
+            return ResourceSet(self.registry, bits=self.bits & ~other.bits)
+        return super().__sub__(other)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ResourceSet) and other.registry is self.registry:
+            return self.bits == other.bits
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        # printed like the set of names it stands for
+        if not self.bits:
+            return 'set()'
+        return '{' + ', '.join(repr(name) for name in self) + '}'
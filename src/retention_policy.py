@@ -0,0 +1,44 @@
+class RetentionPolicy:
+    """
+    Decides how long TERMINATED transactions stay in the transaction table.
+
+    max_terminated: keep at most this many terminated transactions (0 evicts immediately)
+    max_age: evict terminated transactions that ended more than max_age seconds ago
+    With both unset every transaction is kept forever.
+    """
+
+    def __init__(self, max_terminated: int | None = None, max_age: float | None = None):
+        if max_terminated is not None and max_terminated < 0:
+            raise Exception(f'max_terminated must be non-negative, got {max_terminated}')
+        if max_age is not None and max_age < 0:
+            raise Exception(f'max_age must be non-negative, got {max_age}')
+        self.max_terminated = max_terminated
+        self.max_age = max_age
+
+    @classmethod
+    def keep_all(cls) -> 'RetentionPolicy':
+        return cls()
+
+    @classmethod
+    def immediate(cls) -> 'RetentionPolicy':
+        return cls(max_terminated=0)
+
+    @classmethod
+    def after_count(cls, max_terminated: int) -> 'RetentionPolicy':
+        return cls(max_terminated=max_terminated)
+
+    @classmethod
+    def after_age(cls, max_age: float) -> 'RetentionPolicy':
+        return cls(max_age=max_age)
+
+    @property
+    def retains_all(self) -> bool:
+        return self.max_terminated is None and self.max_age is None
+
+    def should_evict(self, terminated_count: int, age: float) -> bool:
+        """Whether the oldest of terminated_count retained transactions, ended age seconds ago, should go"""
+        if self.max_terminated is not None and terminated_count > self.max_terminated:
+            return True
+        if self.max_age is not None and age >= self.max_age:
+            return True
+        return False
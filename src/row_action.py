@@ -3,7 +3,9 @@ from enum import Enum
 class RowAction(Enum):
     READ = 'read'
     WRITE = 'write'
+    READ_FOR_UPDATE = 'read_for_update'     #read now, write later (update lock)
 
 class TableAction(Enum):
     READ = 'read'
     WRITE = 'write'
+    READ_FOR_UPDATE = 'read_for_update'     #read now, write later (update lock)
@@ -1,22 +1,28 @@
 from .row_action import TableAction
 from .concurrency_response import ConcurrencyResponse, LockStatus
+from .reason_code import ReasonCode
 from .concurrency_control_manager import ConcurrencyControlManager
+from .retention_policy import RetentionPolicy
+from .timestamp_oracle import TimestampOracle
+from .resource_registry import ResourceRegistry, ResourceSet
 
 class TimestampBasedConcurrencyControlManager(ConcurrencyControlManager):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, retention_policy: RetentionPolicy | None = None, timestamp_oracle: TimestampOracle | None = None):
+        super().__init__(retention_policy, timestamp_oracle)
+        # read and write sets are bitmaps over the interned table names
+        self.resource_registry = ResourceRegistry()
         self.table_read_timestamps = {}
         self.table_write_timestamps = {}
 
     def transaction_begin(self) -> int:
         transaction_id = super().transaction_begin()
-        # pake transaction_id karena udah incremental
+        # one draw per begin, so with a fresh oracle the timestamp is the transaction id
         self.transactions[transaction_id] = {
             **self.transactions[transaction_id],
-            'timestamp': transaction_id,
-            'read_set': set(),
-            'write_set': set()
+            'timestamp': self.timestamp_oracle.allocate(),
+            'read_set': ResourceSet(self.resource_registry),
+            'write_set': ResourceSet(self.resource_registry)
         }
         return transaction_id
 
@@ -32,40 +38,77 @@ class TimestampBasedConcurrencyControlManager(ConcurrencyControlManager):
                 super().transaction_rollback(transaction_id)
                 return ConcurrencyResponse(
                     transaction_id, 
-                    f'Commit denied: table {table_name} was modified by newer transaction',
-                    LockStatus.FAILED
+                    ReasonCode.COMMIT_DENIED,
+                    LockStatus.FAILED,
+                    reason_args=(table_name,)
                 )
         
         # commit success
         super().transaction_commit(transaction_id)
-        return ConcurrencyResponse(transaction_id, 'Transaction committed successfully', LockStatus.GRANTED)
+        return ConcurrencyResponse(transaction_id, ReasonCode.COMMITTED, LockStatus.GRANTED)
 
     def transaction_query(self, transaction_id: int, table_action: TableAction, table_name: str) -> ConcurrencyResponse:
         self.transaction_assert_exists(transaction_id)
         self.transaction_assert_queryable(transaction_id)
         
         transaction = self.transactions[transaction_id]
+        response = self.__apply_access(transaction_id, transaction, table_action, table_name)
+        if response is not None:
+            return response
+        if table_action != TableAction.WRITE:
+            return self._granted(transaction_id, transaction, ReasonCode.READ_ALLOWED, table_name)
+        return self._granted(transaction_id, transaction, ReasonCode.WRITE_ALLOWED, table_name)
+
+    def transaction_query_many(self, transaction_id: int, requests: list[tuple[TableAction, str]]) -> ConcurrencyResponse:
+        """
+        Apply the timestamp rules to every (table_action, table_name) request in
+        order, with one state check for the batch. The first rejected request
+        rolls the transaction back and its response is returned.
+        """
+        for table_action, _ in requests:
+            if table_action not in (TableAction.READ, TableAction.WRITE, TableAction.READ_FOR_UPDATE):
+                raise Exception(f'Unknown table action {table_action}')
+        self.transaction_assert_exists(transaction_id)
+        self.transaction_assert_queryable(transaction_id)
+        
+        transaction = self.transactions[transaction_id]
+        for table_action, table_name in requests:
+            response = self.__apply_access(transaction_id, transaction, table_action, table_name)
+            if response is not None and not response.can_proceed:
+                return response
+        return ConcurrencyResponse(transaction_id, ReasonCode.REQUESTS_GRANTED, LockStatus.GRANTED, reason_args=(len(requests), 'allowed'))
+
+    def __apply_access(self, transaction_id: int, transaction: dict, table_action: TableAction, table_name: str) -> ConcurrencyResponse | None:
+        """
+        Check one access against the table timestamps and record it.
+        
+        Returns:
+            None for a plain grant, otherwise the response (a rejection, or a
+            write skipped by the Thomas Write Rule)
+        """
         ts = transaction['timestamp']
         
         # get current timestamps buat table
         read_ts = self.table_read_timestamps.get(table_name, 0)
         write_ts = self.table_write_timestamps.get(table_name, 0)
         
-        if table_action == TableAction.READ:
+        # timestamps order the accesses without locks, so a read for update is a plain read
+        if table_action in (TableAction.READ, TableAction.READ_FOR_UPDATE):
             # Read rule: TS(Ti) >= WTS(X)
             if ts < write_ts:
                 # Reject: read data yg udah ke-write ts yg lebih muda
                 super().transaction_rollback(transaction_id)
                 return ConcurrencyResponse(
                     transaction_id, 
-                    f'Read denied: table {table_name} written by newer transaction (WTS={write_ts} > TS={ts})',
-                    LockStatus.FAILED
+                    ReasonCode.READ_DENIED,
+                    LockStatus.FAILED,
+                    reason_args=(table_name, write_ts, ts)
                 )
             
             # update read timestamp ke max
             self.table_read_timestamps[table_name] = max(read_ts, ts)
             transaction['read_set'].add(table_name)
-            return ConcurrencyResponse(transaction_id, f'Read allowed on table {table_name}', LockStatus.GRANTED)
+            return None
         
         if table_action == TableAction.WRITE:
             # Write rule: TS(Ti) >= RTS(X) and TS(Ti) >= WTS(X)
@@ -74,22 +117,19 @@ class TimestampBasedConcurrencyControlManager(ConcurrencyControlManager):
                 super().transaction_rollback(transaction_id)
                 return ConcurrencyResponse(
                     transaction_id, 
-                    f'Write denied: table {table_name} read by newer transaction (RTS={read_ts} > TS={ts})',
-                    LockStatus.FAILED
+                    ReasonCode.WRITE_DENIED,
+                    LockStatus.FAILED,
+                    reason_args=(table_name, read_ts, ts)
                 )
             
             if ts < write_ts:
                 # Thomas Write Rule: ga peduli kalo ts > write_ts 
                 transaction['write_set'].add(table_name)
-                return ConcurrencyResponse(
-                    transaction_id, 
-                    f'Write ignored (Thomas Write Rule): table {table_name} already written by newer transaction',
-                    LockStatus.GRANTED
-                )
+                return self._granted(transaction_id, transaction, ReasonCode.WRITE_IGNORED, table_name)
             
             # update write timestamp
             self.table_write_timestamps[table_name] = ts
             transaction['write_set'].add(table_name)
-            return ConcurrencyResponse(transaction_id, f'Write allowed on table {table_name}', LockStatus.GRANTED)
+            return None
         
         raise Exception(f'Unknown table action {table_action}')
@@ -0,0 +1,58 @@
+import threading
+
+class TimestampOracle:
+    """
+    Monotonic logical clock the managers take their timestamps from; safe to
+    share between threads and between managers.
+
+    advance() reads the clock under its lock, so its timestamps are ordered
+    like the calls. allocate() may instead hand out the next value of a range
+    the calling thread leased earlier (lease_size values at a time), which
+    only guarantees that the timestamp is unique, that it increases within
+    the thread, and that it is larger than every advance() that returned
+    before the lease was taken. With lease_size 1 (the default) allocate()
+    and advance() are the same, and a manager that allocates once per begin
+    gives each transaction its id as timestamp.
+    """
+
+    def __init__(self, start: int = 1, lease_size: int = 1):
+        if lease_size < 1:
+            raise Exception(f'Timestamp lease size must be positive, got {lease_size}')
+        self.next_timestamp = start
+        self.lease_size = lease_size
+        self.lock = threading.Lock()
+        # per thread: next leased timestamp and the end of the lease
+        self.leases = threading.local()
+
+    def advance(self) -> int:
+        """Next timestamp of the shared clock, later than every timestamp handed out so far"""
+        with self.lock:
+            timestamp = self.next_timestamp
+            self.next_timestamp += 1
+            return timestamp
+
+    def lease(self, count: int) -> range:
+        """Reserve count consecutive timestamps for the caller"""
+        if count < 1:
+            raise Exception(f'Timestamp lease size must be positive, got {count}')
+        with self.lock:
+            start = self.next_timestamp
+            self.next_timestamp += count
+        return range(start, start + count)
+
+    def allocate(self) -> int:
+        """Next timestamp for the calling thread, from its lease when lease_size > 1"""
+        if self.lease_size == 1:
+            return self.advance()
+        leases = self.leases
+        timestamp = getattr(leases, 'next', None)
+        if timestamp is None or timestamp >= leases.end:
+            lease = self.lease(self.lease_size)
+            timestamp, leases.end = lease.start, lease.stop
+        leases.next = timestamp + 1
+        return timestamp
+
+    @property
+    def current(self) -> int:
+        """The timestamp the next advance() would return"""
+        return self.next_timestamp
@@ -0,0 +1,14 @@
+import threading
+
+class TransactionIdAllocator:
+    """Hands out strictly increasing transaction ids; safe to share between threads"""
+
+    def __init__(self, start: int = 1):
+        self.next_id = start
+        self.lock = threading.Lock()
+
+    def allocate(self) -> int:
+        with self.lock:
+            transaction_id = self.next_id
+            self.next_id += 1
+            return transaction_id
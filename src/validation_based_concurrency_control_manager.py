@@ -1,79 +1,287 @@
-import time
+import threading
+from collections import deque
 
 from .transaction_status import TransactionStatus
 from .row_action import TableAction
 from .concurrency_response import ConcurrencyResponse, LockStatus
+from .reason_code import ReasonCode
 from .concurrency_control_manager import ConcurrencyControlManager
+from .retention_policy import RetentionPolicy
+from .timestamp_oracle import TimestampOracle
+from .resource_registry import ResourceRegistry, ResourceSet
+from .conflict_matrix import ConflictMatrix
 
 class ValidationBasedConcurrencyControlManager(ConcurrencyControlManager):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(
+        self,
+        retention_policy: RetentionPolicy | None = None,
+        timestamp_oracle: TimestampOracle | None = None,
+        group_commit: bool = False,
+        conflict_matrix_threshold: int | None = None,
+    ):
+        super().__init__(retention_policy, timestamp_oracle)
+        # read and write sets are bitmaps over the interned table names
+        self.resource_registry = ResourceRegistry()
+        # (finish_timestamp, transaction_id, start_timestamp, write_bits) of flushed commits, oldest finish first
+        self.commit_log = deque()
+        # validated_transactions[transaction_id] = (validation_timestamp, start_timestamp, write_bits) until flushed
+        self.validated_transactions = {}
+        # validation and the commit log updates run one at a time
+        self.validation_lock = threading.Lock()
+
+        # With group commit, committing transactions queue up in commit_queue and
+        # whoever takes validation_lock next validates the whole queue as one
+        # group; the others find their response in group_commit_responses
+        self.group_commit = group_commit
+        self.commit_queue = []
+        self.commit_queue_lock = threading.Lock()
+        self.group_commit_responses = {}
+        # number of groups validated, for measuring the group size
+        self.commit_group_count = 0
+        # groups of at least this many transactions check their members against
+        # each other with a ConflictMatrix (needs NumPy); None never does
+        if conflict_matrix_threshold is not None and conflict_matrix_threshold < 2:
+            raise Exception(f'Conflict matrix threshold must be at least 2, got {conflict_matrix_threshold}')
+        self.conflict_matrix_threshold = conflict_matrix_threshold
 
     def transaction_begin(self) -> int:
         transaction_id = super().transaction_begin()
         self.transactions[transaction_id] = {
             **self.transactions[transaction_id],
-            'read_set': set(),
-            'write_set': set(),
-            'start_timestamp': time.time(),
+            'read_set': ResourceSet(self.resource_registry),
+            'write_set': ResourceSet(self.resource_registry),
+            # may come from a leased range, which only makes validation see more overlap
+            'start_timestamp': self.timestamp_oracle.allocate(),
             'validation_timestamp': None,
             'finish_timestamp': None,
         }
         return transaction_id      
 
+    def _oldest_active_start(self) -> int | float | None:
+        """
+        Start timestamp of the oldest active transaction. One still inside
+        transaction_begin may have drawn its start without storing it yet, so
+        while there is one the answer is -inf and nothing counts as finished
+        before it.
+
+        Returns:
+            The timestamp, None when nothing is active
+        """
+        oldest = None
+        for tid in list(self.active_transactions):
+            start_ts = self.transactions.get(tid, {}).get('start_timestamp')
+            if start_ts is None:
+                return float('-inf')
+            if oldest is None or start_ts < oldest:
+                oldest = start_ts
+        return oldest
+
     def transaction_query(self, transaction_id: int, table_action: TableAction, table_name: str) -> ConcurrencyResponse:
         self.transaction_assert_exists(transaction_id)
         self.transaction_assert_queryable(transaction_id)
-        if table_action == TableAction.READ:
-            self.transactions[transaction_id]['read_set'].add(table_name)
-            return ConcurrencyResponse(transaction_id, 'Read successful', LockStatus.GRANTED)
+        # validation checks the write at commit, so a read for update is a plain read
+        transaction = self.transactions[transaction_id]
+        if table_action in (TableAction.READ, TableAction.READ_FOR_UPDATE):
+            transaction['read_set'].add(table_name)
+            return self._granted(transaction_id, transaction, ReasonCode.READ_SUCCESSFUL)
         if table_action == TableAction.WRITE:
-            self.transactions[transaction_id]['write_set'].add(table_name,)
-            return ConcurrencyResponse(transaction_id, 'Write successful', LockStatus.GRANTED)
+            transaction['write_set'].add(table_name)
+            return self._granted(transaction_id, transaction, ReasonCode.WRITE_SUCCESSFUL)
         raise Exception(f'Unknown table action {table_action}')
+
+    def transaction_query_many(self, transaction_id: int, requests: list[tuple[TableAction, str]]) -> ConcurrencyResponse:
+        """Record every (table_action, table_name) request of a statement with one state check"""
+        reads = []
+        writes = []
+        for table_action, table_name in requests:
+            if table_action in (TableAction.READ, TableAction.READ_FOR_UPDATE):
+                reads.append(table_name)
+            elif table_action == TableAction.WRITE:
+                writes.append(table_name)
+            else:
+                raise Exception(f'Unknown table action {table_action}')
+        self.transaction_assert_exists(transaction_id)
+        self.transaction_assert_queryable(transaction_id)
+        transaction = self.transactions[transaction_id]
+        transaction['read_set'].update(reads)
+        transaction['write_set'].update(writes)
+        return ConcurrencyResponse(transaction_id, ReasonCode.REQUESTS_GRANTED, LockStatus.GRANTED, reason_args=(len(requests), 'successful'))
     
     def transaction_commit_flushed(self, transaction_id):
         super().transaction_commit_flushed(transaction_id)
         Ti = self.transactions[transaction_id]
-        Ti['finish_timestamp'] = time.time()
+        with self.validation_lock:
+            # taken under the lock, so the log stays sorted by finish timestamp
+            finish_ts = self.timestamp_oracle.advance()
+            Ti['finish_timestamp'] = finish_ts
+            self.validated_transactions.pop(transaction_id, None)
+            self.commit_log.append((finish_ts, transaction_id, Ti['start_timestamp'], Ti['write_set'].bits))
+            self._prune_commit_log()
+
+    def _prune_commit_log(self) -> None:
+        """Drop log entries that finished before every active transaction started"""
+        low_water_mark = self._oldest_active_start()
+        while self.commit_log and (low_water_mark is None or self.commit_log[0][0] <= low_water_mark):
+            self.commit_log.popleft()
+
+    def _committed_writers(self, start_timestamp: int):
+        """
+        Validated transactions that may overlap one which started at start_timestamp:
+        all those still waiting for their flush (their writes are not in place
+        yet), then the flushed ones that finished after it started, newest first.
+
+        Returns:
+            Iterator of (transaction_id, finish_timestamp, start_timestamp, write_bits),
+            with an infinite finish timestamp while not flushed
+        """
+        for other_id, (_, other_start, write_bits) in self.validated_transactions.items():
+            yield other_id, float('inf'), other_start, write_bits
+        for finish_ts, other_id, other_start, write_bits in reversed(self.commit_log):
+            if finish_ts <= start_timestamp:
+                break
+            yield other_id, finish_ts, other_start, write_bits
+
+    def _first_conflict(self, Ti: dict, writers) -> int | None:
+        """
+        First of writers, as yielded by _committed_writers, that Ti conflicts with
+
+        Returns:
+            Its transaction id, None when Ti passes
+        """
+        # read-write or write-write conflict: Tj wrote a table Ti read or wrote
+        accessed_bits = Ti['read_set'].bits | Ti['write_set'].bits
+
+        # only transactions that finished after Ti started, and started before
+        # it validated, can conflict with it
+        for other_id, finish_ts, other_start, write_bits in writers:
+            if finish_ts <= Ti['start_timestamp'] or other_start >= Ti['validation_timestamp']:
+                continue
+            if write_bits & accessed_bits:
+                return other_id
+        return None
+
+    def _validation_failed(self, transaction_id: int, other_id: int) -> ConcurrencyResponse:
+        self._transaction_set_status(transaction_id, TransactionStatus.ABORTED)
+        return ConcurrencyResponse(
+            transaction_id,
+            ReasonCode.VALIDATION_FAILED,
+            LockStatus.FAILED,
+            reason_args=(other_id,)
+        )
+
+    def _validation_passed(self, transaction_id: int, Ti: dict) -> ConcurrencyResponse:
+        # later validations check against it until it is flushed
+        self._transaction_set_status(transaction_id, TransactionStatus.PARTIALLY_COMMITTED)
+        self.validated_transactions[transaction_id] = (Ti['validation_timestamp'], Ti['start_timestamp'], Ti['write_set'].bits)
+        return ConcurrencyResponse(transaction_id, ReasonCode.VALIDATION_SUCCESSFUL, LockStatus.GRANTED)
+
+    def _validate(self, transaction_id: int, Ti: dict, writers) -> ConcurrencyResponse:
+        """
+        Validate Ti against writers, as yielded by _committed_writers; must hold
+        validation_lock.
+
+        Returns:
+            The commit response
+        """
+        Ti['validation_timestamp'] = self.timestamp_oracle.advance()
+        other_id = self._first_conflict(Ti, writers)
+        if other_id is not None:
+            return self._validation_failed(transaction_id, other_id)
+        return self._validation_passed(transaction_id, Ti)
+
+    def _validate_group(self, group: list[int]) -> None:
+        """
+        Validate the queued transactions in queue order; must hold validation_lock.
+        The committed writers are collected once for the whole group, and every
+        member that passes is added to them for the members after it.
+        Responses go to group_commit_responses.
+        """
+        self.commit_group_count += 1
+        if len(group) == 1:
+            transaction_id = group[0]
+            Ti = self.transactions[transaction_id]
+            self.group_commit_responses[transaction_id] = self._validate(transaction_id, Ti, self._committed_writers(Ti['start_timestamp']))
+            return
+        start_timestamp = min(self.transactions[tid]['start_timestamp'] for tid in group)
+        writers = list(self._committed_writers(start_timestamp))
+        if self.conflict_matrix_threshold is not None and len(group) >= self.conflict_matrix_threshold:
+            self.__validate_group_with_matrix(group, writers)
+            return
+        for transaction_id in group:
+            Ti = self.transactions[transaction_id]
+            response = self._validate(transaction_id, Ti, writers)
+            if response.can_proceed:
+                writers.append((transaction_id, float('inf'), Ti['start_timestamp'], Ti['write_set'].bits))
+            self.group_commit_responses[transaction_id] = response
+
+    def __validate_group_with_matrix(self, group: list[int], writers: list) -> None:
+        """
+        Same outcome as validating the group one member after the other: members
+        are checked against the committed writers, and the ones that pass are
+        checked against each other at once with a ConflictMatrix, picking in
+        queue order.
+        """
+        candidates = []
+        for transaction_id in group:
+            Ti = self.transactions[transaction_id]
+            Ti['validation_timestamp'] = self.timestamp_oracle.advance()
+            other_id = self._first_conflict(Ti, writers)
+            if other_id is not None:
+                self.group_commit_responses[transaction_id] = self._validation_failed(transaction_id, other_id)
+            else:
+                candidates.append(transaction_id)
+
+        matrix = ConflictMatrix(
+            [self.transactions[tid]['read_set'] for tid in candidates],
+            [self.transactions[tid]['write_set'] for tid in candidates],
+            self.resource_registry
+        )
+        picked, left_out = matrix.select()
+        for index in picked:
+            transaction_id = candidates[index]
+            self.group_commit_responses[transaction_id] = self._validation_passed(transaction_id, self.transactions[transaction_id])
+        for index, blocker in left_out.items():
+            transaction_id = candidates[index]
+            self.group_commit_responses[transaction_id] = self._validation_failed(transaction_id, candidates[blocker])
 
     def transaction_commit(self, transaction_id: int) -> ConcurrencyResponse:
         self.transaction_assert_exists(transaction_id)
         self.transaction_assert_queryable(transaction_id)
         Ti = self.transactions[transaction_id]
 
-        Ti['validation_timestamp'] = time.time()
+        if not self.group_commit:
+            with self.validation_lock:
+                return self._validate(transaction_id, Ti, self._committed_writers(Ti['start_timestamp']))
 
-        for other_id, Tj in self.transactions.items():
-            if other_id == transaction_id:
-                continue
-            
-            # Validate against committed or partially committed transactions
-            # (partially committed means they passed validation and are in the process of committing)
-            if Tj['status'] not in [TransactionStatus.PARTIALLY_COMMITTED, TransactionStatus.COMMITTED, TransactionStatus.TERMINATED]:
-                continue
-            
-            # Skip if finish_timestamp is None (not yet flushed)
-            # For PARTIALLY_COMMITTED, we check against their validation timestamp
-            finish_ts = Tj.get('finish_timestamp') or Tj.get('validation_timestamp')
-            if finish_ts is None:
-                continue
-                
-            if finish_ts <= Ti['start_timestamp']:
-                continue
-            if Tj['start_timestamp'] >= Ti['validation_timestamp']:
-                continue
-            
-            # read-write or write-write conflict detection
-            if (Tj['write_set'] & Ti['read_set']) or (Tj['write_set'] & Ti['write_set']):
-                Ti['status'] = TransactionStatus.ABORTED
-                return ConcurrencyResponse(
-                    transaction_id,
-                    f"Validation failed due to conflict with transaction {other_id}",
-                    LockStatus.FAILED
-                )
-        
-        # Passed all validation checks
-        Ti['status'] = TransactionStatus.PARTIALLY_COMMITTED
-        return ConcurrencyResponse(transaction_id, "Validation successful", LockStatus.GRANTED)
+        with self.commit_queue_lock:
+            self.commit_queue.append(transaction_id)
+        with self.validation_lock:
+            # a leader that held the lock before may have validated us already
+            response = self.group_commit_responses.pop(transaction_id, None)
+            if response is None:
+                with self.commit_queue_lock:
+                    group, self.commit_queue = self.commit_queue, []
+                self._validate_group(group)
+                response = self.group_commit_responses.pop(transaction_id)
+        return response
+
+    def transaction_commit_many(self, transaction_ids: list[int]) -> list[ConcurrencyResponse]:
+        """
+        Validate several transactions as one group, in the given order, whether
+        or not group_commit is on; a group of conflict_matrix_threshold or more
+        is checked with a ConflictMatrix.
+
+        Returns:
+            The commit responses, in the same order
+        """
+        if len(set(transaction_ids)) != len(transaction_ids):
+            raise Exception('Transactions committed together must be distinct')
+        for transaction_id in transaction_ids:
+            self.transaction_assert_exists(transaction_id)
+            self.transaction_assert_queryable(transaction_id)
+        if not transaction_ids:
+            return []
+        with self.validation_lock:
+            self._validate_group(list(transaction_ids))
+            return [self.group_commit_responses.pop(tid) for tid in transaction_ids]
@@ -0,0 +1,158 @@
+"""
+Tests for the asyncio front end of the lock-based CCM
+"""
+
+import sys
+import os
+import asyncio
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.async_lock_based_concurrency_control_manager import AsyncLockBasedConcurrencyControlManager
+from src.retention_policy import RetentionPolicy
+from src.row_action import TableAction
+from src.concurrency_response import LockStatus
+from src.transaction_status import TransactionStatus
+
+def test_acquire_awaits_until_holder_commits():
+    print("\n" + "="*70)
+    print("ASYNC ACQUIRE")
+    print("="*70)
+
+    async def main():
+        ccm = AsyncLockBasedConcurrencyControlManager()
+        t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+        assert (await ccm.acquire(t1, TableAction.WRITE, 'X')).can_proceed
+        waiter = asyncio.ensure_future(ccm.acquire(t2, TableAction.WRITE, 'X', timeout=5))
+        await asyncio.sleep(0.02)
+        assert not waiter.done(), "acquire should still be suspended"
+        ccm.transaction_commit(t1)
+        ccm.transaction_commit_flushed(t1)
+        response = await asyncio.wait_for(waiter, 5)
+        print(f"T{t2}: {response.reason}")
+        assert response.status == LockStatus.GRANTED
+
+    asyncio.run(main())
+
+def test_release_wakes_only_granted_coroutines():
+    async def main():
+        ccm = AsyncLockBasedConcurrencyControlManager()
+        t1, t2, t3, t4 = (ccm.transaction_begin() for _ in range(4))
+        await ccm.acquire(t1, TableAction.WRITE, 'X')
+        await ccm.acquire(t4, TableAction.WRITE, 'Y')
+        writer = asyncio.ensure_future(ccm.acquire(t2, TableAction.WRITE, 'X'))
+        queued = asyncio.ensure_future(ccm.acquire(t3, TableAction.READ, 'X'))
+        other = asyncio.ensure_future(ccm.acquire(t1, TableAction.READ, 'Y'))
+        await asyncio.sleep(0.01)
+        events = {tid: ccm.get_wait_event(tid) for tid in (t2, t3)}
+
+        ccm.transaction_commit(t4)
+        ccm.transaction_commit_flushed(t4)
+        assert (await asyncio.wait_for(other, 5)).can_proceed
+        assert not events[t2].is_set() and not events[t3].is_set()
+
+        ccm.transaction_commit(t1)
+        ccm.transaction_commit_flushed(t1)
+        assert (await asyncio.wait_for(writer, 5)).can_proceed
+        assert not queued.done()
+        ccm.transaction_commit(t2)
+        ccm.transaction_commit_flushed(t2)
+        assert (await asyncio.wait_for(queued, 5)).can_proceed
+
+    asyncio.run(main())
+
+def test_acquire_timeout_and_wait_timeout():
+    async def main():
+        ccm = AsyncLockBasedConcurrencyControlManager()
+        t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+        await ccm.acquire(t1, TableAction.WRITE, 'X')
+        r = await ccm.acquire(t2, TableAction.READ, 'X', timeout=0.02)
+        assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+
+        r = await ccm.acquire(t3, TableAction.READ, 'X', timeout=5, wait_timeout=0.02)
+        print(f"T{t3}: {r.reason}")
+        assert r.status == LockStatus.FAILED
+        assert ccm.transactions[t3]['status'] == TransactionStatus.FAILED
+
+    asyncio.run(main())
+
+def test_deadlock_victim_is_woken():
+    async def main():
+        ccm = AsyncLockBasedConcurrencyControlManager()
+        t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+        await ccm.acquire(t1, TableAction.WRITE, 'A')
+        await ccm.acquire(t2, TableAction.WRITE, 'B')
+        waiter = asyncio.ensure_future(ccm.acquire(t2, TableAction.WRITE, 'A', timeout=5))
+        await asyncio.sleep(0.01)
+        r1 = await ccm.acquire(t1, TableAction.WRITE, 'B', timeout=5)
+        print(f"T{t1}: {r1.reason}")
+        assert r1.status == LockStatus.FAILED
+        r2 = await asyncio.wait_for(waiter, 5)
+        assert r2.status == LockStatus.GRANTED
+
+    asyncio.run(main())
+
+def test_release_from_another_thread():
+    async def main():
+        ccm = AsyncLockBasedConcurrencyControlManager()
+        t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+        await ccm.acquire(t1, TableAction.WRITE, 'X')
+        waiter = asyncio.ensure_future(ccm.acquire(t2, TableAction.WRITE, 'X', timeout=5))
+        await asyncio.sleep(0.01)
+        def release():
+            ccm.transaction_commit(t1)
+            ccm.transaction_commit_flushed(t1)
+
+        thread = threading.Thread(target=release)
+        thread.start()
+        response = await asyncio.wait_for(waiter, 5)
+        thread.join()
+        assert response.status == LockStatus.GRANTED
+
+    asyncio.run(main())
+
+def test_many_transactions_on_one_loop():
+    async def main():
+        ccm = AsyncLockBasedConcurrencyControlManager(retention_policy=RetentionPolicy(max_terminated=0))
+        threads = threading.active_count()
+        granted = []
+
+        async def transaction(i):
+            tid = ccm.transaction_begin()
+            response = await ccm.acquire(tid, TableAction.WRITE, f'table_{i % 50}', timeout=30)
+            assert response.can_proceed, response.reason
+            granted.append(tid)
+            await asyncio.sleep(0)
+            assert threading.active_count() == threads
+            ccm.transaction_commit(tid)
+            ccm.transaction_commit_flushed(tid)
+            ccm.transaction_end(tid)
+
+        await asyncio.gather(*(transaction(i) for i in range(2000)))
+        print(f"{len(granted)} transactions on one loop")
+        assert len(granted) == 2000
+        assert ccm.resource_waiters == {}
+
+    asyncio.run(main())
+
+def test_waiting_needs_event_loop():
+    ccm = AsyncLockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    try:
+        ccm.transaction_query(t2, TableAction.WRITE, 'X')
+    except Exception as e:
+        assert 'event loop' in str(e)
+    else:
+        assert False, "expected an exception"
+    assert ccm.resource_waiters == {}
+
+if __name__ == "__main__":
+    test_acquire_awaits_until_holder_commits()
+    test_release_wakes_only_granted_coroutines()
+    test_acquire_timeout_and_wait_timeout()
+    test_deadlock_victim_is_woken()
+    test_release_from_another_thread()
+    test_many_transactions_on_one_loop()
+    test_waiting_needs_event_loop()
+    print("✓ All async acquire tests PASSED")
@@ -0,0 +1,114 @@
+"""
+Tests for transaction_query_many on the three concurrency control managers
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.timestamp_based_concurrency_control_manager import TimestampBasedConcurrencyControlManager
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.lock_mode import LockMode
+from src.row_action import TableAction
+from src.concurrency_response import LockStatus
+
+def test_lock_batch_grants_and_merges_duplicates():
+    print("\n" + "="*70)
+    print("LOCK-BASED BATCH")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    r = ccm.transaction_query_many(t1, [
+        (TableAction.READ, 'orders'),
+        (TableAction.READ, 'customers'),
+        (TableAction.WRITE, 'orders'),
+    ])
+    print(f"T{t1}: {r.reason}")
+    assert r.status == LockStatus.GRANTED
+    assert r.reason == '2 table locks granted'
+    assert ccm.transactions[t1]['locks']['orders'] == LockMode.X
+    assert ccm.transactions[t1]['locks']['customers'] == LockMode.S
+
+def test_lock_batch_waits_and_resumes():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'b').can_proceed
+    r = ccm.transaction_query_many(t2, [(TableAction.READ, 'a'), (TableAction.READ, 'b')])
+    print(f"T{t2}: {r.reason}")
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+    # tables before the blocking one stay locked
+    assert ccm.transactions[t2]['locks']['a'] == LockMode.S
+
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    r = ccm.transaction_query_many(t2, [(TableAction.READ, 'a'), (TableAction.READ, 'b')])
+    assert r.status == LockStatus.GRANTED
+
+def test_lock_batches_in_opposite_order_do_not_deadlock():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    r1 = ccm.transaction_query_many(t1, [(TableAction.WRITE, 'a'), (TableAction.WRITE, 'b')])
+    r2 = ccm.transaction_query_many(t2, [(TableAction.WRITE, 'b'), (TableAction.WRITE, 'a')])
+    print(f"T{t1}: {r1.reason}")
+    print(f"T{t2}: {r2.reason}")
+    assert r1.status == LockStatus.GRANTED
+    # T2 queues on 'a' before touching 'b', so it holds nothing T1 could need
+    assert r2.status == LockStatus.WAITING and r2.blocked_by == [t1]
+    assert 'b' not in ccm.transactions[t2]['locks']
+
+def test_lock_batch_failures():
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    try:
+        ccm.transaction_query_many(t1, [(TableAction.READ, 'a'), ('DELETE', 'b')])
+    except Exception as e:
+        assert 'Unknown table action' in str(e)
+    else:
+        assert False, "expected an exception"
+    assert 'a' not in ccm.transactions[t1]['locks']
+
+    r = ccm.transaction_query_many(999, [(TableAction.READ, 'a')])
+    assert r.status == LockStatus.FAILED
+
+    ccm.transaction_commit(t1)
+    r = ccm.transaction_query_many(t1, [(TableAction.READ, 'a')])
+    assert r.status == LockStatus.FAILED
+
+def test_timestamp_batch():
+    print("\n" + "="*70)
+    print("TIMESTAMP-BASED BATCH")
+    print("="*70)
+    ccm = TimestampBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    r = ccm.transaction_query_many(t2, [(TableAction.READ, 'a'), (TableAction.WRITE, 'b')])
+    print(f"T{t2}: {r.reason}")
+    assert r.status == LockStatus.GRANTED
+    assert r.reason == '2 requests allowed'
+
+    # T1 is older than T2's read of 'a', so its write is rejected
+    r = ccm.transaction_query_many(t1, [(TableAction.READ, 'c'), (TableAction.WRITE, 'a')])
+    print(f"T{t1}: {r.reason}")
+    assert r.status == LockStatus.FAILED
+
+def test_validation_batch():
+    print("\n" + "="*70)
+    print("VALIDATION-BASED BATCH")
+    print("="*70)
+    ccm = ValidationBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    r = ccm.transaction_query_many(t1, [(TableAction.READ, 'a'), (TableAction.WRITE, 'b'), (TableAction.READ, 'c')])
+    print(f"T{t1}: {r.reason}")
+    assert r.status == LockStatus.GRANTED
+    assert r.reason == '3 requests successful'
+    assert ccm.transactions[t1]['read_set'] == {'a', 'c'}
+    assert ccm.transactions[t1]['write_set'] == {'b'}
+
+if __name__ == "__main__":
+    test_lock_batch_grants_and_merges_duplicates()
+    test_lock_batch_waits_and_resumes()
+    test_lock_batches_in_opposite_order_do_not_deadlock()
+    test_lock_batch_failures()
+    test_timestamp_batch()
+    test_validation_batch()
+    print("✓ All batch query tests PASSED")
@@ -0,0 +1,149 @@
+"""
+Tests for the blocking acquire API and targeted wake-ups of the lock-based CCM
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.lock_queue_policy import LockQueuePolicy
+from src.row_action import TableAction
+from src.concurrency_response import LockStatus
+
+def test_acquire_blocks_until_holder_commits():
+    print("\n" + "="*70)
+    print("BLOCKING ACQUIRE")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.acquire(t1, TableAction.WRITE, 'X').can_proceed
+    result = {}
+
+    def waiter():
+        result['response'] = ccm.acquire(t2, TableAction.WRITE, 'X', timeout=5)
+        result['at'] = time.monotonic()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    assert 'response' not in result, "acquire should still be blocked"
+    released_at = time.monotonic()
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    thread.join(5)
+    print(f"T{t2}: {result['response'].reason}")
+    assert result['response'].status == LockStatus.GRANTED
+    assert result['at'] >= released_at
+
+def test_acquire_timeout_returns_waiting():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    ccm.acquire(t1, TableAction.WRITE, 'X')
+    r = ccm.acquire(t2, TableAction.READ, 'X', timeout=0.02)
+    assert r.status == LockStatus.WAITING
+    assert r.blocked_by == [t1]
+
+def test_release_wakes_only_first_writer():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3, t4 = (ccm.transaction_begin() for _ in range(4))
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'X').should_retry
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'X').should_retry
+    assert ccm.transaction_query(t4, TableAction.READ, 'X').should_retry
+    events = {tid: ccm.get_wait_event(tid) for tid in (t2, t3, t4)}
+
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert events[t2].is_set()
+    assert not events[t3].is_set() and not events[t4].is_set()
+
+def test_release_wakes_all_compatible_readers():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3, t4 = (ccm.transaction_begin() for _ in range(4))
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    for tid in (t2, t3):
+        assert ccm.transaction_query(tid, TableAction.READ, 'X').should_retry
+    assert ccm.transaction_query(t4, TableAction.WRITE, 'X').should_retry
+    events = {tid: ccm.get_wait_event(tid) for tid in (t2, t3, t4)}
+
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert events[t2].is_set() and events[t3].is_set()
+    assert not events[t4].is_set()
+
+def test_wait_event_is_reused_per_transaction():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    ccm.transaction_query(t1, TableAction.WRITE, 'A')
+    ccm.transaction_query(t2, TableAction.WRITE, 'B')
+    ccm.transaction_query(t3, TableAction.WRITE, 'A')
+    first = ccm.get_wait_event(t3)
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'A').can_proceed
+    ccm.transaction_query(t3, TableAction.WRITE, 'B')
+    assert ccm.get_wait_event(t3) is first
+    assert not first.is_set()
+
+def test_barging_reader_is_recorded_in_wait_for_graph():
+    # T3 overtakes queued writer T2; T2 must now wait for T3 as well
+    ccm = LockBasedConcurrencyControlManager(lock_queue_policy=LockQueuePolicy.READER_PREFERRED)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    ccm.transaction_query(t1, TableAction.READ, 'X')
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'X').should_retry
+    assert ccm.transaction_query(t3, TableAction.READ, 'X').can_proceed
+    assert ccm.wait_for_graph[t2] == {t1, t3}
+
+    # T3 now asking for something T2 holds closes a cycle
+    ccm.transaction_query(t2, TableAction.READ, 'Y')
+    r = ccm.transaction_query(t3, TableAction.WRITE, 'Y')
+    assert r.should_rollback
+
+def test_waiters_left_queued_after_handoff_join_the_graph():
+    # a, b and c queue on A behind H; c also holds B
+    ccm = LockBasedConcurrencyControlManager()
+    t_holder, ta, tb, tc = (ccm.transaction_begin() for _ in range(4))
+    assert ccm.transaction_query(t_holder, TableAction.WRITE, 'A').can_proceed
+    assert ccm.transaction_query(tc, TableAction.READ, 'B').can_proceed
+    responses = {}
+
+    def waiter(tid, table_action):
+        responses[tid] = ccm.acquire(tid, table_action, 'A', timeout=5)
+
+    threads = {}
+    for tid, table_action in ((ta, TableAction.READ), (tb, TableAction.WRITE), (tc, TableAction.READ)):
+        threads[tid] = threading.Thread(target=waiter, args=(tid, table_action))
+        threads[tid].start()
+        while tid not in ccm.resource_waiters.get('A', {}):
+            time.sleep(0.001)
+
+    # a gets A; b now waits for a, and c for b's request ahead of it
+    ccm.transaction_commit(t_holder)
+    ccm.transaction_commit_flushed(t_holder)
+    threads[ta].join(5)
+    assert responses[ta].can_proceed
+    assert ccm.wait_for_graph == {tb: {ta}, tc: {tb}}
+
+    # a waiting for c closes a -> c -> b -> a instead of blocking all three
+    r = ccm.acquire(ta, TableAction.WRITE, 'B', timeout=2)
+    print(f"T{ta}: {r.reason}")
+    assert r.should_rollback
+    threads[tb].join(5)
+    assert responses[tb].can_proceed
+    ccm.transaction_commit(tb)
+    ccm.transaction_commit_flushed(tb)
+    threads[tc].join(5)
+    assert responses[tc].can_proceed
+
+if __name__ == "__main__":
+    test_acquire_blocks_until_holder_commits()
+    test_acquire_timeout_returns_waiting()
+    test_release_wakes_only_first_writer()
+    test_release_wakes_all_compatible_readers()
+    test_wait_event_is_reused_per_transaction()
+    test_barging_reader_is_recorded_in_wait_for_graph()
+    test_waiters_left_queued_after_handoff_join_the_graph()
+    print("✓ All blocking acquire tests PASSED")
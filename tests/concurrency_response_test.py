@@ -0,0 +1,129 @@
+"""
+Tests for ConcurrencyResponse reason codes, lazy messages and shared grants
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.timestamp_based_concurrency_control_manager import TimestampBasedConcurrencyControlManager
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.deadlock_prevention import DeadlockPrevention
+from src.concurrency_response import ConcurrencyResponse, LockStatus
+from src.reason_code import ReasonCode
+from src.lock_mode import LockMode
+from src.lock_table import DATABASE
+from src.row_action import RowAction, TableAction
+
+def test_reason_is_formatted_on_access():
+    print("\n" + "="*70)
+    print("RESPONSE REASON CODES")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    assert r.reason_code == ReasonCode.LOCK_GRANTED
+    assert r.reason_args == (LockMode.X, 'X')
+    assert r._reason is None
+    print(f"T{t1}: {r.reason}")
+    assert r.reason == 'Write lock granted on table X (exclusive)'
+    assert not hasattr(r, '__dict__')
+
+def test_plain_message_reason():
+    r = ConcurrencyResponse(1, 'custom message', LockStatus.FAILED, blocked_by=[2])
+    assert r.reason_code == ReasonCode.MESSAGE
+    assert r.reason == 'custom message'
+    assert r.blocked_by == [2] and r.active_transactions == []
+
+def test_repeated_grants_share_one_response():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    r1 = ccm.transaction_query(t1, TableAction.READ, 'X')
+    r2 = ccm.transaction_query(t1, TableAction.READ, 'X')
+    assert r1 is r2
+    # other transactions and other reasons get their own
+    assert ccm.transaction_query(t2, TableAction.READ, 'X') is not r1
+    assert ccm.transaction_query(t1, TableAction.READ, 'Y') is not r1
+    # the shared response reads the active set when asked
+    assert r1.active_transactions == [t1, t2]
+    ccm.transaction_commit(t2)
+    assert r1.active_transactions == [t1]
+    # returned copies cannot change the shared response
+    r1.blocked_by.append(99)
+    assert r2.blocked_by == []
+
+    # row grants are not kept, their number is unbounded; the table intention lock's is
+    ccm = LockBasedConcurrencyControlManager(row_lock_escalation_threshold=100)
+    t1 = ccm.transaction_begin()
+    for row_key in range(1000):
+        assert ccm.transaction_query_row(t1, RowAction.WRITE, 'accounts', row_key).can_proceed
+    assert ccm.transaction_query_row(t1, RowAction.WRITE, 'accounts', 0).can_proceed
+    assert list(ccm.transactions[t1]['locks']) == ['accounts']
+    assert len(ccm.transactions[t1]['granted_responses']) <= 2
+
+    for ccm, success in (
+        (TimestampBasedConcurrencyControlManager(), ReasonCode.READ_ALLOWED),
+        (ValidationBasedConcurrencyControlManager(), ReasonCode.READ_SUCCESSFUL),
+    ):
+        t1 = ccm.transaction_begin()
+        r1 = ccm.transaction_query(t1, TableAction.READ, 'X')
+        assert r1.reason_code == success
+        assert ccm.transaction_query(t1, TableAction.READ, 'X') is r1
+
+def test_wait_and_failure_codes():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    r = ccm.transaction_query(t2, TableAction.READ, 'X')
+    assert r.reason_code == ReasonCode.WAITING_FOR_EXCLUSIVE
+    assert r.reason == f'Read waiting for exclusive lock holder {t1}'
+
+    ccm.transaction_query(t2, TableAction.WRITE, 'Y')
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'Y')
+    print(f"T{t1}: {r.reason}")
+    assert r.reason_code == ReasonCode.DEADLOCK_VICTIM and r.reason_args == (t1,)
+    # later requests report why it was aborted
+    r = ccm.transaction_query(t1, TableAction.READ, 'Z')
+    assert r.reason_code == ReasonCode.DEADLOCK_VICTIM
+    assert ccm.transactions[t1]['abort_reason'] == r.reason
+
+    r = ccm.transaction_query(99, TableAction.READ, 'Z')
+    assert r.reason_code == ReasonCode.TRANSACTION_NOT_FOUND
+    assert r.reason == 'transaction 99 does not exist'
+
+def test_row_and_prevention_messages():
+    ccm = LockBasedConcurrencyControlManager(deadlock_prevention=DeadlockPrevention.WAIT_DIE)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    r = ccm.transaction_query_lock(t1, LockMode.X)
+    assert r.reason_args == (LockMode.X, DATABASE)
+    assert r.reason == 'Write lock granted on database (exclusive)'
+    r = ccm.transaction_query_row(t2, RowAction.READ, 'accounts', 7)
+    assert r.reason_code == ReasonCode.DEADLOCK_PREVENTED
+    assert r.reason == f'Deadlock prevented (wait_die). Transaction {t2} aborted.'
+
+def test_optimistic_failure_codes():
+    ccm = TimestampBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    ccm.transaction_query(t2, TableAction.READ, 'X')
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    assert r.reason_code == ReasonCode.WRITE_DENIED
+    assert r.reason == f'Write denied: table X read by newer transaction (RTS={t2} > TS={t1})'
+
+    ccm = ValidationBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.READ, 'X')
+    ccm.transaction_query(t2, TableAction.WRITE, 'X')
+    assert ccm.transaction_commit(t2).reason_code == ReasonCode.VALIDATION_SUCCESSFUL
+    ccm.transaction_commit_flushed(t2)
+    r = ccm.transaction_commit(t1)
+    assert r.reason_code == ReasonCode.VALIDATION_FAILED and r.reason_args == (t2,)
+
+if __name__ == "__main__":
+    test_reason_is_formatted_on_access()
+    test_plain_message_reason()
+    test_repeated_grants_share_one_response()
+    test_wait_and_failure_codes()
+    test_row_and_prevention_messages()
+    test_optimistic_failure_codes()
+    print("✓ All concurrency response tests PASSED")
@@ -0,0 +1,130 @@
+"""
+Tests for the NumPy ConflictMatrix and matrix batch validation
+"""
+
+import sys
+import os
+import random
+import unittest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.conflict_matrix import ConflictMatrix
+from src.resource_registry import ResourceRegistry, ResourceSet
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.row_action import TableAction
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def require_numpy():
+    if numpy is None:
+        raise unittest.SkipTest('NumPy not installed')
+
+def test_pairwise_conflicts():
+    require_numpy()
+    print("\n" + "="*70)
+    print("CONFLICT MATRIX")
+    print("="*70)
+    # T0 writes A, T1 reads A, T2 writes B, T3 reads C
+    matrix = ConflictMatrix(
+        [set(), {'A'}, set(), {'C'}],
+        [{'A'}, set(), {'B'}, set()],
+    )
+    print(matrix.conflicts.astype(int))
+    assert matrix.conflicts.tolist() == [
+        [False, True, False, False],
+        [False, False, False, False],
+        [False, False, False, False],
+        [False, False, False, False],
+    ]
+    assert len(matrix) == 4
+    assert matrix.conflict_density() == 2 / 12
+
+    # names are interned into the caller's registry, even a fresh (empty) one
+    registry = ResourceRegistry()
+    matrix = ConflictMatrix([{'A'}], [{'B'}], registry)
+    assert matrix.registry is registry and len(registry) == 2
+
+def test_select_is_maximal_and_ordered():
+    require_numpy()
+    # T0 reads A, T1 writes A, T2 writes A
+    matrix = ConflictMatrix([{'A'}, set(), set()], [set(), {'A'}, {'A'}])
+    # read before the writes, only the two writers clash
+    assert matrix.select() == ([0, 1], {2: 1})
+    # symmetric: nobody may touch what another one writes
+    assert matrix.select(symmetric=True) == ([0], {1: 0, 2: 0})
+    assert matrix.non_conflicting_subset(order=[2, 0, 1]) == [2]
+
+def test_matches_nested_loop():
+    require_numpy()
+    rng = random.Random(7)
+    registry = ResourceRegistry()
+    read_sets = [ResourceSet(registry, rng.sample(range(40), 3)) for _ in range(300)]
+    write_sets = [ResourceSet(registry, rng.sample(range(40), 1)) for _ in range(300)]
+    matrix = ConflictMatrix(read_sets, write_sets, registry)
+    for i in range(300):
+        for j in range(300):
+            expected = i != j and write_sets[i].intersects(read_sets[j] | write_sets[j])
+            assert matrix.conflicts[i, j] == expected
+
+    # a larger batch than one product block
+    rng_sets = [{f't{rng.randrange(5000)}'} for _ in range(ConflictMatrix.BLOCK_ROWS + 5)]
+    matrix = ConflictMatrix(rng_sets, rng_sets)
+    last = len(rng_sets) - 1
+    assert matrix.conflicts[last].sum() == sum(1 for i in range(last) if rng_sets[i] == rng_sets[last])
+
+def test_batch_validation_same_as_one_by_one():
+    require_numpy()
+    outcomes = []
+    for threshold in (None, 2):
+        rng = random.Random(11)
+        ccm = ValidationBasedConcurrencyControlManager(conflict_matrix_threshold=threshold)
+        committed = ccm.transaction_begin()
+        ccm.transaction_query(committed, TableAction.WRITE, 'table_0')
+        tids = [ccm.transaction_begin() for _ in range(60)]
+        ccm.transaction_commit(committed)
+        ccm.transaction_commit_flushed(committed)
+        for tid in tids:
+            for _ in range(2):
+                ccm.transaction_query(tid, TableAction.READ, f'table_{rng.randrange(20)}')
+            ccm.transaction_query(tid, TableAction.WRITE, f'table_{rng.randrange(20)}')
+        responses = ccm.transaction_commit_many(tids)
+        outcomes.append([(r.status, r.reason_args) for r in responses])
+        assert ccm.group_commit_responses == {}
+    print(f"{sum(status.value == 'granted' for status, _ in outcomes[1])} of 60 pass validation")
+    assert outcomes[0] == outcomes[1]
+
+def test_missing_numpy_is_reported():
+    saved = sys.modules.get('numpy')
+    sys.modules['numpy'] = None
+    try:
+        ConflictMatrix([set()], [set()])
+        assert False, "built without NumPy"
+    except Exception as e:
+        assert 'needs NumPy' in str(e)
+    finally:
+        if saved is None:
+            sys.modules.pop('numpy', None)
+        else:
+            sys.modules['numpy'] = saved
+    try:
+        ValidationBasedConcurrencyControlManager(conflict_matrix_threshold=1)
+        assert False, "threshold 1 accepted"
+    except Exception as e:
+        assert 'at least 2' in str(e)
+
+if __name__ == "__main__":
+    for test in (
+        test_pairwise_conflicts,
+        test_select_is_maximal_and_ordered,
+        test_matches_nested_loop,
+        test_batch_validation_same_as_one_by_one,
+        test_missing_numpy_is_reported,
+    ):
+        try:
+            test()
+        except unittest.SkipTest as e:
+            print(f"{test.__name__} skipped: {e}")
+    print("✓ All conflict matrix tests PASSED")
@@ -0,0 +1,202 @@
+"""
+Tests for the selectable deadlock handling modes of the lock-based CCM
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.deadlock_detection import DeadlockDetection
+from src.deadlock_victim_policy import DeadlockVictimPolicy
+from src.row_action import TableAction
+from src.concurrency_response import LockStatus
+
+def print_test_header(name):
+    print(f"\n{'='*70}")
+    print(name)
+    print(f"{'='*70}")
+
+def test_incremental_detects_three_way_cycle():
+    print_test_header("Incremental detection - 3-way circular wait")
+    ccm = LockBasedConcurrencyControlManager(deadlock_detection=DeadlockDetection.INCREMENTAL)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    ccm.transaction_query(t1, TableAction.WRITE, 'A')
+    ccm.transaction_query(t2, TableAction.WRITE, 'B')
+    ccm.transaction_query(t3, TableAction.WRITE, 'C')
+
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'B').status == LockStatus.WAITING
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'C').status == LockStatus.WAITING
+    r = ccm.transaction_query(t3, TableAction.WRITE, 'A')
+    print(f"T{t3}: Write(A) → {r.reason}")
+    assert r.status == LockStatus.FAILED
+    assert 'deadlock' in r.reason.lower()
+    for waiter, holders in ccm.wait_for_graph.items():
+        for holder in holders:
+            assert ccm.wait_for_order[waiter] < ccm.wait_for_order[holder]
+
+def test_incremental_handles_out_of_order_edges():
+    # edges arrive against the initial order, forcing a reorder before the cycle closes
+    ccm = LockBasedConcurrencyControlManager(deadlock_detection=DeadlockDetection.INCREMENTAL)
+    t1, t2, t3, t4 = (ccm.transaction_begin() for _ in range(4))
+    for tid, table in ((t1, 'A'), (t2, 'B'), (t3, 'C'), (t4, 'D')):
+        ccm.transaction_query(tid, TableAction.WRITE, table)
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'D').should_retry
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'B').should_retry
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'C').should_retry
+    assert ccm.transaction_query(t4, TableAction.WRITE, 'A').should_rollback
+
+def test_incremental_long_chain_does_not_recurse():
+    ccm = LockBasedConcurrencyControlManager(deadlock_detection=DeadlockDetection.INCREMENTAL)
+    chain = [ccm.transaction_begin() for _ in range(5000)]
+    for i, tid in enumerate(chain):
+        ccm.transaction_query(tid, TableAction.WRITE, i)
+    for i in reversed(range(len(chain) - 1)):
+        assert ccm.transaction_query(chain[i], TableAction.WRITE, i + 1).should_retry
+    # closing edge forces a forward search along the entire chain
+    r = ccm.transaction_query(chain[-1], TableAction.WRITE, 0)
+    assert r.should_rollback
+
+def test_incremental_search_skips_nodes_without_position():
+    ccm = LockBasedConcurrencyControlManager(deadlock_detection=DeadlockDetection.INCREMENTAL)
+    assert not ccm._detect_deadlock_incremental(1, {2})
+    assert not ccm._detect_deadlock_incremental(3, {4})
+    # an edge 3 -> 5 whose endpoint has no position yet
+    ccm._add_to_wait_for_graph(3, {5})
+    assert 5 not in ccm.wait_for_order
+    # 1 -> 3 goes against the order, the forward search from 3 meets 5
+    assert not ccm._detect_deadlock_incremental(1, {3})
+    assert ccm.wait_for_order[1] < ccm.wait_for_order[3]
+
+def test_incremental_concurrent_waits():
+    ccm = LockBasedConcurrencyControlManager(deadlock_detection=DeadlockDetection.INCREMENTAL)
+    errors = []
+
+    def worker(seed):
+        try:
+            for i in range(150):
+                tid = ccm.transaction_begin()
+                for table in (f'table_{(seed + i) % 6}', f'table_{(seed * i + 1) % 6}'):
+                    r = ccm.acquire(tid, TableAction.WRITE, table, timeout=5)
+                    if not r.can_proceed:
+                        break
+                else:
+                    ccm.transaction_commit(tid)
+                    ccm.transaction_commit_flushed(tid)
+                    continue
+                if ccm.transaction_exists(tid) and r.should_retry:
+                    ccm.transaction_rollback(tid)
+        except Exception as e:
+            errors.append(e)
+
+    # switch threads often, so searches overlap other transactions' edge updates
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert errors == []
+    assert ccm.wait_for_graph == {} and ccm.resource_waiters == {}
+
+def test_periodic_detector_breaks_overlapping_cycles_with_one_victim():
+    print_test_header("Periodic detection - two cycles sharing one transaction")
+    ccm = LockBasedConcurrencyControlManager(
+        deadlock_detection=DeadlockDetection.PERIODIC,
+        deadlock_detection_interval=60,
+    )
+    try:
+        t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+        for tid, table in ((t1, 'A'), (t2, 'B'), (t3, 'C')):
+            ccm.transaction_query(tid, TableAction.WRITE, table)
+        # cycles T1 <-> T2 and T2 <-> T3; nothing is detected on the request path
+        assert ccm.transaction_query(t1, TableAction.WRITE, 'B').should_retry
+        assert ccm.transaction_query(t2, TableAction.WRITE, 'A').should_retry
+        assert ccm.transaction_query(t2, TableAction.WRITE, 'C').should_retry
+        assert ccm.transaction_query(t3, TableAction.WRITE, 'B').should_retry
+
+        victims = ccm.deadlock_detector.run_once()
+        print(f"Victims: {victims}")
+        assert victims == [t2]
+        r = ccm.transaction_query(t2, TableAction.WRITE, 'A')
+        assert r.should_rollback and 'deadlock' in r.reason.lower()
+        # B is handed to t1, the first writer queued on it
+        assert ccm.transaction_query(t1, TableAction.WRITE, 'B').can_proceed
+        assert ccm.transaction_query(t3, TableAction.WRITE, 'B').should_retry
+        assert ccm.deadlock_detector.run_once() == []
+    finally:
+        ccm.close()
+
+def test_periodic_detector_follows_victim_policy():
+    for policy, expected in ((DeadlockVictimPolicy.YOUNGEST, 'first'), (DeadlockVictimPolicy.PRIORITY, 'restarted')):
+        priorities = {}
+        ccm = LockBasedConcurrencyControlManager(
+            deadlock_detection=DeadlockDetection.PERIODIC,
+            deadlock_detection_interval=60,
+            deadlock_victim_policy=policy,
+            deadlock_victim_priority=priorities.get,
+        )
+        try:
+            t_aborted = ccm.transaction_begin()
+            ccm.transaction_rollback(t_aborted)
+            t1 = ccm.transaction_begin()
+            # restarted with its first timestamp: the larger id, but the older one
+            t_restarted = ccm.transaction_begin(timestamp=ccm.transactions[t_aborted]['timestamp'])
+            priorities.update({t1: 1, t_restarted: 0})
+            ccm.transaction_query(t1, TableAction.WRITE, 'A')
+            ccm.transaction_query(t_restarted, TableAction.WRITE, 'B')
+            assert ccm.transaction_query(t1, TableAction.WRITE, 'B').should_retry
+            assert ccm.transaction_query(t_restarted, TableAction.WRITE, 'A').should_retry
+            victims = ccm.deadlock_detector.run_once()
+            print(f"{policy.value}: victims {victims}")
+            assert victims == [t1 if expected == 'first' else t_restarted]
+        finally:
+            ccm.close()
+
+def test_periodic_detector_wakes_blocked_victim():
+    ccm = LockBasedConcurrencyControlManager(
+        deadlock_detection=DeadlockDetection.PERIODIC,
+        deadlock_detection_interval=0.01,
+    )
+    try:
+        t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+        ccm.transaction_query(t1, TableAction.WRITE, 'A')
+        ccm.transaction_query(t2, TableAction.WRITE, 'B')
+        outcomes = {}
+
+        def worker(tid, table):
+            while True:
+                r = ccm.transaction_query(tid, TableAction.WRITE, table)
+                if not r.should_retry:
+                    outcomes[tid] = r.status
+                    if r.can_proceed:
+                        ccm.transaction_commit(tid)
+                        ccm.transaction_commit_flushed(tid)
+                    return
+                ccm.get_wait_event(tid).wait(5)
+
+        threads = [threading.Thread(target=worker, args=(t1, 'B')), threading.Thread(target=worker, args=(t2, 'A'))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        assert sorted(outcomes.values(), key=lambda s: s.value) == [LockStatus.FAILED, LockStatus.GRANTED]
+        assert ccm.deadlock_detector.deadlocks_resolved == 1
+    finally:
+        ccm.close()
+
+if __name__ == "__main__":
+    test_incremental_detects_three_way_cycle()
+    test_incremental_handles_out_of_order_edges()
+    test_incremental_long_chain_does_not_recurse()
+    test_incremental_search_skips_nodes_without_position()
+    test_incremental_concurrent_waits()
+    test_periodic_detector_breaks_overlapping_cycles_with_one_victim()
+    test_periodic_detector_follows_victim_policy()
+    test_periodic_detector_wakes_blocked_victim()
+    print("✓ All deadlock handling tests PASSED")
@@ -0,0 +1,144 @@
+"""
+Tests for the timestamp-based deadlock prevention policies of the lock-based CCM
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.deadlock_prevention import DeadlockPrevention
+from src.row_action import TableAction
+from src.concurrency_response import LockStatus
+from src.transaction_status import TransactionStatus
+
+def test_wait_die():
+    print("\n" + "="*70)
+    print("WAIT-DIE")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager(deadlock_prevention=DeadlockPrevention.WAIT_DIE)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'B').can_proceed
+
+    # older T1 may wait for younger T2
+    r1 = ccm.transaction_query(t1, TableAction.WRITE, 'B')
+    print(f"T{t1}: {r1.reason}")
+    assert r1.status == LockStatus.WAITING and r1.blocked_by == [t2]
+
+    # younger T2 dies instead of waiting for older T1
+    r2 = ccm.transaction_query(t2, TableAction.WRITE, 'A')
+    print(f"T{t2}: {r2.reason}")
+    assert r2.status == LockStatus.FAILED
+    assert r2.reason == f'Deadlock prevented (wait_die). Transaction {t2} aborted.'
+    assert ccm.transactions[t2]['status'] == TransactionStatus.FAILED
+    assert ccm.wait_for_graph == {}
+
+    # its locks were handed to the waiter
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'B').can_proceed
+
+def test_wait_die_restart_keeps_age():
+    ccm = LockBasedConcurrencyControlManager(deadlock_prevention=DeadlockPrevention.WAIT_DIE)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').can_proceed
+    # restarted with the timestamp of an attempt older than T2
+    t3 = ccm.transaction_begin(timestamp=ccm.transactions[t1]['timestamp'])
+    r = ccm.transaction_query(t3, TableAction.WRITE, 'A')
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t2]
+
+def test_wound_wait():
+    print("\n" + "="*70)
+    print("WOUND-WAIT")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager(deadlock_prevention=DeadlockPrevention.WOUND_WAIT)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'B').can_proceed
+
+    # younger T2 waits for older T1
+    r2 = ccm.transaction_query(t2, TableAction.WRITE, 'A')
+    print(f"T{t2}: {r2.reason}")
+    assert r2.status == LockStatus.WAITING and r2.blocked_by == [t1]
+
+    # older T1 wounds younger T2 and gets B once T2 is rolled back
+    r1 = ccm.transaction_query(t1, TableAction.WRITE, 'B')
+    print(f"T{t1}: {r1.reason}")
+    assert r1.status == LockStatus.WAITING
+    assert ccm.transactions[t2]['status'] == TransactionStatus.FAILED
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'B').can_proceed
+
+    r2 = ccm.transaction_query(t2, TableAction.WRITE, 'A')
+    print(f"T{t2}: {r2.reason}")
+    assert r2.reason == f'Deadlock prevented (wound_wait). Transaction {t2} aborted.'
+
+def test_wound_wait_wounds_queued_request():
+    ccm = LockBasedConcurrencyControlManager(deadlock_prevention=DeadlockPrevention.WOUND_WAIT)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    assert ccm.transaction_query(t1, TableAction.READ, 'A').can_proceed
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'A').should_retry
+    # T2 may not overtake T3's queued write, so it wounds it
+    r = ccm.transaction_query(t2, TableAction.READ, 'A')
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t3]
+    assert ccm.transactions[t3]['status'] == TransactionStatus.FAILED
+    assert ccm.transaction_query(t2, TableAction.READ, 'A').can_proceed
+
+def test_wound_wait_wakes_blocked_acquire():
+    ccm = LockBasedConcurrencyControlManager(deadlock_prevention=DeadlockPrevention.WOUND_WAIT)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.acquire(t1, TableAction.WRITE, 'A').can_proceed
+    assert ccm.acquire(t2, TableAction.WRITE, 'B').can_proceed
+    result = {}
+
+    def younger():
+        result['response'] = ccm.acquire(t2, TableAction.WRITE, 'A', timeout=5)
+
+    thread = threading.Thread(target=younger)
+    thread.start()
+    time.sleep(0.05)
+    r1 = ccm.acquire(t1, TableAction.WRITE, 'B', timeout=5)
+    thread.join(5)
+    print(f"T{t1}: {r1.reason}")
+    print(f"T{t2}: {result['response'].reason}")
+    assert r1.status == LockStatus.GRANTED
+    assert result['response'].status == LockStatus.FAILED
+
+def test_no_wait():
+    print("\n" + "="*70)
+    print("NO-WAIT")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager(deadlock_prevention=DeadlockPrevention.NO_WAIT)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t2, TableAction.READ, 'A').can_proceed
+    assert ccm.transaction_query(t1, TableAction.READ, 'A').can_proceed
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'A')
+    print(f"T{t1}: {r.reason}")
+    assert r.status == LockStatus.FAILED and r.blocked_by == [t2]
+    assert ccm.resource_waiters == {}
+    # T2 is alone on A again
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').can_proceed
+    ccm.transaction_commit(t2)
+    ccm.transaction_commit_flushed(t2)
+
+def test_detection_stays_default():
+    ccm = LockBasedConcurrencyControlManager()
+    assert ccm.deadlock_prevention == DeadlockPrevention.NONE
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transactions[t2]['timestamp'] == t2
+    ccm.transaction_query(t1, TableAction.WRITE, 'A')
+    ccm.transaction_query(t2, TableAction.WRITE, 'B')
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').should_retry
+    assert ccm.wait_for_graph == {t2: {t1}}
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'B')
+    assert 'Deadlock detected' in r.reason
+
+if __name__ == "__main__":
+    test_wait_die()
+    test_wait_die_restart_keeps_age()
+    test_wound_wait()
+    test_wound_wait_wounds_queued_request()
+    test_wound_wait_wakes_blocked_acquire()
+    test_no_wait()
+    test_detection_stays_default()
+    print("✓ All deadlock prevention tests PASSED")
@@ -0,0 +1,117 @@
+"""
+Tests for the deadlock victim selection policies of the lock-based CCM
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.deadlock_detection import DeadlockDetection
+from src.deadlock_victim_policy import DeadlockVictimPolicy
+from src.row_action import TableAction
+from src.concurrency_response import LockStatus
+from src.transaction_status import TransactionStatus
+
+def two_way_deadlock(ccm, extra_reads_t1=(), extra_reads_t2=()):
+    """T1 holds A, T2 holds B and waits for A; returns T1's request for B, which closes the cycle"""
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').can_proceed
+    for table_name in extra_reads_t1:
+        assert ccm.transaction_query(t1, TableAction.READ, table_name).can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'B').can_proceed
+    for table_name in extra_reads_t2:
+        assert ccm.transaction_query(t2, TableAction.READ, table_name).can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').should_retry
+    return t1, t2, ccm.transaction_query(t1, TableAction.WRITE, 'B')
+
+def test_requester_is_default_victim():
+    print("\n" + "="*70)
+    print("DEADLOCK VICTIM SELECTION")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, r = two_way_deadlock(ccm)
+    print(f"REQUESTER  T{t1}: {r.reason}")
+    assert r.status == LockStatus.FAILED
+    assert ccm.transactions[t1]['status'] == TransactionStatus.FAILED
+    assert ccm.transactions[t2]['status'] == TransactionStatus.ACTIVE
+
+def test_youngest_victim_lets_requester_wait():
+    for deadlock_detection in (DeadlockDetection.DFS, DeadlockDetection.INCREMENTAL):
+        ccm = LockBasedConcurrencyControlManager(
+            deadlock_detection=deadlock_detection,
+            deadlock_victim_policy=DeadlockVictimPolicy.YOUNGEST
+        )
+        t1, t2, r = two_way_deadlock(ccm)
+        print(f"YOUNGEST   T{t1}: {r.reason}")
+        assert r.status == LockStatus.WAITING and r.blocked_by == [t2]
+        assert ccm.transactions[t2]['status'] == TransactionStatus.FAILED
+        assert 'Deadlock detected' in ccm.transactions[t2]['abort_reason']
+        assert ccm.wait_for_graph == {}
+        # T2's locks were handed over
+        assert ccm.transaction_query(t1, TableAction.WRITE, 'B').can_proceed
+
+def test_fewest_locks_victim():
+    ccm = LockBasedConcurrencyControlManager(deadlock_victim_policy=DeadlockVictimPolicy.FEWEST_LOCKS)
+    t1, t2, r = two_way_deadlock(ccm, extra_reads_t1=('C', 'D'))
+    print(f"FEWEST     T{t1}: {r.reason}")
+    assert r.status == LockStatus.WAITING
+    assert ccm.transactions[t2]['status'] == TransactionStatus.FAILED
+
+    # the younger transaction survives when it holds more
+    ccm = LockBasedConcurrencyControlManager(deadlock_victim_policy=DeadlockVictimPolicy.FEWEST_LOCKS)
+    t1, t2, r = two_way_deadlock(ccm, extra_reads_t2=('C', 'D'))
+    assert r.status == LockStatus.FAILED
+    assert ccm.transactions[t2]['status'] == TransactionStatus.ACTIVE
+
+def test_least_work_victim():
+    ccm = LockBasedConcurrencyControlManager(deadlock_victim_policy=DeadlockVictimPolicy.LEAST_WORK)
+    t1, t2, r = two_way_deadlock(ccm, extra_reads_t2=('C', 'D', 'E'))
+    print(f"LEAST_WORK T{t1}: {r.reason}")
+    assert ccm.transactions[t1]['locks_acquired'] < ccm.transactions[t2]['locks_acquired']
+    assert r.status == LockStatus.FAILED
+    assert ccm.transactions[t2]['status'] == TransactionStatus.ACTIVE
+
+def test_priority_victim():
+    priorities = {}
+    ccm = LockBasedConcurrencyControlManager(
+        deadlock_victim_policy=DeadlockVictimPolicy.PRIORITY,
+        deadlock_victim_priority=lambda transaction_id: priorities.get(transaction_id, 0)
+    )
+    priorities[1] = 10
+    t1, t2, r = two_way_deadlock(ccm)
+    print(f"PRIORITY   T{t1}: {r.reason}")
+    assert r.status == LockStatus.WAITING
+    assert ccm.transactions[t2]['status'] == TransactionStatus.FAILED
+
+    try:
+        LockBasedConcurrencyControlManager(deadlock_victim_policy=DeadlockVictimPolicy.PRIORITY)
+    except Exception as e:
+        assert 'deadlock_victim_priority' in str(e)
+    else:
+        assert False, "expected an exception"
+
+def test_victim_chosen_over_whole_cycle():
+    ccm = LockBasedConcurrencyControlManager(deadlock_victim_policy=DeadlockVictimPolicy.YOUNGEST)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    for tid, table_name in ((t1, 'A'), (t2, 'B'), (t3, 'C')):
+        assert ccm.transaction_query(tid, TableAction.WRITE, table_name).can_proceed
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'A').should_retry
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'C').should_retry
+    # T1 -> T2 -> T3 -> T1: T3 is the youngest although T2 is T1's blocker
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'B')
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t2]
+    assert ccm.transactions[t3]['status'] == TransactionStatus.FAILED
+    assert ccm.transactions[t2]['status'] == TransactionStatus.ACTIVE
+    # T3's release let T2 through, so T1 now waits for T2 to finish
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'C').can_proceed
+    assert ccm.wait_for_graph == {t1: {t2}}
+
+if __name__ == "__main__":
+    test_requester_is_default_victim()
+    test_youngest_victim_lets_requester_wait()
+    test_fewest_locks_victim()
+    test_least_work_victim()
+    test_priority_victim()
+    test_victim_chosen_over_whole_cycle()
+    print("✓ All deadlock victim policy tests PASSED")
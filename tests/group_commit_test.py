@@ -0,0 +1,118 @@
+"""
+Tests for group commit in the validation-based CCM
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.row_action import TableAction
+from src.transaction_status import TransactionStatus
+
+def queue_commits(ccm, transaction_ids):
+    """Start a committing thread per transaction while validation_lock is held, in queue order"""
+    responses = {}
+    threads = []
+
+    def commit(tid):
+        responses[tid] = ccm.transaction_commit(tid)
+
+    for i, tid in enumerate(transaction_ids):
+        thread = threading.Thread(target=commit, args=(tid,))
+        thread.start()
+        threads.append(thread)
+        while len(ccm.commit_queue) <= i:
+            time.sleep(0.001)
+    return threads, responses
+
+def test_single_committer_same_as_default():
+    print("\n" + "="*70)
+    print("GROUP COMMIT")
+    print("="*70)
+    ccm = ValidationBasedConcurrencyControlManager(group_commit=True)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.READ, 'X')
+    ccm.transaction_query(t2, TableAction.WRITE, 'X')
+    assert ccm.transaction_commit(t2).can_proceed
+    ccm.transaction_commit_flushed(t2)
+    r = ccm.transaction_commit(t1)
+    print(f"T{t1}: {r.reason}")
+    assert r.should_rollback and r.reason_args == (t2,)
+    assert ccm.commit_group_count == 2
+    assert ccm.commit_queue == [] and ccm.group_commit_responses == {}
+
+def test_queued_commits_validate_as_one_group():
+    ccm = ValidationBasedConcurrencyControlManager(group_commit=True)
+    tids = [ccm.transaction_begin() for _ in range(4)]
+    for i, tid in enumerate(tids):
+        ccm.transaction_query(tid, TableAction.WRITE, f'table_{i}')
+    with ccm.validation_lock:
+        threads, responses = queue_commits(ccm, tids)
+    for thread in threads:
+        thread.join()
+    assert ccm.commit_group_count == 1
+    assert all(responses[tid].can_proceed for tid in tids)
+    assert all(ccm.transactions[tid]['status'] == TransactionStatus.PARTIALLY_COMMITTED for tid in tids)
+    validation_timestamps = [ccm.transactions[tid]['validation_timestamp'] for tid in tids]
+    assert validation_timestamps == sorted(validation_timestamps)
+
+def test_members_checked_against_each_other_and_the_log():
+    ccm = ValidationBasedConcurrencyControlManager(group_commit=True)
+    t_committed, t1, t2, t3 = [ccm.transaction_begin() for _ in range(4)]
+    ccm.transaction_query(t_committed, TableAction.WRITE, 'Z')
+    ccm.transaction_commit(t_committed)
+    ccm.transaction_commit_flushed(t_committed)
+    # t1 writes X, t2 reads X, t3 read Z before t_committed finished
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    ccm.transaction_query(t2, TableAction.READ, 'X')
+    ccm.transaction_query(t3, TableAction.READ, 'Z')
+    with ccm.validation_lock:
+        threads, responses = queue_commits(ccm, [t1, t2, t3])
+    for thread in threads:
+        thread.join()
+    for tid in (t1, t2, t3):
+        print(f"T{tid}: {responses[tid].reason}")
+    assert ccm.commit_group_count == 2
+    assert responses[t1].can_proceed
+    assert responses[t2].should_rollback and responses[t2].reason_args == (t1,)
+    assert responses[t3].should_rollback and responses[t3].reason_args == (t_committed,)
+    # a failed member is not checked against by the ones after it
+    assert t2 not in ccm.validated_transactions
+
+def test_concurrent_group_commit_is_serializable():
+    ccm = ValidationBasedConcurrencyControlManager(group_commit=True)
+    committed = []
+
+    def worker(seed):
+        for i in range(200):
+            tid = ccm.transaction_begin()
+            ccm.transaction_query(tid, TableAction.READ, f'table_{(seed + i) % 5}')
+            ccm.transaction_query(tid, TableAction.WRITE, f'table_{(seed + i + 1) % 5}')
+            if ccm.transaction_commit(tid).can_proceed:
+                ccm.transaction_commit_flushed(tid)
+                committed.append(tid)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert ccm.commit_queue == [] and ccm.group_commit_responses == {}
+    # no committed transaction overlaps a committed writer of a table it touched
+    for tid in committed:
+        Ti = ccm.transactions[tid]
+        for other in committed:
+            Tj = ccm.transactions[other]
+            if other == tid or not (Ti['start_timestamp'] < Tj['finish_timestamp'] and Tj['validation_timestamp'] < Ti['validation_timestamp']):
+                continue
+            assert not Tj['write_set'].intersects(Ti['read_set'] | Ti['write_set'])
+
+if __name__ == "__main__":
+    test_single_committer_same_as_default()
+    test_queued_commits_validate_as_one_group()
+    test_members_checked_against_each_other_and_the_log()
+    test_concurrent_group_commit_is_serializable()
+    print("✓ All group commit tests PASSED")
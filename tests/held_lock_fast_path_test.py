@@ -0,0 +1,118 @@
+"""
+Tests for the held-lock fast path of the lock-based CCM
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.lock_table import RowResource
+from src.row_action import RowAction, TableAction
+from src.concurrency_response import LockStatus
+from src.transaction_status import TransactionStatus
+
+def test_reentrant_request_takes_no_latch():
+    print("\n" + "="*70)
+    print("HELD-LOCK FAST PATH")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').can_proceed
+    for latch in (ccm.lock_table.stripe('A').latch, ccm.events_lock, ccm.transactions[t1]['latch']):
+        result = {}
+
+        def request():
+            result['response'] = ccm.transaction_query(t1, TableAction.READ, 'A')
+
+        with latch:
+            thread = threading.Thread(target=request)
+            thread.start()
+            thread.join(1)
+            assert 'response' in result, "re-entrant request waited for a latch"
+        thread.join()
+        print(f"T{t1}: {result['response'].reason}")
+        assert result['response'].status == LockStatus.GRANTED
+
+def test_same_responses_as_full_path():
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.READ, 'A')
+    ccm.transaction_query(t1, TableAction.WRITE, 'B')
+    assert ccm.transaction_query(t1, TableAction.READ, 'A').reason == 'Read lock granted on table A'
+    assert ccm.transaction_query(t1, TableAction.READ, 'B').reason == 'Read lock granted on table B'
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'B').reason == 'Write lock already held on table B'
+    # not covered, goes through the lock table
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').reason == 'Write lock granted on table A (exclusive)'
+
+    r = ccm.transaction_query_row(t1, RowAction.WRITE, 'B', 7)
+    assert r.reason == 'Write lock granted on row 7 of table B (exclusive)'
+    assert RowResource('B', 7) not in ccm.transactions[t1]['locks']
+    ccm.transaction_query_row(t1, RowAction.READ, 'C', 1)
+    assert ccm.transaction_query_row(t1, RowAction.READ, 'C', 1).reason == 'Read lock granted on row 1 of table C'
+    assert ccm.transaction_query_many(t1, [(TableAction.READ, 'A'), (TableAction.READ, 'B')]).can_proceed
+
+def test_fast_path_respects_transaction_state():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.WRITE, 'A')
+    ccm.transaction_query(t2, TableAction.WRITE, 'B')
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').should_retry
+    # T1 closes the cycle and is aborted; its held lock no longer answers
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'B').should_rollback
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'A')
+    assert r.status == LockStatus.FAILED
+    assert ccm.transactions[t1]['status'] == TransactionStatus.FAILED
+
+    t3 = ccm.transaction_begin(deadline=0.02)
+    assert ccm.transaction_query(t3, TableAction.READ, 'C').can_proceed
+    time.sleep(0.03)
+    r = ccm.transaction_query(t3, TableAction.READ, 'C')
+    assert r.reason == f'Deadline exceeded. Transaction {t3} aborted.'
+
+def test_handoff_still_reported():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.WRITE, 'A')
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').should_retry
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    r = ccm.transaction_query(t2, TableAction.WRITE, 'A')
+    assert r.reason == 'Write lock granted on table A (exclusive)'
+    assert ccm.transactions[t2]['handed_off'] == set()
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').reason == 'Write lock already held on table A'
+
+def test_fast_path_back_after_ancestor_handoff():
+    # T2's row write waits for IX on the table, which T1's commit hands over
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.READ, 'A').can_proceed
+    assert ccm.transaction_query_row(t2, RowAction.WRITE, 'A', 1).should_retry
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.transactions[t2]['handed_off'] == {'A'}
+    assert ccm.transaction_query_row(t2, RowAction.WRITE, 'A', 1).can_proceed
+    assert ccm.transactions[t2]['handed_off'] == set()
+
+    result = {}
+
+    def request():
+        result['response'] = ccm.transaction_query_row(t2, RowAction.WRITE, 'A', 1)
+
+    with ccm.lock_table.stripe(RowResource('A', 1)).latch:
+        thread = threading.Thread(target=request)
+        thread.start()
+        thread.join(1)
+        assert 'response' in result, "request on a held row waited for a latch"
+    thread.join()
+    assert result['response'].can_proceed
+
+if __name__ == "__main__":
+    test_reentrant_request_takes_no_latch()
+    test_same_responses_as_full_path()
+    test_fast_path_respects_transaction_state()
+    test_handoff_still_reported()
+    test_fast_path_back_after_ancestor_handoff()
+    print("✓ All held-lock fast path tests PASSED")
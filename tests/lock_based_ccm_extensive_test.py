@@ -203,8 +203,9 @@ def test_extensive_lock_based():
     r1 = ccm.transaction_query(t3, TableAction.WRITE, 'A')
     r2 = ccm.transaction_query(t3, TableAction.WRITE, 'B')
     
-    if r1.can_proceed and r2.can_proceed:
-        print("✓ PASSED - T3 acquired locks after T1 commit")
+    #A was handed to the queued T2 on commit, so T3 queues behind it
+    if r1.should_retry and r1.blocked_by == [t2] and r2.can_proceed:
+        print("✓ PASSED - A handed to queued T2, T3 waits for it and acquired B")
         passed += 1
     else:
         print("✗ FAILED")
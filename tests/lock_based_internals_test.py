@@ -0,0 +1,90 @@
+"""
+Consistency tests for the lock manager's internal indexes
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.row_action import TableAction
+from src.lock_mode import LockMode
+from src.concurrency_response import LockStatus
+
+def test_waiter_index_follows_register_and_clear():
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    t2 = ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+
+    r = ccm.transaction_query(t2, TableAction.READ, 'X')
+    assert r.status == LockStatus.WAITING
+    assert ccm.transaction_waits[t2] == {'X'}
+    assert ccm.resource_waiters['X'] == {t2: LockMode.S}
+    assert ccm.get_wait_event(t2) is ccm.transactions[t2]['wait_event']
+
+    # the release hands the lock to t2 and takes it off the queue
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.transactions[t2]['wait_event'].is_set()
+    assert t2 not in ccm.transaction_waits
+    assert 'X' not in ccm.resource_waiters
+    assert ccm.get_wait_event(t2) is None
+
+    r = ccm.transaction_query(t2, TableAction.READ, 'X')
+    assert r.status == LockStatus.GRANTED
+
+def test_waiter_index_cleared_on_end():
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    ccm.register_waiting_transaction(t1, 'A')
+    ccm.register_waiting_transaction(t1, 'B')
+    assert ccm.transaction_waits[t1] == {'A', 'B'}
+
+    ccm.transaction_rollback(t1)
+    ccm.transaction_abort(t1)
+    ccm.transaction_end(t1)
+    assert t1 not in ccm.transaction_waits
+    assert ccm.resource_waiters == {}
+
+def test_wait_for_graph_reverse_adjacency():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3, t4 = (ccm.transaction_begin() for _ in range(4))
+    ccm.transaction_query(t1, TableAction.READ, 'X')
+    ccm.transaction_query(t2, TableAction.READ, 'X')
+    ccm.transaction_query(t3, TableAction.WRITE, 'X')
+    ccm.transaction_query(t4, TableAction.WRITE, 'X')
+    assert ccm.wait_for_graph == {t3: {t1, t2}, t4: {t1, t2}}
+    assert ccm.waited_by_graph == {t1: {t3, t4}, t2: {t3, t4}}
+
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    # still queued, t4 now also waits behind t3's earlier request
+    assert ccm.wait_for_graph == {t3: {t2}, t4: {t2, t3}}
+    assert ccm.waited_by_graph == {t2: {t3, t4}, t3: {t4}}
+
+    ccm.transaction_rollback(t3)
+    assert ccm.wait_for_graph == {t4: {t2}}
+    assert ccm.waited_by_graph == {t2: {t4}}
+
+def test_release_resets_waiting_for_only_on_freed_tables():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3, t4 = (ccm.transaction_begin() for _ in range(4))
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    ccm.transaction_query(t2, TableAction.WRITE, 'Y')
+    ccm.transaction_query(t3, TableAction.WRITE, 'X')
+    ccm.transaction_query(t4, TableAction.WRITE, 'Y')
+    assert ccm.transactions[t3]['waiting_for'] == t1
+    assert ccm.transactions[t4]['waiting_for'] == t2
+
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.transactions[t3]['waiting_for'] is None
+    assert ccm.transactions[t4]['waiting_for'] == t2
+
+if __name__ == "__main__":
+    test_waiter_index_follows_register_and_clear()
+    test_waiter_index_cleared_on_end()
+    test_wait_for_graph_reverse_adjacency()
+    test_release_resets_waiting_for_only_on_freed_tables()
+    print("✓ All internals tests PASSED")
@@ -0,0 +1,142 @@
+"""
+Tests for the per-table request queues: direct handoff on release and the
+strict FIFO / reader-preferred / writer-preferred queue policies
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.lock_queue_policy import LockQueuePolicy
+from src.lock_mode import LockMode
+from src.row_action import TableAction
+from src.concurrency_response import LockStatus
+
+def test_strict_fifo_reader_does_not_overtake_queued_writer():
+    print("\n" + "="*70)
+    print("LOCK QUEUE POLICIES")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager(lock_queue_policy=LockQueuePolicy.STRICT_FIFO)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    assert ccm.transaction_query(t1, TableAction.READ, 'X').can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'X').should_retry
+    r = ccm.transaction_query(t3, TableAction.READ, 'X')
+    print(f"T{t3}: {r.reason}")
+    assert r.status == LockStatus.WAITING
+    assert r.blocked_by == [t2]
+
+    # the release hands X straight to the writer at the head of the queue
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.lock_table.stripe('X').locks['X'].holders == {t2: LockMode.X}
+    r = ccm.transaction_query(t2, TableAction.WRITE, 'X')
+    assert r.status == LockStatus.GRANTED and "exclusive" in r.reason.lower()
+    assert ccm.transaction_query(t3, TableAction.READ, 'X').should_retry
+
+    ccm.transaction_commit(t2)
+    ccm.transaction_commit_flushed(t2)
+    assert ccm.transaction_query(t3, TableAction.READ, 'X').can_proceed
+
+def test_reader_preferred_reader_joins_holders():
+    ccm = LockBasedConcurrencyControlManager(lock_queue_policy=LockQueuePolicy.READER_PREFERRED)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    ccm.transaction_query(t1, TableAction.READ, 'X')
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'X').should_retry
+    assert ccm.transaction_query(t3, TableAction.READ, 'X').can_proceed
+
+def test_writer_preferred_hands_off_to_writer_before_earlier_reader():
+    ccm = LockBasedConcurrencyControlManager(lock_queue_policy=LockQueuePolicy.WRITER_PREFERRED)
+    t1, t2, t3, t4 = (ccm.transaction_begin() for _ in range(4))
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    assert ccm.transaction_query(t2, TableAction.READ, 'X').should_retry
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'X').should_retry
+
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.lock_table.stripe('X').locks['X'].holders == {t3: LockMode.X}
+    assert ccm.transaction_query(t2, TableAction.READ, 'X').blocked_by == [t3]
+
+    # new readers queue up behind the writer too, once it is gone they share X
+    ccm.transaction_commit(t3)
+    ccm.transaction_commit_flushed(t3)
+    assert ccm.transaction_query(t4, TableAction.READ, 'X').can_proceed
+    assert ccm.transaction_query(t2, TableAction.READ, 'X').can_proceed
+
+def test_writer_preferred_new_reader_waits_for_queued_writer():
+    ccm = LockBasedConcurrencyControlManager(lock_queue_policy=LockQueuePolicy.WRITER_PREFERRED)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    ccm.transaction_query(t1, TableAction.READ, 'X')
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'X').should_retry
+    r = ccm.transaction_query(t3, TableAction.READ, 'X')
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t2]
+
+def test_upgrade_is_handed_off_before_queued_writer():
+    ccm = LockBasedConcurrencyControlManager(lock_queue_policy=LockQueuePolicy.STRICT_FIFO)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    ccm.transaction_query(t1, TableAction.READ, 'X')
+    ccm.transaction_query(t2, TableAction.READ, 'X')
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'X').should_retry
+    # the upgrade does not queue behind t3, which already waits for t1
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t2]
+
+    ccm.transaction_commit(t2)
+    ccm.transaction_commit_flushed(t2)
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    assert r.status == LockStatus.GRANTED and "exclusive" in r.reason.lower()
+    assert ccm.wait_for_graph[t3] == {t1}
+
+def test_handoff_skips_aborted_waiter():
+    ccm = LockBasedConcurrencyControlManager(lock_queue_policy=LockQueuePolicy.STRICT_FIFO)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'X').should_retry
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'X').should_retry
+    ccm.transaction_rollback(t2)
+
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'X').can_proceed
+
+def test_handoff_records_linear_waits():
+    ccm = LockBasedConcurrencyControlManager(lock_queue_policy=LockQueuePolicy.STRICT_FIFO)
+    holder = ccm.transaction_begin()
+    ccm.transaction_query(holder, TableAction.WRITE, 'X')
+    writers = [ccm.transaction_begin() for _ in range(200)]
+    for tid in writers:
+        assert ccm.transaction_query(tid, TableAction.WRITE, 'X').should_retry
+
+    # each writer left queued waits for the one ahead of it, not for all of them
+    ccm.transaction_commit(holder)
+    ccm.transaction_commit_flushed(holder)
+    edges = sum(len(blockers) for blockers in ccm.wait_for_graph.values())
+    print(f"{len(writers)} queued writers, {edges} wait-for edges after the handoff")
+    assert edges == len(writers) - 1
+    assert ccm.wait_for_graph[writers[1]] == {writers[0]}
+    assert ccm.wait_for_graph[writers[2]] == {writers[1]}
+
+def test_waiter_behind_departed_waiter_waits_for_holder():
+    ccm = LockBasedConcurrencyControlManager(lock_queue_policy=LockQueuePolicy.STRICT_FIFO)
+    t1, t2, t3, t4 = (ccm.transaction_begin() for _ in range(4))
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    for tid in (t2, t3, t4):
+        assert ccm.transaction_query(tid, TableAction.WRITE, 'X').should_retry
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.wait_for_graph[t4] == {t3}
+
+    # t4 only reached the new holder t2 through t3, so it now waits for t2 itself
+    ccm.transaction_rollback(t3)
+    assert t2 in ccm.wait_for_graph[t4]
+
+if __name__ == "__main__":
+    test_strict_fifo_reader_does_not_overtake_queued_writer()
+    test_reader_preferred_reader_joins_holders()
+    test_writer_preferred_hands_off_to_writer_before_earlier_reader()
+    test_writer_preferred_new_reader_waits_for_queued_writer()
+    test_upgrade_is_handed_off_before_queued_writer()
+    test_handoff_skips_aborted_waiter()
+    test_handoff_records_linear_waits()
+    test_waiter_behind_departed_waiter_waits_for_holder()
+    print("✓ All lock queue policy tests PASSED")
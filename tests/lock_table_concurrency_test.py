@@ -0,0 +1,103 @@
+"""
+Multi-threaded stress test for the striped lock table of the lock-based CCM
+"""
+
+import sys
+import os
+import random
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.retention_policy import RetentionPolicy
+from src.row_action import TableAction
+
+TABLES = [f'table_{i}' for i in range(12)]
+
+def run_workers(ccm, thread_count, transactions_per_thread):
+    occupancy = {table: [0, 0] for table in TABLES}  # [readers, writers] inside their lock
+    occupancy_lock = threading.Lock()
+    errors = []
+    committed = [0]
+
+    def enter(held):
+        with occupancy_lock:
+            for table, action in held.items():
+                readers, writers = occupancy[table]
+                if action == TableAction.WRITE:
+                    if readers or writers:
+                        errors.append(f'{table}: writer admitted next to {readers} reader(s), {writers} writer(s)')
+                    occupancy[table][1] += 1
+                else:
+                    if writers:
+                        errors.append(f'{table}: reader admitted next to a writer')
+                    occupancy[table][0] += 1
+
+    def leave(held):
+        with occupancy_lock:
+            for table, action in held.items():
+                occupancy[table][1 if action == TableAction.WRITE else 0] -= 1
+
+    def worker(seed):
+        rnd = random.Random(seed)
+        try:
+            for _ in range(transactions_per_thread):
+                tid = ccm.transaction_begin()
+                held = {}
+                failed = False
+                for table in rnd.sample(TABLES, 3):
+                    action = rnd.choice([TableAction.READ, TableAction.WRITE])
+                    while True:
+                        r = ccm.transaction_query(tid, action, table)
+                        if r.should_retry:
+                            event = ccm.get_wait_event(tid)
+                            if event is not None:
+                                event.wait(0.05)
+                            continue
+                        break
+                    if r.should_rollback:
+                        failed = True
+                        break
+                    held[table] = action
+                if failed:
+                    ccm.transaction_abort(tid)
+                else:
+                    enter(held)
+                    leave(held)
+                    ccm.transaction_commit(tid)
+                    ccm.transaction_commit_flushed(tid)
+                    committed[0] += 1
+                ccm.transaction_end(tid)
+        except Exception as e:
+            errors.append(repr(e))
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+    return errors, committed[0]
+
+def test_concurrent_workers_respect_lock_compatibility():
+    print("\n" + "="*70)
+    print("STRIPED LOCK TABLE - 16 THREADS")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager(retention_policy=RetentionPolicy.immediate(), lock_table_stripes=4)
+    # force frequent thread switches so requests actually interleave
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        errors, committed = run_workers(ccm, thread_count=16, transactions_per_thread=60)
+    finally:
+        sys.setswitchinterval(switch_interval)
+    print(f"Committed: {committed}, errors: {len(errors)}")
+    assert errors == [], errors[:5]
+    assert committed > 0
+    for stripe in ccm.lock_table.stripes:
+        assert stripe.locks == {}
+    assert ccm.wait_for_graph == {} and ccm.waited_by_graph == {}
+    assert ccm.transactions == {}
+
+if __name__ == "__main__":
+    test_concurrent_workers_respect_lock_compatibility()
+    print("✓ Striped lock table test PASSED")
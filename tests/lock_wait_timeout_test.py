@@ -0,0 +1,139 @@
+"""
+Tests for lock wait timeouts and transaction deadlines of the lock-based CCM
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.deadlock_detection import DeadlockDetection
+from src.row_action import TableAction
+from src.concurrency_response import LockStatus
+from src.transaction_status import TransactionStatus
+
+def test_manager_lock_wait_timeout():
+    print("\n" + "="*70)
+    print("LOCK WAIT TIMEOUTS")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager(lock_wait_timeout=0.05)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.READ, 'A').should_retry
+    # retries before the timeout keep the same clock
+    time.sleep(0.03)
+    assert ccm.transaction_query(t2, TableAction.READ, 'A').should_retry
+    time.sleep(0.03)
+    r = ccm.transaction_query(t2, TableAction.READ, 'A')
+    print(f"T{t2}: {r.reason}")
+    assert r.status == LockStatus.FAILED
+    assert r.reason == f'Lock wait timeout. Transaction {t2} aborted.'
+    assert ccm.transactions[t2]['status'] == TransactionStatus.FAILED
+    assert ccm.wait_for_graph == {}
+    assert ccm.resource_waiters == {}
+
+def test_per_request_timeout():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A', wait_timeout=0.02).should_retry
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'A').should_retry
+    time.sleep(0.04)
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').should_rollback
+    # no timeout without one configured
+    assert ccm.transaction_query(t3, TableAction.WRITE, 'A').should_retry
+
+def test_expired_waiter_leaves_queue_without_retrying():
+    ccm = LockBasedConcurrencyControlManager(lock_wait_timeout=0.02)
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    assert ccm.transaction_query(t1, TableAction.READ, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').should_retry
+    r = ccm.transaction_query(t3, TableAction.READ, 'A', wait_timeout=1)
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t2]
+    time.sleep(0.04)
+    # T2 never retries; T3's request finds it expired and takes its place
+    r = ccm.transaction_query(t3, TableAction.READ, 'A')
+    print(f"T{t3}: {r.reason}")
+    assert r.status == LockStatus.GRANTED
+    assert ccm.transactions[t2]['abort_reason'] == f'Lock wait timeout. Transaction {t2} aborted.'
+
+def test_transaction_deadline():
+    ccm = LockBasedConcurrencyControlManager(lock_wait_timeout=10)
+    t1 = ccm.transaction_begin()
+    t2 = ccm.transaction_begin(deadline=0.03)
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'B').can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').should_retry
+    time.sleep(0.05)
+    r = ccm.transaction_query(t2, TableAction.WRITE, 'A')
+    print(f"T{t2}: {r.reason}")
+    assert r.reason == f'Deadline exceeded. Transaction {t2} aborted.'
+
+    # a request after the deadline fails even without waiting
+    t3 = ccm.transaction_begin(deadline=0.01)
+    time.sleep(0.02)
+    r = ccm.transaction_query(t3, TableAction.READ, 'C')
+    assert r.reason == f'Deadline exceeded. Transaction {t3} aborted.'
+    assert ccm.transactions[t3]['status'] == TransactionStatus.FAILED
+
+def test_acquire_wait_timeout_and_wake_up():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    assert ccm.acquire(t1, TableAction.READ, 'A').can_proceed
+    # T2 queues a write and its client goes away
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A', wait_timeout=0.05).should_retry
+    result = {}
+
+    def reader():
+        start = time.monotonic()
+        result['response'] = ccm.acquire(t3, TableAction.READ, 'A', timeout=5)
+        result['elapsed'] = time.monotonic() - start
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    thread.join(5)
+    print(f"T{t3}: {result['response'].reason} after {result['elapsed']:.3f}s")
+    assert result['response'].status == LockStatus.GRANTED
+    assert result['elapsed'] < 1
+
+    r = ccm.acquire(t2, TableAction.WRITE, 'A', wait_timeout=0.02)
+    assert r.status == LockStatus.FAILED
+
+def test_timeouts_break_deadlocks_without_detection():
+    ccm = LockBasedConcurrencyControlManager(deadlock_detection=DeadlockDetection.NONE, lock_wait_timeout=1)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'B').can_proceed
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'B', wait_timeout=0.02).should_retry
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').should_retry
+    assert ccm.wait_for_graph == {}
+    time.sleep(0.04)
+    # T1's shorter wait expires first and its locks go to T2
+    r = ccm.transaction_query(t2, TableAction.WRITE, 'A')
+    print(f"T{t2}: {r.reason}")
+    assert r.status == LockStatus.GRANTED
+    assert ccm.transactions[t1]['status'] == TransactionStatus.FAILED
+
+def test_heap_emptied_between_check_and_read():
+    class EmptiedHeap(list):
+        """Non-empty when tested, empty when read, as if another thread popped it"""
+        def __bool__(self):
+            return True
+
+    ccm = LockBasedConcurrencyControlManager()
+    ccm.wait_deadlines = EmptiedHeap()
+    assert ccm._expire_waits() == []
+    assert ccm._acquire_wait_time(None) is None
+    assert ccm._acquire_wait_time(time.monotonic() + 5) > 4
+
+if __name__ == "__main__":
+    test_manager_lock_wait_timeout()
+    test_per_request_timeout()
+    test_expired_waiter_leaves_queue_without_retrying()
+    test_transaction_deadline()
+    test_acquire_wait_timeout_and_wake_up()
+    test_timeouts_break_deadlocks_without_detection()
+    test_heap_emptied_between_check_and_read()
+    print("✓ All lock wait timeout tests PASSED")
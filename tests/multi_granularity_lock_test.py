@@ -0,0 +1,163 @@
+"""
+Tests for hierarchical (database -> table -> row) locking with intention modes
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.lock_mode import LockMode
+from src.lock_table import DATABASE
+from src.row_action import TableAction
+from src.concurrency_response import LockStatus
+
+def holders(ccm, resource_name):
+    return ccm.lock_table.stripe(resource_name).locks[resource_name].holders
+
+def test_compatibility_matrix():
+    print("\n" + "="*70)
+    print("MULTI-GRANULARITY LOCKING")
+    print("="*70)
+    compatible = {
+        (LockMode.IS, LockMode.IS), (LockMode.IS, LockMode.IX), (LockMode.IS, LockMode.S),
+        (LockMode.IS, LockMode.SIX), (LockMode.IX, LockMode.IX), (LockMode.S, LockMode.S),
+        (LockMode.IS, LockMode.U), (LockMode.S, LockMode.U),
+    }
+    for held in LockMode:
+        for requested in LockMode:
+            expected = (held, requested) in compatible or (requested, held) in compatible
+            assert held.compatible_with(requested) == expected, (held, requested)
+            joined = held.join(requested)
+            assert joined.covers(held) and joined.covers(requested)
+    assert LockMode.S.join(LockMode.IX) == LockMode.SIX
+    assert LockMode.X.intention == LockMode.IX and LockMode.S.intention == LockMode.IS
+
+def test_writers_of_different_rows_proceed_in_parallel():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    r1 = ccm.transaction_query_lock(t1, LockMode.X, 'orders', 1)
+    r2 = ccm.transaction_query_lock(t2, LockMode.X, 'orders', 2)
+    print(f"T{t1}: {r1.reason}")
+    print(f"T{t2}: {r2.reason}")
+    assert r1.can_proceed and r2.can_proceed
+    assert holders(ccm, 'orders') == {t1: LockMode.IX, t2: LockMode.IX}
+    # no database lock is requested, so the intentions on it stay out of the lock table
+    assert DATABASE not in ccm.lock_table.stripe(DATABASE).locks
+    assert ccm.transactions[t1]['root_intention'] == LockMode.IX
+
+    r = ccm.transaction_query_lock(t2, LockMode.S, 'orders', 1)
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+
+def test_table_reader_waits_for_row_writer():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    assert ccm.transaction_query_lock(t1, LockMode.X, 'orders', 1).can_proceed
+    r = ccm.transaction_query(t2, TableAction.READ, 'orders')
+    print(f"T{t2}: {r.reason}")
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+    assert 'IX' in r.reason
+    # readers of single rows only need IS on the table and are not held up
+    assert ccm.transaction_query_lock(t3, LockMode.S, 'orders', 2).can_proceed
+
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.transaction_query(t2, TableAction.READ, 'orders').can_proceed
+
+def test_six_lets_row_readers_in_but_not_row_writers():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    ccm.transaction_query(t1, TableAction.READ, 'orders')
+    # S then IX on the same table converts to SIX
+    assert ccm.transaction_query_lock(t1, LockMode.X, 'orders', 7).can_proceed
+    assert holders(ccm, 'orders') == {t1: LockMode.SIX}
+    assert ccm.transaction_query_lock(t2, LockMode.S, 'orders', 8).can_proceed
+    r = ccm.transaction_query_lock(t3, LockMode.X, 'orders', 9)
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+
+def test_database_lock_blocks_table_requests():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    r = ccm.transaction_query_lock(t1, LockMode.X)
+    assert r.status == LockStatus.GRANTED and 'database' in r.reason
+    r = ccm.transaction_query(t2, TableAction.READ, 'A')
+    print(f"T{t2}: {r.reason}")
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+    assert r.reason.endswith('on database')
+
+    # the release hands IS on the database over, the retry goes on to the table
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert holders(ccm, DATABASE) == {t2: LockMode.IS}
+    assert ccm.transaction_query(t2, TableAction.READ, 'A').can_proceed
+
+def test_database_lock_waits_for_table_lockers():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3, t4 = (ccm.transaction_begin() for _ in range(4))
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').can_proceed
+    r = ccm.transaction_query_lock(t2, LockMode.S)
+    print(f"T{t2}: {r.reason}")
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+    assert holders(ccm, DATABASE) == {t1: LockMode.IX}
+    # readers still go ahead, now through the database's lock
+    assert ccm.transaction_query(t3, TableAction.READ, 'B').can_proceed
+    assert holders(ccm, DATABASE) == {t1: LockMode.IX, t3: LockMode.IS}
+
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.transaction_query_lock(t2, LockMode.S).can_proceed
+    r = ccm.transaction_query(t4, TableAction.WRITE, 'C')
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t2]
+
+    # once the database lock is released, table requests skip the root again
+    ccm.transaction_commit(t2)
+    ccm.transaction_commit_flushed(t2)
+    assert ccm.transaction_query(t4, TableAction.WRITE, 'C').can_proceed
+    t5 = ccm.transaction_begin()
+    assert ccm.transaction_query(t5, TableAction.WRITE, 'D').can_proceed
+    assert ccm.transactions[t5]['root_intention'] == LockMode.IX
+    assert t5 not in holders(ccm, DATABASE)
+
+def test_table_requests_skip_database_latch():
+    ccm = LockBasedConcurrencyControlManager()
+    root_stripe = ccm.lock_table.stripe(DATABASE)
+    tables = [f'table_{i}' for i in range(64) if ccm.lock_table.stripe(f'table_{i}') is not root_stripe][:8]
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+
+    def run():
+        for table_name in tables:
+            ccm.transaction_query(t1, TableAction.WRITE, table_name)
+            ccm.transaction_query_lock(t2, LockMode.S, table_name, 1)
+        ccm.transaction_commit(t1)
+        ccm.transaction_commit_flushed(t1)
+
+    # with the root's latch taken, requests on other tables must not need it
+    with root_stripe.latch:
+        worker = threading.Thread(target=run)
+        worker.start()
+        worker.join(timeout=5)
+        finished = not worker.is_alive()
+    worker.join()
+    assert finished, "table requests waited for the database's latch"
+
+def test_row_without_table_is_rejected():
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    try:
+        ccm.transaction_query_lock(t1, LockMode.S, row_key=1)
+    except Exception as e:
+        assert 'without a table' in str(e)
+    else:
+        assert False, "expected an exception"
+
+if __name__ == "__main__":
+    test_compatibility_matrix()
+    test_writers_of_different_rows_proceed_in_parallel()
+    test_table_reader_waits_for_row_writer()
+    test_six_lets_row_readers_in_but_not_row_writers()
+    test_database_lock_blocks_table_requests()
+    test_database_lock_waits_for_table_lockers()
+    test_table_requests_skip_database_latch()
+    test_row_without_table_is_rejected()
+    print("✓ All multi-granularity locking tests PASSED")
@@ -0,0 +1,85 @@
+"""
+Tests for ResourceRegistry and the bitmap ResourceSet read/write sets
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.resource_registry import ResourceRegistry, ResourceSet
+from src.lock_table import RowResource
+from src.timestamp_based_concurrency_control_manager import TimestampBasedConcurrencyControlManager
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.row_action import TableAction
+
+def test_registry_interns_densely():
+    print("\n" + "="*70)
+    print("RESOURCE REGISTRY")
+    print("="*70)
+    registry = ResourceRegistry()
+    assert [registry.intern(name) for name in ('A', 'B', 'A', RowResource('A', 7))] == [0, 1, 0, 2]
+    assert registry.name_of(2) == RowResource('A', 7)
+    assert registry.lookup('C') is None and len(registry) == 3
+
+def test_registry_is_thread_safe():
+    registry = ResourceRegistry()
+    results = []
+
+    def worker():
+        results.append([registry.intern(f'table_{i}') for i in range(500)])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(ids == results[0] for ids in results)
+    assert sorted(results[0]) == list(range(500))
+
+def test_resource_set_behaves_like_a_set():
+    registry = ResourceRegistry()
+    s = ResourceSet(registry, ['X', 'Y'])
+    print(f"ResourceSet: {s} bits={bin(s.bits)}")
+    assert s == {'X', 'Y'} and {'X', 'Y'} == s
+    assert 'X' in s and 'Z' not in s
+    assert 'Z' not in registry.ids, "membership test interned the name"
+    s.add('Z')
+    s.discard('X')
+    assert sorted(s) == ['Y', 'Z'] and len(s) == 2
+    assert repr(ResourceSet(registry)) == 'set()'
+    assert s & {'Z', 'W'} == {'Z'}
+
+    t = ResourceSet(registry, ['Z', 'W'])
+    assert s.intersects(t) and (s & t).bits == 1 << registry.lookup('Z')
+    assert s | t == {'Y', 'Z', 'W'}
+    assert s - t == {'Y'}
+    copy = s.copy()
+    copy.update(t)
+    assert copy == {'Y', 'Z', 'W'} and s == {'Y', 'Z'}
+    assert not ResourceSet(registry, ['X']).intersects(t)
+
+def test_managers_use_resource_sets():
+    for ccm in (TimestampBasedConcurrencyControlManager(), ValidationBasedConcurrencyControlManager()):
+        t1 = ccm.transaction_begin()
+        ccm.transaction_query_many(t1, [(TableAction.READ, 'a'), (TableAction.WRITE, 'b')])
+        read_set = ccm.transactions[t1]['read_set']
+        assert isinstance(read_set, ResourceSet) and read_set.registry is ccm.resource_registry
+        assert read_set == {'a'} and ccm.transactions[t1]['write_set'] == {'b'}
+
+    ccm = ValidationBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.WRITE, 'b')
+    ccm.transaction_query(t2, TableAction.READ, 'a')
+    ccm.transaction_query(t2, TableAction.READ, 'b')
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.commit_log[-1][3] == 1 << ccm.resource_registry.lookup('b')
+    assert ccm.transaction_commit(t2).should_rollback
+
+if __name__ == "__main__":
+    test_registry_interns_densely()
+    test_registry_is_thread_safe()
+    test_resource_set_behaves_like_a_set()
+    test_managers_use_resource_sets()
+    print("✓ All resource registry tests PASSED")
@@ -0,0 +1,146 @@
+"""
+Tests for row-level requests (transaction_query_row) and row lock escalation
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.lock_mode import LockMode
+from src.deadlock_victim_policy import DeadlockVictimPolicy
+from src.lock_table import RowResource
+from src.row_action import RowAction, TableAction
+from src.concurrency_response import LockStatus
+from src.transaction_status import TransactionStatus
+
+def row_locks(ccm, transaction_id, table_name):
+    return {
+        resource_name.row_key: mode for resource_name, mode in ccm.transactions[transaction_id]['locks'].items()
+        if isinstance(resource_name, RowResource) and resource_name.table_name == table_name
+    }
+
+def test_row_reads_and_writes():
+    print("\n" + "="*70)
+    print("ROW-LEVEL LOCKING")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    r = ccm.transaction_query_row(t1, RowAction.WRITE, 'accounts', 42)
+    print(f"T{t1}: {r.reason}")
+    assert r.status == LockStatus.GRANTED
+    assert r.reason == 'Write lock granted on row 42 of table accounts (exclusive)'
+    assert ccm.transaction_query_row(t2, RowAction.WRITE, 'accounts', 43).can_proceed
+    assert ccm.transaction_query_row(t2, RowAction.READ, 'accounts', 44).can_proceed
+
+    r = ccm.transaction_query_row(t2, RowAction.READ, 'accounts', 42)
+    print(f"T{t2}: {r.reason}")
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    assert ccm.transaction_query_row(t2, RowAction.READ, 'accounts', 42).can_proceed
+
+def test_table_lock_covers_rows():
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.WRITE, 'accounts')
+    assert ccm.transaction_query_row(t1, RowAction.WRITE, 'accounts', 1).can_proceed
+    assert row_locks(ccm, t1, 'accounts') == {}
+
+def test_write_escalation_past_threshold():
+    ccm = LockBasedConcurrencyControlManager(row_lock_escalation_threshold=3)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    for key in range(3):
+        assert ccm.transaction_query_row(t1, RowAction.WRITE, 'accounts', key).can_proceed
+    assert len(row_locks(ccm, t1, 'accounts')) == 3
+    assert ccm.transactions[t1]['locks']['accounts'] == LockMode.IX
+
+    # the fourth row lock crosses the threshold
+    assert ccm.transaction_query_row(t1, RowAction.READ, 'accounts', 3).can_proceed
+    print(f"T{t1} locks after escalation: {ccm.transactions[t1]['locks']}")
+    assert row_locks(ccm, t1, 'accounts') == {}
+    assert ccm.transactions[t1]['locks']['accounts'] == LockMode.X
+    assert ccm.transactions[t1]['row_locks'] == {}
+    for key in range(4):
+        stripe = ccm.lock_table.stripe(RowResource('accounts', key))
+        assert RowResource('accounts', key) not in stripe.locks
+
+    r = ccm.transaction_query_row(t2, RowAction.READ, 'accounts', 99)
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+
+def test_read_escalation_takes_shared_table_lock():
+    ccm = LockBasedConcurrencyControlManager(row_lock_escalation_threshold=2)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    for key in range(3):
+        ccm.transaction_query_row(t1, RowAction.READ, 'accounts', key)
+    assert ccm.transactions[t1]['locks']['accounts'] == LockMode.S
+    assert ccm.transaction_query_row(t2, RowAction.READ, 'accounts', 0).can_proceed
+    assert ccm.transaction_query_row(t2, RowAction.WRITE, 'accounts', 5).should_retry
+
+def test_escalation_waits_for_conflicting_rows_of_others():
+    ccm = LockBasedConcurrencyControlManager(row_lock_escalation_threshold=2)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query_row(t2, RowAction.WRITE, 'accounts', 100).can_proceed
+    for key in range(3):
+        assert ccm.transaction_query_row(t1, RowAction.WRITE, 'accounts', key).can_proceed
+    # t2's IX on the table blocks the escalation, the row locks are kept
+    assert len(row_locks(ccm, t1, 'accounts')) == 3
+    assert t1 not in ccm.transaction_waits
+
+    ccm.transaction_commit(t2)
+    ccm.transaction_commit_flushed(t2)
+    assert ccm.transaction_query_row(t1, RowAction.WRITE, 'accounts', 3).can_proceed
+    assert row_locks(ccm, t1, 'accounts') == {}
+    assert ccm.transactions[t1]['locks']['accounts'] == LockMode.X
+
+def test_escalation_never_makes_queued_requests_wait():
+    ccm = LockBasedConcurrencyControlManager(
+        row_lock_escalation_threshold=2,
+        deadlock_victim_policy=DeadlockVictimPolicy.YOUNGEST,
+    )
+    t_reader, t_writer, t1 = (ccm.transaction_begin() for _ in range(3))
+    assert ccm.transaction_query(t_reader, TableAction.READ, 'accounts').can_proceed
+    assert ccm.transaction_query(t_writer, TableAction.WRITE, 'ledger').can_proceed
+    # t_writer queues IX on accounts behind the reader, t1 waits for t_writer on ledger
+    assert ccm.transaction_query_row(t_writer, RowAction.WRITE, 'accounts', 0).should_retry
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'ledger').should_retry
+    for key in range(3):
+        assert ccm.transaction_query_row(t1, RowAction.READ, 'accounts', key).can_proceed
+    # S on the table would make t_writer wait for t1, closing a cycle: not escalated,
+    # and nobody is aborted or taken out of the wait-for graph
+    assert len(row_locks(ccm, t1, 'accounts')) == 3
+    assert ccm.transactions[t1]['locks']['accounts'] == LockMode.IS
+    assert ccm.wait_for_graph == {t_writer: {t_reader}, t1: {t_writer}}
+    assert all(ccm.transactions[tid]['status'] == TransactionStatus.ACTIVE for tid in (t_reader, t_writer, t1))
+
+def test_per_table_thresholds():
+    ccm = LockBasedConcurrencyControlManager(
+        row_lock_escalation_threshold=2,
+        table_escalation_thresholds={'ledger': None, 'audit': 5},
+    )
+    t1 = ccm.transaction_begin()
+    for key in range(4):
+        for table_name in ('accounts', 'ledger', 'audit'):
+            ccm.transaction_query_row(t1, RowAction.WRITE, table_name, key)
+    assert row_locks(ccm, t1, 'accounts') == {}
+    assert len(row_locks(ccm, t1, 'ledger')) == 4
+    assert len(row_locks(ccm, t1, 'audit')) == 4
+
+def test_invalid_threshold_rejected():
+    try:
+        LockBasedConcurrencyControlManager(row_lock_escalation_threshold=0)
+    except Exception as e:
+        assert 'must be positive' in str(e)
+    else:
+        assert False, "expected an exception"
+
+if __name__ == "__main__":
+    test_row_reads_and_writes()
+    test_table_lock_covers_rows()
+    test_write_escalation_past_threshold()
+    test_read_escalation_takes_shared_table_lock()
+    test_escalation_waits_for_conflicting_rows_of_others()
+    test_escalation_never_makes_queued_requests_wait()
+    test_per_table_thresholds()
+    test_invalid_threshold_rejected()
+    print("✓ All row locking tests PASSED")
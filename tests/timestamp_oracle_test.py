@@ -0,0 +1,101 @@
+"""
+Tests for the shared TimestampOracle and its use by the managers
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.timestamp_based_concurrency_control_manager import TimestampBasedConcurrencyControlManager
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.timestamp_oracle import TimestampOracle
+from src.row_action import TableAction
+
+def test_fresh_oracle_timestamps_equal_ids():
+    print("\n" + "="*70)
+    print("TIMESTAMP ORACLE")
+    print("="*70)
+    for ccm in (LockBasedConcurrencyControlManager(), TimestampBasedConcurrencyControlManager()):
+        ids = [ccm.transaction_begin() for _ in range(5)]
+        assert [ccm.transactions[tid]['timestamp'] for tid in ids] == ids
+    # a restart keeps the timestamp it passes, and the clock still moves on
+    ccm = LockBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    t2 = ccm.transaction_begin(timestamp=t1)
+    t3 = ccm.transaction_begin()
+    assert ccm.transactions[t2]['timestamp'] == t1
+    assert ccm.transactions[t3]['timestamp'] == t3
+
+def test_validation_timestamps_are_logical():
+    ccm = ValidationBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    t2 = ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    ccm.transaction_query(t2, TableAction.READ, 'X')
+    # no sleeps needed, the clock never ties
+    assert ccm.transaction_commit(t1).can_proceed
+    ccm.transaction_commit_flushed(t1)
+    T1 = ccm.transactions[t1]
+    print(f"T{t1}: start={T1['start_timestamp']} validation={T1['validation_timestamp']} finish={T1['finish_timestamp']}")
+    assert T1['start_timestamp'] < ccm.transactions[t2]['start_timestamp'] < T1['validation_timestamp'] < T1['finish_timestamp']
+    assert ccm.transaction_commit(t2).should_rollback
+
+def test_shared_oracle_orders_managers():
+    oracle = TimestampOracle()
+    lock_ccm = LockBasedConcurrencyControlManager(timestamp_oracle=oracle)
+    timestamp_ccm = TimestampBasedConcurrencyControlManager(timestamp_oracle=oracle)
+    validation_ccm = ValidationBasedConcurrencyControlManager(timestamp_oracle=oracle)
+    t1 = lock_ccm.transaction_begin()
+    t2 = timestamp_ccm.transaction_begin()
+    t3 = validation_ccm.transaction_begin()
+    assert lock_ccm.transactions[t1]['timestamp'] < timestamp_ccm.transactions[t2]['timestamp']
+    assert timestamp_ccm.transactions[t2]['timestamp'] < validation_ccm.transactions[t3]['start_timestamp']
+    assert oracle.current == 4
+
+def test_leases_are_unique_and_per_thread():
+    oracle = TimestampOracle(lease_size=16)
+    seen = []
+    seen_lock = threading.Lock()
+
+    def worker():
+        local = [oracle.allocate() for _ in range(1000)]
+        assert local == sorted(local)
+        with seen_lock:
+            seen.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(seen) == len(set(seen)) == 8000
+    # advance() is past every lease handed out
+    assert oracle.advance() > max(seen)
+
+def test_leased_begin_timestamps():
+    ccm = ValidationBasedConcurrencyControlManager(timestamp_oracle=TimestampOracle(lease_size=64))
+    t1 = ccm.transaction_begin()
+    t2 = ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.WRITE, 'X')
+    ccm.transaction_query(t2, TableAction.READ, 'X')
+    assert ccm.transaction_commit(t1).can_proceed
+    ccm.transaction_commit_flushed(t1)
+    # the finish timestamp is past the lease t2 started from
+    assert ccm.transactions[t1]['finish_timestamp'] > ccm.transactions[t2]['start_timestamp']
+    assert ccm.transaction_commit(t2).should_rollback
+
+    try:
+        TimestampOracle(lease_size=0)
+        assert False, "lease size 0 accepted"
+    except Exception as e:
+        assert 'must be positive' in str(e)
+
+if __name__ == "__main__":
+    test_fresh_oracle_timestamps_equal_ids()
+    test_validation_timestamps_are_logical()
+    test_shared_oracle_orders_managers()
+    test_leases_are_unique_and_per_thread()
+    test_leased_begin_timestamps()
+    print("✓ All timestamp oracle tests PASSED")
@@ -0,0 +1,97 @@
+"""
+Tests for reaping TERMINATED transactions and monotonic transaction ids
+"""
+
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.retention_policy import RetentionPolicy
+from src.row_action import TableAction
+
+def run_to_termination(ccm, transaction_id):
+    ccm.transaction_commit(transaction_id)
+    ccm.transaction_commit_flushed(transaction_id)
+    ccm.transaction_end(transaction_id)
+
+def test_keep_all_is_default():
+    ccm = LockBasedConcurrencyControlManager()
+    tids = [ccm.transaction_begin() for _ in range(5)]
+    for tid in tids:
+        run_to_termination(ccm, tid)
+    assert len(ccm.transactions) == 5
+
+def test_immediate_retention_ids_never_reused():
+    print("\n" + "="*70)
+    print("IMMEDIATE RETENTION")
+    print("="*70)
+    ccm = LockBasedConcurrencyControlManager(retention_policy=RetentionPolicy.immediate())
+    seen = set()
+    for _ in range(1000):
+        tid = ccm.transaction_begin()
+        assert tid not in seen, f"transaction id {tid} was reused"
+        seen.add(tid)
+        ccm.transaction_query(tid, TableAction.WRITE, 'X')
+        run_to_termination(ccm, tid)
+    print(f"Transactions begun: {len(seen)}, retained: {len(ccm.transactions)}")
+    assert len(ccm.transactions) == 0
+    assert not ccm.transaction_exists(max(seen))
+    assert ccm.transaction_begin() == 1001
+
+def test_retention_after_count():
+    ccm = LockBasedConcurrencyControlManager(retention_policy=RetentionPolicy.after_count(3))
+    tids = [ccm.transaction_begin() for _ in range(10)]
+    for tid in tids:
+        run_to_termination(ccm, tid)
+    assert sorted(ccm.transactions) == tids[-3:]
+
+def test_retention_after_age():
+    ccm = LockBasedConcurrencyControlManager(retention_policy=RetentionPolicy.after_age(0.05))
+    t1 = ccm.transaction_begin()
+    run_to_termination(ccm, t1)
+    assert ccm.transaction_exists(t1)
+    time.sleep(0.06)
+    ccm.transaction_begin()
+    assert not ccm.transaction_exists(t1)
+
+def test_validation_reaps_writers_kept_in_commit_log():
+    ccm = ValidationBasedConcurrencyControlManager(retention_policy=RetentionPolicy.immediate())
+    t1 = ccm.transaction_begin()
+    t2 = ccm.transaction_begin()
+    ccm.transaction_query(t1, TableAction.READ, 'X')
+    ccm.transaction_query(t2, TableAction.WRITE, 'X')
+    run_to_termination(ccm, t2)
+    # t2's write set lives on in the commit log, so it is reaped right away
+    assert not ccm.transaction_exists(t2)
+    r = ccm.transaction_commit(t1)
+    assert r.should_rollback and r.reason_args == (t2,)
+
+def test_allocator_is_thread_safe():
+    ccm = LockBasedConcurrencyControlManager(retention_policy=RetentionPolicy.immediate())
+    ids = []
+    ids_lock = threading.Lock()
+
+    def worker():
+        local = [ccm.transaction_begin() for _ in range(500)]
+        with ids_lock:
+            ids.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(ids) == len(set(ids)) == 4000
+
+if __name__ == "__main__":
+    test_keep_all_is_default()
+    test_immediate_retention_ids_never_reused()
+    test_retention_after_count()
+    test_retention_after_age()
+    test_validation_reaps_writers_kept_in_commit_log()
+    test_allocator_is_thread_safe()
+    print("✓ All retention tests PASSED")
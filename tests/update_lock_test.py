@@ -0,0 +1,128 @@
+"""
+Tests for READ_FOR_UPDATE requests and the update (U) lock mode
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.lock_based_concurrency_control_manager import LockBasedConcurrencyControlManager
+from src.timestamp_based_concurrency_control_manager import TimestampBasedConcurrencyControlManager
+from src.validation_based_concurrency_control_manager import ValidationBasedConcurrencyControlManager
+from src.lock_mode import LockMode
+from src.lock_table import RowResource
+from src.row_action import RowAction, TableAction
+from src.concurrency_response import LockStatus
+from src.transaction_status import TransactionStatus
+
+def test_update_lock_modes():
+    print("\n" + "="*70)
+    print("UPDATE LOCKS")
+    print("="*70)
+    assert LockMode.U.compatible_with(LockMode.S) and LockMode.S.compatible_with(LockMode.U)
+    assert LockMode.U.compatible_with(LockMode.IS)
+    assert not LockMode.U.compatible_with(LockMode.U)
+    assert not LockMode.U.compatible_with(LockMode.IX)
+    assert LockMode.S.join(LockMode.U) == LockMode.U
+    assert LockMode.U.join(LockMode.X) == LockMode.X
+    assert LockMode.U.join(LockMode.IX) == LockMode.SIX
+    assert LockMode.U.intention == LockMode.IX
+
+def test_read_modify_write_does_not_deadlock():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    r = ccm.transaction_query(t1, TableAction.READ_FOR_UPDATE, 'A')
+    print(f"T{t1}: {r.reason}")
+    assert r.status == LockStatus.GRANTED
+    assert r.reason == 'Update lock granted on table A'
+    assert ccm.transactions[t1]['locks']['A'] == LockMode.U
+
+    # a second updater queues instead of sharing, so neither can block the other's upgrade
+    r = ccm.transaction_query(t2, TableAction.READ_FOR_UPDATE, 'A')
+    print(f"T{t2}: {r.reason}")
+    assert r.status == LockStatus.WAITING and r.blocked_by == [t1]
+    r = ccm.transaction_query(t1, TableAction.WRITE, 'A')
+    assert r.status == LockStatus.GRANTED
+    assert ccm.transactions[t1]['locks']['A'] == LockMode.X
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+
+    assert ccm.transaction_query(t2, TableAction.READ_FOR_UPDATE, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').can_proceed
+    assert ccm.transactions[t2]['status'] == TransactionStatus.ACTIVE
+
+def test_shared_upgrade_still_deadlocks():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.READ, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.READ, 'A').can_proceed
+    assert ccm.transaction_query(t1, TableAction.WRITE, 'A').should_retry
+    r = ccm.transaction_query(t2, TableAction.WRITE, 'A')
+    print(f"S->X T{t2}: {r.reason}")
+    assert 'Deadlock detected' in r.reason
+
+def test_update_lock_admits_readers_until_conversion():
+    ccm = LockBasedConcurrencyControlManager()
+    t1, t2, t3 = (ccm.transaction_begin() for _ in range(3))
+    assert ccm.transaction_query(t1, TableAction.READ, 'A').can_proceed
+    assert ccm.transaction_query(t2, TableAction.READ_FOR_UPDATE, 'A').can_proceed
+    assert ccm.transaction_query(t3, TableAction.READ, 'A').can_proceed
+
+    # converting to X waits for the readers to leave
+    r = ccm.transaction_query(t2, TableAction.WRITE, 'A')
+    assert r.status == LockStatus.WAITING and sorted(r.blocked_by) == [t1, t3]
+    ccm.transaction_commit(t1)
+    ccm.transaction_commit_flushed(t1)
+    ccm.transaction_commit(t3)
+    ccm.transaction_commit_flushed(t3)
+    assert ccm.transaction_query(t2, TableAction.WRITE, 'A').can_proceed
+
+def test_row_update_locks():
+    ccm = LockBasedConcurrencyControlManager(row_lock_escalation_threshold=2)
+    t1, t2 = ccm.transaction_begin(), ccm.transaction_begin()
+    r = ccm.transaction_query_row(t1, RowAction.READ_FOR_UPDATE, 'accounts', 1)
+    print(f"T{t1}: {r.reason}")
+    assert r.status == LockStatus.GRANTED
+    assert ccm.transactions[t1]['locks'][RowResource('accounts', 1)] == LockMode.U
+    assert ccm.transactions[t1]['locks']['accounts'] == LockMode.IX
+    assert ccm.transaction_query_row(t2, RowAction.READ, 'accounts', 1).can_proceed
+    assert ccm.transaction_query_row(t2, RowAction.READ_FOR_UPDATE, 'accounts', 1).should_retry
+
+    # escalation takes the strongest row mode to the table
+    ccm = LockBasedConcurrencyControlManager(row_lock_escalation_threshold=2)
+    t1 = ccm.transaction_begin()
+    for key in range(3):
+        ccm.transaction_query_row(t1, RowAction.READ, 'accounts', key)
+    assert ccm.transactions[t1]['locks']['accounts'] == LockMode.S
+    assert ccm.transaction_query(t1, TableAction.READ_FOR_UPDATE, 'accounts').can_proceed
+    assert ccm.transactions[t1]['locks']['accounts'] == LockMode.U
+
+    # update rows hold IX on the table, which the escalated lock keeps
+    t2 = ccm.transaction_begin()
+    ccm.transaction_query_row(t2, RowAction.READ, 'orders', 0)
+    ccm.transaction_query_row(t2, RowAction.READ_FOR_UPDATE, 'orders', 1)
+    ccm.transaction_query_row(t2, RowAction.READ, 'orders', 2)
+    assert ccm.transactions[t2]['locks']['orders'] == LockMode.SIX
+    assert ccm.transactions[t2]['row_locks'] == {}
+
+def test_optimistic_managers_treat_update_as_read():
+    ccm = TimestampBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    r = ccm.transaction_query(t1, TableAction.READ_FOR_UPDATE, 'A')
+    assert r.reason == 'Read allowed on table A'
+    assert ccm.table_read_timestamps['A'] == ccm.transactions[t1]['timestamp']
+
+    ccm = ValidationBasedConcurrencyControlManager()
+    t1 = ccm.transaction_begin()
+    assert ccm.transaction_query(t1, TableAction.READ_FOR_UPDATE, 'A').can_proceed
+    assert ccm.transactions[t1]['read_set'] == {'A'}
+    assert ccm.transactions[t1]['write_set'] == set()
+
+if __name__ == "__main__":
+    test_update_lock_modes()
+    test_read_modify_write_does_not_deadlock()
+    test_shared_upgrade_still_deadlocks()
+    test_update_lock_admits_readers_until_conversion()
+    test_row_update_locks()
+    test_optimistic_managers_treat_update_as_read()
+    print("✓ All update lock tests PASSED")